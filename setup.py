@@ -7,4 +7,8 @@ setup(
     description='WPrison population statistics for England and Wales',
     author='Alex Hewson',
     license='MIT',
+    extras_require={
+        # Optional dataframe engine (compute.engine in config.yaml)
+        'polars': ['polars', 'pyarrow'],
+    },
 )
@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Command-line entry point for the prison population pipeline.
+
+    python -m src download 2024 2025      # download bulletins
+    python -m src build                   # parse raw files into the dataset
+    python -m src build --since 2024-04-01 --until 2024-06-30
+                                          # rebuild one quarter, merging it in
+    python -m src summary --weeks 4       # weekly summary tables
+    python -m src charts                  # charts and HTML report
+    python -m src artifacts               # re-minify and precompress SVGs
+    python -m src fetch 2025              # download and build in one pass
+    python -m src all                     # fetch, summary and charts
+    python -m src watch                   # republish charts for new bulletins
+    python -m src serve --port 8050       # local JSON query service
+    python -m src ingest archive.zip      # add bulletins to the raw store
+
+Add `--profile DIR` (before the subcommand) to write a cProfile dump and a
+text report for each stage run to DIR, and `--collapsed` to also write
+collapsed stacks that flamegraph.pl, speedscope or inferno can render.
+"""
+
+import argparse
+import cProfile
+import io
+import logging
+import os
+import pstats
+from collections import defaultdict
+from datetime import date
+
+from src import utilities as utils
+
+logger = logging.getLogger(__name__)
+
+CONFIG = utils.CONFIG
+# Stages run by `all`; fetch pipelines download and build
+STAGES = ("fetch", "summary", "charts")
+
+
+def run_download(args) -> None:
+    """Downloads the bulletins for the requested years."""
+    # pylint: disable-next=import-outside-toplevel
+    from src.data import download_data
+
+    urls = {}
+    download_data.download_prison_population_data(
+        years=args.years or None, path=args.raw_dir,
+        max_workers=args.workers, on_file=urls.__setitem__,
+    )
+    if args.store:
+        # pylint: disable-next=import-outside-toplevel
+        from src.data import raw_store
+
+        raw_store.ingest(list(urls), args.store_dir, urls=urls)
+
+
+def update_features(args) -> None:
+    """Updates the derived features from the dataset the backend stored."""
+    # pylint: disable-next=import-outside-toplevel
+    from src.data import make_dataset
+    # pylint: disable-next=import-outside-toplevel
+    from src.features import build_features
+
+    build_features.update_features(
+        make_dataset.load_stored(args.processed_dir, args.backend),
+        make_dataset.output_path(args.processed_dir,
+                                 build_features.DEFAULT_FEATURES_PATH),
+    )
+
+
+def run_build(args) -> None:
+    """Builds the processed dataset and its derived features."""
+    # pylint: disable-next=import-outside-toplevel
+    from src.data import make_dataset
+
+    make_dataset.main(args.raw_dir, args.processed_dir,
+                      file_pattern=args.pattern, backend=args.backend,
+                      store_dir=args.store_dir if args.store else None,
+                      since=args.since, until=args.until, years=args.years)
+    update_features(args)
+
+
+def run_fetch(args) -> None:
+    """Downloads bulletins and builds the dataset, parsing files on arrival."""
+    # pylint: disable-next=import-outside-toplevel
+    from src.data import pipeline
+
+    pipeline.run_pipeline(
+        years=args.years or None,
+        raw_dir=args.raw_dir,
+        output_dir=args.processed_dir,
+        file_pattern=args.pattern,
+        download_workers=args.workers,
+        parse_workers=args.parse_workers,
+        backend=args.backend,
+    )
+    update_features(args)
+
+
+def run_ingest(args) -> None:
+    """Adds bulletins from archives, directories or files to the raw store."""
+    # pylint: disable-next=import-outside-toplevel
+    from src.data import raw_store
+
+    raw_store.ingest(args.paths, args.store_dir, file_pattern=args.pattern)
+
+
+def run_export(args) -> None:
+    """Writes the static per-series JSON files from the saved dataset."""
+    # pylint: disable-next=import-outside-toplevel
+    from src.data import export_json
+    # pylint: disable-next=import-outside-toplevel
+    from src.data.make_dataset import output_path
+
+    export_json.main(
+        os.path.join(args.processed_dir, "processed_data.csv"),
+        output_path(args.processed_dir, export_json.DEFAULT_EXPORT_DIR),
+    )
+
+
+def run_summary(args) -> None:
+    """Writes the weekly summary tables and prints the markdown version."""
+    # pylint: disable-next=import-outside-toplevel
+    from src.data import weekly_data_summary
+
+    summary = weekly_data_summary.main(
+        n_weeks=args.weeks, export_formats=tuple(args.formats),
+        output_dir=args.reports_dir, processed_dir=args.processed_dir,
+    )
+    print(weekly_data_summary.to_markdown(summary))
+
+
+def figures_dir(args) -> str:
+    """Returns the chart directory for --reports-dir.
+
+    The configured reports directory uses the configured chart directory; any
+    other keeps the chart directory's name inside it.
+    """
+    configured = CONFIG['viz']['outPath']
+    reports_dir = os.path.abspath(args.reports_dir)
+    if reports_dir == os.path.abspath(CONFIG['reports']['outPath']):
+        return configured
+    return os.path.join(args.reports_dir,
+                        os.path.basename(os.path.normpath(configured)))
+
+
+def run_charts(args) -> None:
+    """Generates the charts and the HTML report."""
+    # pylint: disable-next=import-outside-toplevel
+    from src.query import Query
+    # pylint: disable-next=import-outside-toplevel
+    from src.visualization import html_report, run_prison_population
+
+    run_prison_population.make_charts(
+        data=Query.for_dir(args.processed_dir).collect(),
+        out_dir=figures_dir(args),
+        report_path=os.path.join(
+            args.reports_dir,
+            os.path.basename(html_report.DEFAULT_REPORT_PATH)),
+    )
+
+
+def run_artifacts(args) -> None:
+    """Re-minifies and compresses the SVG charts already rendered."""
+    # pylint: disable-next=import-outside-toplevel
+    from src.visualization import svg_artifacts
+
+    svg_artifacts.main(figures_dir(args))
+
+
+def run_watch(args) -> None:
+    """Runs watch mode until interrupted."""
+    # pylint: disable-next=import-outside-toplevel
+    from src import watch
+
+    watch.watch(
+        raw_dir=args.raw_dir,
+        processed_dir=args.processed_dir,
+        interval=args.interval,
+        api_interval=None if args.no_api else args.api_interval,
+        file_pattern=args.pattern,
+    )
+
+
+def run_serve(args) -> None:
+    """Serves series queries over the processed dataset until interrupted."""
+    # pylint: disable-next=import-outside-toplevel
+    from src.data import query_service
+
+    query_service.main(
+        os.path.join(args.processed_dir, "processed_data.csv"),
+        args.host, args.port)
+
+
+STAGE_FUNCTIONS = {
+    "download": run_download,
+    "build": run_build,
+    "fetch": run_fetch,
+    "export": run_export,
+    "ingest": run_ingest,
+    "summary": run_summary,
+    "charts": run_charts,
+    "artifacts": run_artifacts,
+    "watch": run_watch,
+    "serve": run_serve,
+}
+
+
+def collapsed_stacks(stats: pstats.Stats, max_depth: int = 64,
+                     min_seconds: float = 1e-5) -> list[str]:
+    """Converts profile stats to collapsed stacks, "a;b;c <microseconds>".
+
+    cProfile only records caller-callee pairs, so stacks are rebuilt from the
+    root functions down, splitting each function's time between its callers in
+    proportion to the time spent under each call edge.
+
+    Parameters:
+        stats (pstats.Stats): Loaded profile.
+        max_depth (int): Deepest stack to emit.
+        min_seconds (float): Subtrees with less time than this are not
+            expanded, which keeps the number of stacks manageable.
+
+    Returns:
+        list[str]: One line per unique stack, with its self time in
+            microseconds.
+    """
+    entries = stats.stats  # pylint: disable=no-member
+    callees = defaultdict(list)
+    for func, (_, _, _, _, callers) in entries.items():
+        for caller, edge in callers.items():
+            callees[caller].append((func, edge[3]))
+
+    def label(func):
+        filename, line, name = func
+        return f"{name} ({os.path.basename(filename)}:{line})"
+
+    totals = defaultdict(float)
+
+    def walk(func, stack, fraction):
+        _, _, self_time, cumulative, _ = entries[func]
+        stack = stack + [label(func)]
+        totals[";".join(stack)] += self_time * fraction
+        if len(stack) >= max_depth:
+            return
+        for callee, edge_time in callees[func]:
+            callee_cumulative = entries[callee][3]
+            if (callee_cumulative <= 0 or fraction * edge_time < min_seconds
+                    or label(callee) in stack):
+                continue
+            walk(callee, stack, fraction * edge_time / callee_cumulative)
+
+    roots = [func for func, entry in entries.items() if not entry[4]]
+    for root in roots:
+        walk(root, [], 1.0)
+
+    return [f"{stack} {round(seconds * 1e6)}"
+            for stack, seconds in totals.items() if seconds >= 1e-6]
+
+
+def run_profiled(stage: str, func, args) -> None:
+    """Runs a stage under cProfile and writes its profile to `args.profile`."""
+    utils.ensure_directory(args.profile)
+    profiler = cProfile.Profile()
+    try:
+        profiler.runcall(func, args)
+    finally:
+        prof_path = os.path.join(args.profile, f"{stage}.prof")
+        profiler.dump_stats(prof_path)
+
+        report = io.StringIO()
+        stats = pstats.Stats(profiler, stream=report)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(
+            args.profile_top)
+        report_path = os.path.join(args.profile, f"{stage}.txt")
+        with open(report_path, "w", encoding="utf-8") as f:
+            f.write(report.getvalue())
+
+        if args.collapsed:
+            stacks_path = os.path.join(args.profile, f"{stage}.collapsed")
+            with open(stacks_path, "w", encoding="utf-8") as f:
+                f.write("\n".join(collapsed_stacks(stats)) + "\n")
+        logger.info("Profile for %s written to %s", stage, prof_path)
+
+
+def run_stage(stage: str, args) -> None:
+    """Runs one stage, profiled if requested."""
+    with utils.log_stage(stage):
+        if args.profile:
+            run_profiled(stage, STAGE_FUNCTIONS[stage], args)
+        else:
+            STAGE_FUNCTIONS[stage](args)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Builds the argument parser for all subcommands."""
+    parser = argparse.ArgumentParser(
+        prog="python -m src",
+        description="Prison population statistics pipeline.")
+    parser.add_argument("--raw-dir", default=CONFIG['data']['rawFilePath'],
+                        help="Raw bulletin directory.")
+    parser.add_argument("--processed-dir",
+                        default=CONFIG['data']['clnFilePath'],
+                        help="Processed data directory.")
+    parser.add_argument("--store-dir", default=CONFIG['data']['storePath'],
+                        help="Content-addressed raw store.")
+    parser.add_argument("--reports-dir", default=CONFIG['reports']['outPath'],
+                        help="Report output directory.")
+    parser.add_argument(
+        "--workers", type=int, default=None,
+        help="Worker threads for downloads (default: automatic).")
+    parser.add_argument(
+        "--parse-workers", type=int, default=None,
+        help="Parser processes for fetch (default: one per CPU).")
+    parser.add_argument("--log-file", action="store_true",
+                        help="Also write logs to the logs directory.")
+    parser.add_argument("--json-logs", action="store_true",
+                        help="Write logs as JSON lines.")
+    parser.add_argument(
+        "--engine", choices=utils.ENGINES,
+        help="Dataframe engine (default: compute.engine in config).")
+    parser.add_argument("--profile", metavar="DIR",
+                        help="Write cProfile output for each stage to DIR.")
+    parser.add_argument("--profile-top", type=int, default=40,
+                        help="Functions listed in the text profile report.")
+    parser.add_argument("--collapsed", action="store_true",
+                        help="With --profile, also write collapsed stacks.")
+
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_years(subparser):
+        subparser.add_argument("years", nargs="*", type=int,
+                               help="Years to download (default: all years).")
+
+    def add_build_options(subparser):
+        subparser.add_argument("--backend", choices=("csv", "sqlite"),
+                               default="csv", help="Dataset storage backend.")
+        subparser.add_argument("--pattern", default="*.ods",
+                               help="Glob pattern for raw files.")
+
+    def add_summary_options(subparser):
+        subparser.add_argument("--weeks", type=int, default=2,
+                               help="Number of recent weeks to summarise.")
+        subparser.add_argument(
+            "--formats", nargs="*", default=["md", "html"],
+            help="Export formats: md, html and xlsx (requires openpyxl).")
+
+    download_parser = subparsers.add_parser("download",
+                                            help="Download bulletins.")
+    add_years(download_parser)
+    download_parser.add_argument("--store", action="store_true",
+                                 help="Also add the files to the raw store.")
+    build_parser_ = subparsers.add_parser("build",
+                                          help="Build the processed dataset.")
+    add_build_options(build_parser_)
+    build_parser_.add_argument(
+        "--store", action="store_true",
+        help="Parse the raw store instead of the raw directory.")
+    build_parser_.add_argument(
+        "--since", type=date.fromisoformat,
+        help="Only rebuild bulletins dated on or after this date.")
+    build_parser_.add_argument(
+        "--until", type=date.fromisoformat,
+        help="Only rebuild bulletins dated on or before this date.")
+    build_parser_.add_argument("--years", nargs="+", type=int,
+                               help="Only rebuild bulletins from these years.")
+    fetch_parser = subparsers.add_parser(
+        "fetch", help="Download and build, parsing files as they arrive.")
+    add_years(fetch_parser)
+    add_build_options(fetch_parser)
+    subparsers.add_parser(
+        "export", help="Write static per-series JSON (also done by build).")
+    ingest_parser = subparsers.add_parser(
+        "ingest", help="Add bulletins to the content-addressed raw store.")
+    ingest_parser.add_argument(
+        "paths", nargs="+", help="Zip or tar archives, directories or files.")
+    ingest_parser.add_argument("--pattern", default="*.ods",
+                               help="Glob pattern for bulletin filenames.")
+    add_summary_options(subparsers.add_parser(
+        "summary", help="Write the weekly summary."))
+    subparsers.add_parser("charts",
+                          help="Generate charts and the HTML report.")
+    subparsers.add_parser(
+        "artifacts",
+        help="Minify and precompress the rendered SVG charts "
+             "(also done by charts).")
+
+    watch_parser = subparsers.add_parser(
+        "watch", help="Republish charts whenever new bulletins arrive.")
+    watch_parser.add_argument(
+        "--interval", type=float, default=60,
+        help="Seconds between scans of the raw directory.")
+    watch_parser.add_argument("--api-interval", type=float, default=900,
+                              help="Seconds between content API polls.")
+    watch_parser.add_argument("--no-api", action="store_true",
+                              help="Only watch the raw directory.")
+    watch_parser.add_argument("--pattern", default="*.ods",
+                              help="Glob pattern for raw files.")
+
+    serve_parser = subparsers.add_parser(
+        "serve", help="Serve series queries over HTTP.")
+    serve_parser.add_argument("--host", default=CONFIG['service']['host'],
+                              help="Address to listen on.")
+    serve_parser.add_argument("--port", type=int,
+                              default=CONFIG['service']['port'],
+                              help="Port to listen on.")
+
+    all_parser = subparsers.add_parser("all", help="Run every stage.")
+    add_years(all_parser)
+    add_build_options(all_parser)
+    add_summary_options(all_parser)
+    return parser
+
+
+def main(argv=None) -> None:
+    """Parses the command line and runs the chosen stages."""
+    args = build_parser().parse_args(argv)
+    utils.setup_logging(to_file=args.log_file, json_format=args.json_logs)
+    if args.engine:
+        utils.set_engine(args.engine)
+
+    stages = STAGES if args.command == "all" else (args.command,)
+    for stage in stages:
+        run_stage(stage, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Compares the pandas and polars dataframe engines.
+
+Builds a synthetic dataset far larger than the published one (many groups over
+many years) and times `calculate_week_and_ticks` and `deduplicate`, the
+operations with a polars implementation, with either engine. That both engines
+return identical results is checked by tests/test_polars_engine.py, on a small
+version of the same data.
+
+Usage: python -m src.data.benchmark_engines [n_groups] [n_years]
+(needs the optional polars extra: pip install -e ".[polars]")
+'''
+
+# Imports
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+import src.utilities as utils
+from src.data import revisions
+
+TYPES = ["prison", "operational_capacity", "headroom", "hdc"]
+
+
+def synthetic_data(n_groups: int, n_years: int) -> pd.DataFrame:
+    """Builds weekly values for `n_groups` groups and every type.
+
+    The values cover `n_years` years ending in 2025.
+    """
+    dates = pd.date_range(f"{2026 - n_years}-01-03", "2025-12-26",
+                          freq="W-FRI")
+    groups = ["total"] + [f"group_{i}" for i in range(1, n_groups)]
+    index = pd.MultiIndex.from_product([dates, groups, TYPES],
+                                       names=["date", "group", "type"])
+    values = np.random.default_rng(0).integers(1000, 90000, len(index))
+    return index.to_frame(index=False).assign(
+        value=pd.array(values, dtype="Int64"))
+
+
+def with_duplicates(df: pd.DataFrame) -> pd.DataFrame:
+    """Tags rows with a source file and adds revised duplicates.
+
+    Every tenth date gets a revised copy from another file.
+    """
+    years = df["date"].dt.year.astype(str)
+    rows = df.assign(source="data/raw/" + years + "/bulletin.ods")
+    revised_dates = df["date"].drop_duplicates().iloc[::10]
+    revised = rows[rows["date"].isin(revised_dates)].assign(
+        value=lambda x: x["value"] + 1,
+        source="data/raw/" + years + "/revised.ods",
+    )
+    return pd.concat([rows, revised], ignore_index=True)
+
+
+def cases(df: pd.DataFrame) -> dict:
+    """Returns a function per operation taking the engine to run it with."""
+    duplicated = with_duplicates(df)
+    return {
+        "calculate_week_and_ticks": lambda engine: (
+            utils.calculate_week_and_ticks(df.copy(), engine=engine)),
+        "deduplicate": lambda engine: revisions.deduplicate(
+            duplicated, engine=engine),
+    }
+
+
+def main(n_groups: int = 50, n_years: int = 30, repeats: int = 5) -> dict:
+    """Times each operation with each engine."""
+    utils.resolve_engine("polars")
+    df = synthetic_data(n_groups, n_years)
+    print(f"{len(df):,} rows ({n_groups} groups, {n_years} years)")
+
+    timings = {}
+    for name, func in cases(df).items():
+        timings[name] = {
+            # pylint: disable-next=cell-var-from-loop
+            engine: min(timeit.repeat(lambda: func(engine), number=1,
+                                      repeat=repeats))
+            for engine in ("pandas", "polars")
+        }
+        print(f"{name:>25}: pandas {timings[name]['pandas'] * 1000:8.1f} ms, "
+              f"polars {timings[name]['polars'] * 1000:8.1f} ms "
+              f"({timings[name]['pandas'] / timings[name]['polars']:.1f}x)")
+    return timings
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Load-tests the local query service.
+
+Starts the service on a free port in this process, then sends series queries
+from concurrent client threads over keep-alive connections and reports latency
+percentiles and throughput. With `revalidate` each client sends the ETag it
+last received, so most responses are empty 304s.
+
+Usage: python -m src.data.benchmark_query_service [n_clients] [n_requests]
+'''
+
+# Imports
+import http.client
+import itertools
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.data import query_service
+
+
+def query_paths(options: dict) -> list[str]:
+    """Builds series queries covering every group, type and a few windows."""
+    min_year, max_year = options["date_range"]
+    paths = []
+    for key, start_year, weeks in itertools.product(
+            options["series"], (min_year, max_year - 4, max_year), (0, 1)):
+        group, category = key.split("|")
+        paths.append(f"/series?group={group}&type={category}"
+                     f"&start_year={start_year}&weeks={weeks}")
+    return paths
+
+
+def run_client(
+    address: tuple,
+    paths: list[str],
+    n_requests: int,
+    offset: int,
+    revalidate: bool,
+) -> list[float]:
+    """Sends requests over one connection.
+
+    Returns:
+        list[float]: Each request's latency in seconds.
+    """
+    connection = http.client.HTTPConnection(*address)
+    etags, latencies = {}, []
+    for i in range(n_requests):
+        path = paths[(offset + i) % len(paths)]
+        headers = ({"If-None-Match": etags[path]}
+                   if revalidate and path in etags else {})
+        started = time.perf_counter()
+        connection.request("GET", path, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - started)
+        if response.status not in (200, 304):
+            raise RuntimeError(f"{path} returned {response.status}")
+        etags[path] = response.getheader("ETag")
+    connection.close()
+    return latencies
+
+
+def main(
+    n_clients: int = 16,
+    n_requests: int = 500,
+    data_path: str = query_service.DEFAULT_DATA_PATH,
+) -> dict:
+    """Runs the load test with and without ETag revalidation.
+
+    The results are printed as well as returned.
+    """
+    server = query_service.make_server(data_path, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    paths = query_paths(server.index.options)
+
+    # Time each query once on an empty cache, then measure steady state
+    started = time.perf_counter()
+    run_client(server.server_address, paths, len(paths), 0, False)
+    per_query = (time.perf_counter() - started) / len(paths) * 1000
+    print(f"cold cache: {per_query:6.2f} ms per query "
+          f"({len(paths)} queries)")
+
+    results = {}
+    try:
+        for revalidate in (False, True):
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=n_clients) as executor:
+                latencies = np.concatenate(list(executor.map(
+                    lambda offset: run_client(server.server_address, paths,
+                                              n_requests, offset, revalidate),
+                    range(0, n_clients * 7, 7),
+                )))
+            elapsed = time.perf_counter() - started
+
+            name = "revalidate" if revalidate else "full"
+            p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+            throughput = len(latencies) / elapsed
+            results[name] = {"p50_ms": p50, "p99_ms": p99,
+                             "requests_per_s": throughput}
+            print(f"{name:>10}: p50 {p50:6.2f} ms  p99 {p99:6.2f} ms  "
+                  f"{throughput:8.0f} req/s "
+                  f"({n_clients} clients x {n_requests} requests)")
+    finally:
+        server.shutdown()
+        server.server_close()
+    return results
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
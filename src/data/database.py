@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Optional SQLite backend for the processed dataset.
+
+Rows are keyed on (date, group, type) so each build only upserts values that
+are new or have changed, and every build is recorded in a `runs` table instead
+of being appended to `processed_dates.log`. Analysts can query date ranges for
+a single series without loading the whole dataset into pandas.
+"""
+
+import logging
+import sqlite3
+from datetime import datetime
+
+import pandas as pd
+
+from src.utilities import read_config
+
+config = read_config()
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = config["data"]["dbFilePath"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS population (
+    date TEXT NOT NULL,
+    "group" TEXT NOT NULL,
+    type TEXT NOT NULL,
+    value INTEGER,
+    PRIMARY KEY (date, "group", type)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_population_series
+ON population ("group", type, date);
+
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_at TEXT NOT NULL,
+    min_date TEXT,
+    max_date TEXT,
+    rows_parsed INTEGER NOT NULL,
+    rows_upserted INTEGER NOT NULL
+);
+"""
+
+UPSERT_SQL = """
+INSERT INTO population (date, "group", type, value)
+VALUES (?, ?, ?, ?)
+ON CONFLICT (date, "group", type) DO UPDATE SET value = excluded.value
+WHERE population.value IS NOT excluded.value
+"""
+
+
+def connect(db_path: str = DEFAULT_DB_PATH) -> sqlite3.Connection:
+    """Opens the database, creating the schema if it does not exist yet.
+
+    Args:
+        db_path (str): Path to the SQLite database file.
+
+    Returns:
+        sqlite3.Connection: Open connection to the database.
+    """
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _to_records(df: pd.DataFrame) -> list[tuple]:
+    """Converts processed rows into parameter tuples for `UPSERT_SQL`."""
+    dates = pd.to_datetime(df["date"]).dt.strftime("%Y-%m-%d")
+    values = df["value"].astype(object).where(df["value"].notna(), None)
+    return list(zip(dates, df["group"], df["type"], values))
+
+
+def upsert_rows(conn: sqlite3.Connection, df: pd.DataFrame) -> int:
+    """Inserts new rows and updates rows whose value has changed.
+
+    Args:
+        conn (sqlite3.Connection): Open database connection.
+        df (pd.DataFrame): Processed data with date, group, type and value
+            columns.
+
+    Returns:
+        int: Number of rows inserted or updated.
+    """
+    before = conn.total_changes
+    with conn:
+        conn.executemany(UPSERT_SQL, _to_records(df))
+    return conn.total_changes - before
+
+
+def record_run(conn: sqlite3.Connection, df: pd.DataFrame,
+               rows_upserted: int) -> None:
+    """Records metadata about a build in the `runs` table.
+
+    Args:
+        conn (sqlite3.Connection): Open database connection.
+        df (pd.DataFrame): The rows parsed during the build.
+        rows_upserted (int): Number of rows inserted or updated by the build.
+    """
+    if not df.empty and "date" in df.columns:
+        dates = pd.to_datetime(df["date"])
+        min_date = dates.min().strftime("%Y-%m-%d")
+        max_date = dates.max().strftime("%Y-%m-%d")
+    else:
+        min_date = max_date = None
+
+    with conn:
+        conn.execute(
+            "INSERT INTO runs (run_at, min_date, max_date, rows_parsed, "
+            "rows_upserted) VALUES (?, ?, ?, ?, ?)",
+            (datetime.now().isoformat(), min_date, max_date, len(df),
+             rows_upserted),
+        )
+
+
+def save_dataset(df: pd.DataFrame, db_path: str = DEFAULT_DB_PATH) -> int:
+    """Upserts a processed dataset into the database and records the run.
+
+    Args:
+        df (pd.DataFrame): Processed data with date, group, type and value
+            columns.
+        db_path (str): Path to the SQLite database file.
+
+    Returns:
+        int: Number of rows inserted or updated.
+    """
+    conn = connect(db_path)
+    try:
+        rows_upserted = upsert_rows(conn, df)
+        record_run(conn, df, rows_upserted)
+    finally:
+        conn.close()
+
+    logger.info("Upserted %s of %s rows into %s", rows_upserted, len(df),
+                db_path)
+    return rows_upserted
+
+
+def query_series(
+    db_path: str = DEFAULT_DB_PATH,
+    group: str | None = None,
+    category: str | None = None,
+    start_date: str | None = None,
+    end_date: str | None = None,
+) -> pd.DataFrame:
+    """Reads rows matching the given series and date range.
+
+    Args:
+        db_path (str): Path to the SQLite database file.
+        group (str, optional): The group to filter by (e.g., 'total',
+            'female').
+        category (str, optional): The category to filter by (e.g., 'prison',
+            'hdc').
+        start_date (str, optional): Earliest date to include, as 'YYYY-MM-DD'.
+        end_date (str, optional): Latest date to include, as 'YYYY-MM-DD'.
+
+    Returns:
+        pd.DataFrame: Matching rows sorted by date, group and type.
+    """
+    conditions, params = [], []
+    for clause, param in [
+        ('"group" = ?', group),
+        ("type = ?", category),
+        ("date >= ?", start_date),
+        ("date <= ?", end_date),
+    ]:
+        if param is not None:
+            conditions.append(clause)
+            params.append(param)
+
+    sql = 'SELECT date, "group", type, value FROM population'
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    sql += ' ORDER BY date, "group", type'
+
+    conn = connect(db_path)
+    try:
+        df = pd.read_sql_query(sql, conn, params=params, parse_dates=["date"])
+    finally:
+        conn.close()
+
+    df["value"] = df["value"].astype("Int64")
+    return df
+
+
+def load_runs(db_path: str = DEFAULT_DB_PATH) -> pd.DataFrame:
+    """Returns the build history recorded in the `runs` table."""
+    conn = connect(db_path)
+    try:
+        return pd.read_sql_query("SELECT * FROM runs ORDER BY id", conn)
+    finally:
+        conn.close()
@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 
 import argparse
+import contextvars
 import logging
 import os
 import re
@@ -13,7 +14,6 @@ import requests
 from src.utilities import read_config, setup_logging
 
 config = read_config()
-setup_logging()
 
 
 def extract_year_from_title(title):
@@ -45,8 +45,14 @@ def get_api_urls(years=None):
     return api_urls
 
 
-def download_files(url, year, path=config['data']['rawFilePath']):
-    """Downloads spreadsheet attachments from a given API URL if not already downloaded."""
+def download_files(url, year, path=config['data']['rawFilePath'],
+                   on_file=None):
+    """Downloads spreadsheet attachments from a given API URL.
+
+    Files that were already downloaded are skipped. on_file, if given, is
+    called with the path and URL of each spreadsheet as soon as it is
+    available, whether it was downloaded or already present.
+    """
     response = requests.get(url, timeout=10)
     data = response.json()
     attachments = data['details']['attachments']
@@ -74,6 +80,8 @@ def download_files(url, year, path=config['data']['rawFilePath']):
         if os.path.exists(filename):
             logging.info("Skipping %s (already downloaded).", os.path.basename(filename))
             files_skipped += 1
+            if on_file is not None:
+                on_file(filename, spreadsheet_url)
             continue  # Skip downloading this file
 
         # Make a GET request to download the spreadsheet file
@@ -85,6 +93,8 @@ def download_files(url, year, path=config['data']['rawFilePath']):
 
         logging.info("Downloaded file %s to %s/", os.path.basename(filename), year_path)
         files_downloaded = True  # Mark that at least one file was downloaded
+        if on_file is not None:
+            on_file(filename, spreadsheet_url)
 
     # Log completion message only once per year
     if files_downloaded:
@@ -94,8 +104,15 @@ def download_files(url, year, path=config['data']['rawFilePath']):
         logging.info("All files for %s were already downloaded. No new downloads.", year)
 
 
-def download_prison_population_data(years=None):
-    """Fetches and downloads prison population statistics for specified years."""
+def download_prison_population_data(years=None,
+                                    path=config['data']['rawFilePath'],
+                                    max_workers=None, on_file=None):
+    """Fetches and downloads prison population statistics for specified years.
+
+    max_workers sets the number of download threads (None uses the executor
+    default), and on_file is passed to `download_files`. Returns the years
+    whose download failed.
+    """
     # Convert years to strings if given as integers
     if years is not None:
         if isinstance(years, int):
@@ -107,10 +124,23 @@ def download_prison_population_data(years=None):
     # Get filtered API URLs
     api_urls_with_years = get_api_urls(years=years)
 
-    # Run downloads concurrently
-    with ThreadPoolExecutor() as executor:
-        for api_url, year in api_urls_with_years:
-            executor.submit(download_files, api_url, year)
+    # Run downloads concurrently, each thread logging with the caller's stage
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(contextvars.copy_context().run, download_files,
+                            api_url, year, path, on_file): year
+            for api_url, year in api_urls_with_years
+        }
+
+    # A failed year does not stop the others, but is reported
+    failed = []
+    for future, year in futures.items():
+        try:
+            future.result()
+        except Exception:  # pylint: disable=broad-except
+            logging.exception("Download failed for %s", year)
+            failed.append(year)
+    return failed
 
 
 if __name__ == "__main__":
@@ -123,4 +153,5 @@ if __name__ == "__main__":
     )
 
     args = parser.parse_args()
+    setup_logging()
     download_prison_population_data(years=args.years if args.years else None)
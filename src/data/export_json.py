@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Static per-series JSON export for embedding charts on the website.
+
+Each (group, type) series is written as gzip-precompressed JSON, once for its
+full history (`total_prison.json.gz`) and once per year
+(`total_prison_2025.json.gz`), as columns of dates, values and week numbers.
+`index.json` lists every file with its date range, sizes and a hash of its
+content. A file is only rewritten when its content hash changes, so a weekly
+update rewrites the current year's files and the full-history files of the
+series that changed.
+
+Static hosts can serve the files with `Content-Encoding: gzip`, so a chart
+fetches a few KB rather than the whole dataset.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from src.utilities import ensure_directory, read_config
+
+config = read_config()
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EXPORT_DIR = config["reports"]["jsonPath"]
+INDEX_FILENAME = "index.json"
+
+
+def series_payload(
+    df: pd.DataFrame,
+    group: str,
+    category: str,
+    year: int | None = None,
+) -> bytes:
+    """Serialises one series (or one year of it) as compact JSON columns."""
+    dates = pd.to_datetime(df["date"])
+    values = pd.to_numeric(df["value"], errors="coerce")
+    payload = {
+        "group": group,
+        "type": category,
+        "year": year,
+        "date": dates.dt.strftime("%Y-%m-%d").tolist(),
+        "value": [None if pd.isna(value) else int(value) for value in values],
+        "week": ((dates.dt.dayofyear - 1) // 7 + 1).tolist(),
+    }
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+def read_index(export_dir: str = DEFAULT_EXPORT_DIR) -> dict:
+    """Reads the export index, returning an empty one if none exists yet."""
+    index_path = os.path.join(export_dir, INDEX_FILENAME)
+    if not os.path.exists(index_path):
+        return {"files": {}}
+    with open(index_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_if_changed(
+    export_dir: str,
+    filename: str,
+    body: bytes,
+    previous: dict | None,
+    meta: dict,
+) -> tuple[dict, bool]:
+    """Writes a gzip file unless its hash matches the previous export."""
+    content_hash = hashlib.sha256(body).hexdigest()[:16]
+    path = os.path.join(export_dir, filename)
+    if (previous and previous.get("hash") == content_hash
+            and os.path.exists(path)):
+        return previous, False
+
+    # mtime=0 keeps the compressed bytes identical for identical content
+    compressed = gzip.compress(body, compresslevel=9, mtime=0)
+    with open(path, "wb") as f:
+        f.write(compressed)
+    return {**meta, "hash": content_hash, "bytes": len(body),
+            "gzip_bytes": len(compressed)}, True
+
+
+def export_series(df: pd.DataFrame,
+                  export_dir: str = DEFAULT_EXPORT_DIR) -> dict:
+    """Writes the per-series and per-year JSON files that changed.
+
+    The index is rewritten every time.
+
+    Parameters:
+        df (pd.DataFrame): Processed data with date, group, type and value
+            columns.
+        export_dir (str): Directory to write the files to.
+
+    Returns:
+        dict: The export index.
+    """
+    ensure_directory(export_dir)
+    previous = read_index(export_dir)["files"]
+    df = df.assign(date=pd.to_datetime(df["date"])).sort_values(
+        ["group", "type", "date"])
+
+    files, n_written = {}, 0
+    for (group, category), df_series in df.groupby(["group", "type"]):
+        years = df_series["date"].dt.year
+        parts = [(None, df_series)] + [
+            (int(year), df_year)
+            for year, df_year in df_series.groupby(years)]
+        for year, df_part in parts:
+            suffix = "" if year is None else f"_{year}"
+            filename = f"{group}_{category}{suffix}.json.gz"
+            meta = {
+                "group": group,
+                "type": category,
+                "year": year,
+                "min_date": df_part["date"].min().strftime("%Y-%m-%d"),
+                "max_date": df_part["date"].max().strftime("%Y-%m-%d"),
+                "rows": len(df_part),
+            }
+            body = series_payload(df_part, group, category, year)
+            files[filename], written = _write_if_changed(
+                export_dir, filename, body, previous.get(filename), meta)
+            n_written += written
+
+    # Remove files for series or years no longer in the dataset
+    for filename in set(previous) - set(files):
+        path = os.path.join(export_dir, filename)
+        if os.path.exists(path):
+            os.remove(path)
+
+    index = {"generated_at": datetime.now().isoformat(timespec="seconds"),
+             "files": files}
+    with open(os.path.join(export_dir, INDEX_FILENAME), "w",
+              encoding="utf-8") as f:
+        json.dump(index, f, indent=1)
+
+    logger.info("Exported %s JSON files to %s (%s unchanged)", n_written,
+                export_dir, len(files) - n_written)
+    return index
+
+
+def main(
+    processed_path: str = os.path.join(config["data"]["clnFilePath"],
+                                       "processed_data.csv"),
+    export_dir: str = DEFAULT_EXPORT_DIR,
+) -> dict:
+    """Exports the saved processed dataset."""
+    return export_series(pd.read_csv(processed_path), export_dir)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    main()
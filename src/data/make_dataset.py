@@ -9,6 +9,10 @@ from pathlib import Path
 
 import pandas as pd
 
+from src.data import (database, export_json, partitions, raw_store,
+                      revisions, validate_dataset)
+from src.features import seasonal_matrix
+from src.query import Query
 from src.utilities import read_config
 
 # Load config.yaml
@@ -17,24 +21,92 @@ config = read_config()
 # Load logger
 logger = logging.getLogger(__name__)
 
+# Bulletin row labels and the (group, type) each holds, for every format.
+# Labels are matched ignoring case and repeated whitespace. A group of None
+# takes the group of the value's column: the total in historic bulletins, one
+# column per group in new ones. New label variants only need a row here.
+LABEL_MAP = pd.DataFrame.from_records(
+    [
+        ("Population", None, "prison"),
+        ("Population in male estate", "male", "prison"),
+        ("Male population", "male", "prison"),
+        ("Population in female estate", "female", "prison"),
+        ("Female population", "female", "prison"),
+        ("Useable Operational Capacity", None, "operational_capacity"),
+        ("Headroom", None, "headroom"),
+        ("Home Detention Curfew caseload", None, "hdc"),
+    ],
+    columns=["label", "group", "type"],
+)
+
+
+def _label_key(labels: pd.Series) -> pd.Series:
+    """Normalises labels for matching against `LABEL_MAP`."""
+    return (labels.astype("string").str.strip()
+            .str.replace(r"\s+", " ", regex=True).str.casefold())
+
+
+_LABEL_KEYS = LABEL_MAP.assign(
+    key=_label_key(LABEL_MAP["label"])).drop(columns="label")
+
+
 def extract_date_from_string(date_string: str) -> datetime | None:
-    """Extracts a date from a string using regex and converts it to a datetime object.
-    
+    """Extracts a date from a string using regex.
+
     Args:
-        date_string (str): A string containing a date in the format '19 July 2024' or with ordinal suffixes.
-    
+        date_string (str): A string containing a date in the format
+            '19 July 2024' or with ordinal suffixes.
+
     Returns:
         datetime.date | None: Extracted date or None if no match is found.
     """
-    match = re.search(r"(\d{1,2})(?:st|nd|rd|th)? ([A-Za-z]+) (\d{4})", date_string)  
+    match = re.search(r"(\d{1,2})(?:st|nd|rd|th)? ([A-Za-z]+) (\d{4})",
+                      date_string)
     if match:
         day, month, year = match.groups()
-        extracted_date = datetime.strptime(f"{day} {month} {year}", "%d %B %Y").date()
+        extracted_date = datetime.strptime(f"{day} {month} {year}",
+                                           "%d %B %Y").date()
         return extracted_date
     else:
         logger.warning(f"Failed to extract date from '{date_string}'")
         return None
 
+
+def normalise_rows(df: pd.DataFrame, date, file_path: str) -> pd.DataFrame:
+    """Maps labelled bulletin values to date, group, type and value rows.
+
+    Labels are looked up in `LABEL_MAP`. Rows whose label is not in it are
+    reported with the file they came from and left out.
+
+    Args:
+        df (pd.DataFrame): Rows with `label`, `group` (the group of the
+            value's column) and `value` columns.
+        date (datetime.date): Bulletin date.
+        file_path (str): Path to the file being processed, for reporting.
+
+    Returns:
+        pd.DataFrame: Normalised rows in the order given.
+    """
+    matched = df.assign(key=_label_key(df["label"])).merge(
+        _LABEL_KEYS, on="key", how="left", suffixes=("", "_mapped")
+    )
+    unmapped = matched["type"].isna()
+    if unmapped.any():
+        logger.warning("Unmapped labels in %s: %s. Add them to LABEL_MAP if "
+                       "they hold figures", file_path,
+                       sorted(matched.loc[unmapped, "label"]
+                              .astype(str).unique()))
+        matched = matched.loc[~unmapped]
+
+    return pd.DataFrame({
+        "date": date,
+        "group": matched["group_mapped"].fillna(matched["group"]),
+        "type": matched["type"],
+        "value": pd.to_numeric(matched["value"],
+                               errors="coerce").astype("Int64"),
+    }).reset_index(drop=True)
+
+
 def process_historic_file(df: pd.DataFrame, file_path: str) -> pd.DataFrame:
     """Processes historic format spreadsheets to match new format structure.
     
@@ -67,39 +139,11 @@ def process_historic_file(df: pd.DataFrame, file_path: str) -> pd.DataFrame:
         date = extract_date_from_string(df.iloc[0, 0])
         if date is None:
             raise ValueError(f"Could not extract date from {file_path}")
-        
-        # Rename columns for clarity
-        df.columns = ["type", "group_value"]
-        
-        # Step 1: Assign 'total' to group for original 'prison' type
-        df.loc[df["type"] == "Population", "group"] = "total"
-        df.loc[df["type"] == "Population", "type"] = "prison"
-
-        # Step 2: Assign correct group values for male and female estate, handling variations
-        df.loc[df["type"].isin(["Population in male estate", "Male population"]), "group"] = "male"
-        df.loc[df["type"].isin(["Population in female estate", "Female population"]), "group"] = "female"
-
-        # Step 3: Change type for male and female estate to 'prison'
-        df.loc[df["type"].isin(["Population in male estate", "Population in female estate", "Male population", "Female population"]), "type"] = "prison"
-        
-        # Step 4: Map other types to their new format
-        type_mapping = {
-            "Useable Operational Capacity": "operational_capacity",
-            "Home Detention Curfew caseload": "hdc"
-        }
-        df["type"] = df["type"].replace(type_mapping)
-
-        # Step 5: Ensure 'total' is assigned to operational capacity and HDC
-        df.loc[df["type"].isin(["operational_capacity", "hdc"]), "group"] = "total"
-        
-        # Assign extracted date and cleanup
-        df = (
-            df.assign(date=date)  # Assign extracted date
-            .rename(columns={"group_value": "value"})  # Rename column for consistency
-            .assign(value=lambda x: pd.to_numeric(x["value"], errors="coerce").astype("Int64"))  # Convert values to numeric
-            .loc[:, ["date", "group", "type", "value"]]  # Reorder columns (keep all rows)
-            .loc[4:]  # Keep rows from index 4 onwards (after dropping unwanted metadata)
-        )
+
+        # Rows from index 4 onwards hold the figures; the label gives the
+        # group, or the total
+        figures = df.set_axis(["label", "value"], axis=1).loc[4:]
+        df = normalise_rows(figures.assign(group="total"), date, file_path)
         logger.info(f"Successfully processed file: {file_path}") # Log success
         return df
 
@@ -127,22 +171,13 @@ def process_new_file(df: pd.DataFrame, file_path: str) -> pd.DataFrame:
         if date is None:
             raise ValueError(f"Could not extract date from {file_path}")
 
+        # One value column per group
         df = (
-            df.assign(date=date)
-            .loc[[4, 5, 6, 8], :]
-            .rename(columns=dict(zip(df.columns, ["type", "total", "male", "female", "youth", "date"])))
-            .melt(id_vars=["date", "type"], var_name="group", value_name="value")
-            .replace({
-                "type": {
-                    "Population": "prison",
-                    "Useable Operational Capacity": "operational_capacity",
-                    "Headroom": "headroom",
-                    "Home Detention Curfew caseload": "hdc"
-                }
-            })
-            .assign(value=lambda df: pd.to_numeric(df["value"], errors="coerce").astype("Int64"))
-            .loc[:, ["date", "group", "type", "value"]]
+            df.loc[[4, 5, 6, 8], :]
+            .set_axis(["label", "total", "male", "female", "youth"], axis=1)
+            .melt(id_vars="label", var_name="group", value_name="value")
         )
+        df = normalise_rows(df, date, file_path)
         logger.info(f"Successfully processed file: {file_path}")  # Log success
         return df
 
@@ -178,6 +213,25 @@ def process_file(file_path: str) -> pd.DataFrame:
 DEFAULT_INPUT_DIR = config["data"]["rawFilePath"]
 DEFAULT_OUTPUT_DIR = config["data"]["clnFilePath"]
 
+
+def output_path(output_dir, configured_path: str) -> Path:
+    """Returns where an output configured in config.yaml is written.
+
+    A build into the configured processed directory uses the configured path;
+    a build into another directory keeps the output's name inside that
+    directory.
+
+    Args:
+        output_dir (str): Directory the dataset is built into.
+        configured_path (str): The output's path in config.yaml.
+
+    Returns:
+        Path: Path to write the output to.
+    """
+    if Path(output_dir).resolve() == Path(DEFAULT_OUTPUT_DIR).resolve():
+        return Path(configured_path)
+    return Path(output_dir) / Path(configured_path).name
+
 """
 Temporarily removing CLI options for direct function call.
 @click.command()
@@ -188,19 +242,214 @@ Temporarily removing CLI options for direct function call.
 @click.option("--file-pattern", default="*.ods", help="File pattern to match.")
 """
 
-def main(input_dir=DEFAULT_INPUT_DIR, output_dir=DEFAULT_OUTPUT_DIR, file_pattern="*.ods") -> None:
+
+def main(input_dir=DEFAULT_INPUT_DIR, output_dir=DEFAULT_OUTPUT_DIR,
+         file_pattern="*.ods", backend="csv", store_dir=None, since=None,
+         until=None, years=None) -> None:
     """ Runs data processing scripts to turn raw data from (../raw) into
         cleaned data ready to be analyzed (saved in ../processed).
+
+        With backend="sqlite" the parsed rows are upserted into the database
+        at `dbFilePath` (or in output_dir, if another directory is given) and
+        the run is recorded there instead of in the CSV and log file.
+        With store_dir set, each distinct bulletin in the raw store is parsed
+        once instead of globbing input_dir.
+        With since, until or years set, only bulletins dated in that window
+        are parsed and the result is merged into the existing processed
+        dataset.
     """
     logger.info('Making final data set from raw data')
+    selective = since is not None or until is not None or bool(years)
+
+    if store_dir is not None:
+        file_paths = raw_store.blob_paths(store_dir, since, until, years)
+    else:
+        file_paths = glob.glob(f"{input_dir}/**/{file_pattern}",
+                               recursive=True)
+        if selective:
+            file_paths = select_files(file_paths, since, until, years)
+
+    if not file_paths:
+        logger.warning("No raw files to process")
+        return
+    if selective:
+        logger.info("Rebuilding %s files dated in the window "
+                    "(since=%s, until=%s, years=%s)",
+                    len(file_paths), since, until, years)
+
+    frames = {file: process_file(file) for file in file_paths}
+    build_dataset(frames, output_dir, backend, since=since, until=until,
+                  years=years)
+
+
+def select_files(file_paths: list[str], since=None, until=None,
+                 years=None) -> list[str]:
+    """Keeps the raw files whose bulletin date is in the window.
 
-    file_paths = glob.glob(f"{input_dir}/**/{file_pattern}", recursive=True)
+    The files are not opened: the date is taken from the filename, falling
+    back to the year folder the file was downloaded to.
 
-    df = (
-        pd.concat([process_file(file) for file in file_paths], ignore_index=True)
-        .sort_values(["date", "group", "type"])
+    Args:
+        file_paths (list[str]): Raw file paths.
+        since (date, optional): Earliest bulletin date to include.
+        until (date, optional): Latest bulletin date to include.
+        years (optional): Bulletin years to include.
+
+    Returns:
+        list[str]: The paths in the window.
+    """
+    return [
+        path for path in file_paths
+        if raw_store.in_window(raw_store.bulletin_date_from_name(path),
+                               since, until, years,
+                               raw_store.year_from_path(path))
+    ]
+
+
+def merge_window(existing: pd.DataFrame, rebuilt: pd.DataFrame, since=None,
+                 until=None, years=None) -> pd.DataFrame:
+    """Replaces the window's rows in the existing dataset with rebuilt ones.
+
+    Existing rows in the window are dropped for every date the rebuilt rows
+    cover, so rows a parser fix no longer produces do not linger; dates in the
+    window that no rebuilt bulletin covers, e.g. because its file failed to
+    parse, keep their existing rows. Rebuilt rows outside the window replace
+    existing rows with the same date, group and type.
+
+    Args:
+        existing (pd.DataFrame): The saved processed dataset.
+        rebuilt (pd.DataFrame): Rows parsed from the files in the window.
+        since (date, optional): Earliest date in the window.
+        until (date, optional): Latest date in the window.
+        years (optional): Years in the window.
+
+    Returns:
+        pd.DataFrame: The merged dataset sorted by date, group and type, with
+            integer values.
+    """
+    rebuilt = rebuilt.assign(date=pd.to_datetime(rebuilt["date"]))
+    dates = existing["date"]
+    replaced = dates.isin(rebuilt["date"].unique())
+    if since is not None:
+        replaced &= dates >= pd.Timestamp(since)
+    if until is not None:
+        replaced &= dates <= pd.Timestamp(until)
+    if years:
+        replaced &= dates.dt.year.isin(years)
+
+    merged = (
+        pd.concat([existing.loc[~replaced], rebuilt], ignore_index=True)
+        .drop_duplicates(revisions.KEYS, keep="last")
+        .sort_values(revisions.KEYS)
         .reset_index(drop=True)
     )
+    # Concatenating saved values that have gaps with parsed ones gives floats,
+    # which the CSV would then store as e.g. 84000.0
+    return merged.assign(value=pd.to_numeric(merged["value"]).astype("Int64"))
+
+
+def load_stored(output_dir=DEFAULT_OUTPUT_DIR,
+                backend="csv") -> pd.DataFrame | None:
+    """Reads the dataset a backend last stored for an output directory.
+
+    Args:
+        output_dir (str): Directory the dataset is built into.
+        backend (str): "csv" or "sqlite".
+
+    Returns:
+        pd.DataFrame | None: The stored dataset, or None if the backend has
+            not stored one yet.
+    """
+    query = Query.for_dir(str(output_dir), source=backend)
+    stored_path = query.db_path if backend == "sqlite" else query.csv_path
+    if not os.path.exists(stored_path):
+        return None
+    return query.collect()
+
+
+def build_dataset(frames: dict, output_dir=DEFAULT_OUTPUT_DIR, backend="csv",
+                  since=None, until=None, years=None) -> None:
+    """Combines parsed files into the processed dataset, checks and saves it.
+
+    Args:
+        frames (dict): Parsed DataFrame for each raw file path (empty if
+            parsing failed).
+        output_dir (str): Directory to save processed data.
+        backend (str): "csv" or "sqlite".
+        since, until, years (optional): Window the files were selected for;
+            if any is set, the rows are merged into the existing dataset
+            instead of replacing it.
+    """
+    parse_failures = [file for file, frame in frames.items() if frame.empty]
+
+    # Tag rows with their source file so duplicate bulletins resolve
+    # deterministically
+    df = revisions.deduplicate(pd.concat(
+        [frame.assign(source=file) for file, frame in frames.items()],
+        ignore_index=True,
+    ))
+
+    # What the selected backend last stored, for merging a partial rebuild
+    # into and for finding revisions
+    stored = load_stored(output_dir, backend)
+
+    rebuilt = None
+    selective = since is not None or until is not None or bool(years)
+    if selective and stored is not None:
+        rebuilt = df.assign(date=pd.to_datetime(df["date"]))
+        existing = stored.assign(source=f"stored {backend} dataset")
+        df = merge_window(existing, rebuilt, since, until, years)
+        logger.info("Merged %s rebuilt rows into %s existing rows",
+                    len(rebuilt), len(existing))
+
+    # Only dates added or changed by this build are checked once a dataset is
+    # stored, so issues already in the stored history do not fail every build
+    if stored is None:
+        new_dates = None
+    elif rebuilt is not None:
+        new_dates = rebuilt["date"]
+    else:
+        # Diffed the other way round, rows new to this build show as removed
+        new_dates = revisions.diff_datasets(df, stored)["date"]
+
+    # Stop before anything is written if the data fails the quality checks
+    validate_dataset.validate(
+        df,
+        new_dates=new_dates,
+        parse_failures=parse_failures,
+        report_path=Path(output_dir) / "validation_report.json",
+    )
+
+    # Record values revised by MoJ since the last build
+    revisions.track_revisions(df, stored, Path(output_dir) / "revisions.csv")
+    df = df.drop(columns="source")
+
+    if backend == "sqlite":
+        database.save_dataset(
+            df, output_path(output_dir, database.DEFAULT_DB_PATH))
+        return
+
+    changed_rows = (None if rebuilt is None
+                    else rebuilt.drop(columns="source"))
+    save_outputs(df, output_dir, changed_rows=changed_rows)
+
+
+def save_outputs(
+    df: pd.DataFrame,
+    output_dir=DEFAULT_OUTPUT_DIR,
+    changed_rows: pd.DataFrame | None = None,
+) -> None:
+    """Writes the processed CSV and the files derived from it.
+
+    Args:
+        df (pd.DataFrame): The full processed dataset.
+        output_dir (str): Directory to save processed data.
+        changed_rows (pd.DataFrame, optional): Rows added or revised since the
+            last save. If given, only these rows are written into an existing
+            seasonal matrix.
+    """
+    save_path = Path(output_dir) / "processed_data.csv"
+    matrix_path = output_path(output_dir, seasonal_matrix.DEFAULT_MATRIX_PATH)
 
     # Extract date range
     if not df.empty and "date" in df.columns:
@@ -210,12 +459,24 @@ def main(input_dir=DEFAULT_INPUT_DIR, output_dir=DEFAULT_OUTPUT_DIR, file_patter
     else:
         date_range = datetime.today().strftime("%Y-%m-%d")  # Fallback if no valid dates
 
-    save_filename = "processed_data.csv"
-    save_path = Path(output_dir) / save_filename
-
     df.to_csv(save_path, index=False)
     logger.info("Processed data saved to %s", save_path)
 
+    # Write year partitions so recent-week readers only open the latest file
+    partitions.write_partitions(
+        df, output_path(output_dir, partitions.DEFAULT_PARTITION_DIR))
+
+    # Keep the year x week matrices used for seasonal comparisons in step; only
+    # cells that differ from the saved matrix are written
+    if changed_rows is None or not matrix_path.exists():
+        changed_rows = df
+    seasonal_matrix.materialise(changed_rows, matrix_path)
+
+    # Static per-series JSON for the website; unchanged series are not
+    # rewritten
+    export_json.export_series(
+        df, output_path(output_dir, export_json.DEFAULT_EXPORT_DIR))
+
     # Save date range in a separate log file
     metadata_file = Path(output_dir) / "processed_dates.log"
     with open(metadata_file, "a", encoding="utf-8") as log_file:
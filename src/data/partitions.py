@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Year-partitioned copy of the processed dataset.
+
+`write_partitions` splits the processed data into one CSV per year alongside a
+small `index.json` recording each partition's date range and the groups and
+types it contains. Readers consult the index and only open the partitions that
+overlap the requested window (and, for `src.query`, contain the requested
+series), so the weekly summary reads the latest year rather than the full
+history.
+"""
+
+import json
+import logging
+import os
+
+import pandas as pd
+
+from src.utilities import ensure_directory, read_config
+
+config = read_config()
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PARTITION_DIR = config["data"]["partitionPath"]
+INDEX_FILENAME = "index.json"
+
+
+def write_partitions(
+    df: pd.DataFrame,
+    partition_dir: str = DEFAULT_PARTITION_DIR,
+) -> dict:
+    """Writes one CSV per year and an index describing the partitions.
+
+    Args:
+        df (pd.DataFrame): Processed data with date, group, type and value
+            columns.
+        partition_dir (str): Directory to write the partitions to.
+
+    Returns:
+        dict: The partition index, keyed by year.
+    """
+    ensure_directory(partition_dir)
+    dates = pd.to_datetime(df["date"])
+
+    index = {}
+    for year, df_year in df.groupby(dates.dt.year):
+        filename = f"{year}.csv"
+        df_year.to_csv(os.path.join(partition_dir, filename), index=False)
+        year_dates = dates.loc[df_year.index]
+        index[str(year)] = {
+            "file": filename,
+            "min_date": year_dates.min().strftime("%Y-%m-%d"),
+            "max_date": year_dates.max().strftime("%Y-%m-%d"),
+            "n_dates": int(year_dates.nunique()),
+            "rows": len(df_year),
+            "groups": sorted(df_year["group"].unique().tolist()),
+            "types": sorted(df_year["type"].unique().tolist()),
+        }
+
+    # Remove partitions for years no longer present in the dataset
+    for filename in os.listdir(partition_dir):
+        year, ext = os.path.splitext(filename)
+        if ext == ".csv" and year not in index:
+            os.remove(os.path.join(partition_dir, filename))
+
+    index_path = os.path.join(partition_dir, INDEX_FILENAME)
+    with open(index_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2)
+
+    logger.info("Wrote %s yearly partitions to %s", len(index), partition_dir)
+    return index
+
+
+def read_index(partition_dir: str = DEFAULT_PARTITION_DIR) -> dict:
+    """Reads the partition index, or an empty dict if none has been written."""
+    index_path = os.path.join(partition_dir, INDEX_FILENAME)
+    if not os.path.exists(index_path):
+        return {}
+    with open(index_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def has_partitions(partition_dir: str = DEFAULT_PARTITION_DIR) -> bool:
+    """Returns True if a partitioned dataset exists in `partition_dir`."""
+    return bool(read_index(partition_dir))
+
+
+def _read_files(partition_dir: str, entries: list[dict]) -> pd.DataFrame:
+    """Reads and concatenates the partition files described by `entries`."""
+    frames = [
+        pd.read_csv(os.path.join(partition_dir, entry["file"]),
+                    parse_dates=["date"])
+        for entry in entries
+    ]
+    if not frames:
+        return pd.DataFrame(columns=["date", "group", "type", "value"])
+    return pd.concat(frames, ignore_index=True)
+
+
+def read_partitions(
+    partition_dir: str = DEFAULT_PARTITION_DIR,
+    start_date: str | None = None,
+    end_date: str | None = None,
+) -> pd.DataFrame:
+    """Reads only the partitions overlapping a date window.
+
+    Args:
+        partition_dir (str): Directory containing the partitions.
+        start_date (str, optional): Earliest date to include, as 'YYYY-MM-DD'.
+        end_date (str, optional): Latest date to include, as 'YYYY-MM-DD'.
+
+    Returns:
+        pd.DataFrame: Rows within the window.
+    """
+    entries = [
+        entry for entry in read_index(partition_dir).values()
+        if (start_date is None or entry["max_date"] >= start_date)
+        and (end_date is None or entry["min_date"] <= end_date)
+    ]
+    df = _read_files(partition_dir, entries)
+
+    if start_date is not None:
+        df = df[df["date"] >= pd.Timestamp(start_date)]
+    if end_date is not None:
+        df = df[df["date"] <= pd.Timestamp(end_date)]
+    return df.reset_index(drop=True)
+
+
+def read_last_n_dates(
+    n_dates: int,
+    partition_dir: str = DEFAULT_PARTITION_DIR,
+) -> pd.DataFrame:
+    """Reads the rows for the most recent `n_dates` dates.
+
+    Partitions are opened newest first until enough dates have been collected,
+    so recent-week reads normally touch a single file.
+
+    Args:
+        n_dates (int): Number of most recent dates to return.
+        partition_dir (str): Directory containing the partitions.
+
+    Returns:
+        pd.DataFrame: Rows for the most recent `n_dates` dates.
+    """
+    index = read_index(partition_dir)
+    entries, dates_found = [], 0
+    for year in sorted(index, reverse=True):
+        entry = index[year]
+        entries.append(entry)
+        dates_found += entry["n_dates"]
+        if dates_found >= n_dates:
+            break
+
+    df = _read_files(partition_dir, entries)
+    latest_dates = pd.Series(df["date"].unique()).nlargest(n_dates)
+    return df[df["date"].isin(latest_dates)].reset_index(drop=True)
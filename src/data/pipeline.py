@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Streams downloaded bulletins straight into parser worker processes.
+
+`download_prison_population_data` and `make_dataset.main` otherwise run back
+to back: every year is downloaded before the first file is parsed. Here each
+file is handed to a process pool as soon as its download completes (or is
+found already on disk), so network waits overlap the CPU-bound ODS parsing. At
+most `queue_size` files are queued or being parsed at once; when the limit is
+reached download threads wait, which bounds memory on a full backfill. Parsed
+frames are collected as they complete and the dataset is built from them with
+`make_dataset.build_dataset`.
+"""
+
+import contextvars
+import fnmatch
+import glob
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pandas as pd
+
+from src.data import download_data, make_dataset
+from src.utilities import (get_log_queue, log_context, read_config,
+                           worker_logging)
+
+config = read_config()
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RAW_DIR = config["data"]["rawFilePath"]
+DEFAULT_OUTPUT_DIR = config["data"]["clnFilePath"]
+
+
+def run_pipeline(
+    years=None,
+    raw_dir: str = DEFAULT_RAW_DIR,
+    output_dir: str = DEFAULT_OUTPUT_DIR,
+    file_pattern: str = "*.ods",
+    download_workers: int | None = None,
+    parse_workers: int | None = None,
+    queue_size: int = 16,
+    backend: str = "csv",
+) -> dict:
+    """Downloads bulletins and parses each one as soon as it is available.
+
+    Files already in `raw_dir` for other years are parsed too, so the dataset
+    built is the same as `make_dataset.main` would build after the download.
+
+    Args:
+        years (optional): Years to download, as accepted by
+            `download_prison_population_data`.
+        raw_dir (str): Directory the bulletins are saved to.
+        output_dir (str): Directory to save processed data.
+        file_pattern (str): Glob pattern for raw files.
+        download_workers (int, optional): Download threads (None uses the
+            executor default).
+        parse_workers (int, optional): Parser processes (None uses one per
+            CPU).
+        queue_size (int): Most files waiting for or being parsed at once.
+        backend (str): "csv" or "sqlite".
+
+    Returns:
+        dict: Parsed DataFrame for each raw file path.
+    """
+    started = time.perf_counter()
+    slots = threading.BoundedSemaphore(queue_size)
+    lock = threading.Lock()
+    futures = {}
+    frames = {}
+
+    with ProcessPoolExecutor(
+        max_workers=parse_workers,
+        initializer=worker_logging,
+        initargs=(get_log_queue(), log_context()),
+    ) as executor:
+
+        def collect(path, future):
+            try:
+                frames[path] = future.result()
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Parser worker failed on %s", path)
+                frames[path] = pd.DataFrame()
+            finally:
+                slots.release()
+
+        def submit(path, url=None):  # pylint: disable=unused-argument
+            if not fnmatch.fnmatch(os.path.basename(path), file_pattern):
+                return
+            with lock:
+                if path in futures:
+                    return
+                futures[path] = None
+            # Blocks the calling download thread while the parse queue is full
+            slots.acquire()  # pylint: disable=consider-using-with
+            future = executor.submit(make_dataset.process_file, path)
+            future.add_done_callback(lambda f: collect(path, f))
+            futures[path] = future
+
+        # Listed before downloading starts, so no partly written file is parsed
+        existing = glob.glob(f"{raw_dir}/**/{file_pattern}", recursive=True)
+
+        # Downloads start first, so they are not held up while parses of the
+        # files already on disk fill the queue
+        with ThreadPoolExecutor(max_workers=1) as downloader:
+            download = downloader.submit(
+                contextvars.copy_context().run,
+                download_data.download_prison_population_data,
+                years=years, path=raw_dir, max_workers=download_workers,
+                on_file=submit,
+            )
+            for path in existing:
+                submit(path)
+            try:
+                download.result()
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Download failed; building from the files "
+                                 "available")
+        downloaded = time.perf_counter()
+        # Leaving the block waits for the remaining parses and their callbacks
+
+    logger.info("Parsed %s files in %.1fs (downloads finished after %.1fs)",
+                len(frames), time.perf_counter() - started,
+                downloaded - started)
+
+    make_dataset.build_dataset(frames, output_dir, backend)
+    return frames
+
+
+def main(years=None) -> dict:
+    """Downloads the given years and builds the dataset in one pass."""
+    return run_pipeline(years=years)
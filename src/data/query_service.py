@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Local HTTP JSON service for series queries over the processed dataset.
+
+Dashboards can query this service instead of reading `processed_data.csv`
+and re-implementing `utilities.filter_data`. The dataset is held in memory,
+indexed by (group, type) with each series sorted by date, so a query is a
+dictionary lookup and a binary search on the year. Responses are cached by
+query and carry an ETag, so clients revalidating with If-None-Match get an
+empty 304. The service checks the dataset file's modification time at most
+once a second and reloads it (clearing the cache) when it changes.
+
+Endpoints:
+    GET /series?group=total&type=prison&start_year=2021
+        [&end_year=2024][&weeks=1]
+    GET /options
+    GET /health
+
+Usage: python -m src serve [--port 8050]
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from src.utilities import (calculate_week_and_ticks, get_filter_options,
+                           load_data, read_config)
+
+config = read_config()
+
+logger = logging.getLogger(__name__)
+
+SETTINGS = config["service"]
+DEFAULT_DATA_PATH = os.path.join(config["data"]["clnFilePath"],
+                                 "processed_data.csv")
+
+
+class QueryError(ValueError):
+    """Raised for invalid query parameters; returned to clients as a 400."""
+
+
+class DatasetIndex:
+    """The processed dataset indexed by series, reloaded when it changes."""
+
+    def __init__(
+        self,
+        data_path: str = DEFAULT_DATA_PATH,
+        cache_size: int = SETTINGS["cacheSize"],
+        check_interval: float = 1.0,
+    ):
+        self.data_path = data_path
+        self.cache_size = cache_size
+        self.check_interval = check_interval
+        self.version = 0
+        self.series = {}
+        self.options = {}
+        self._mtime = None
+        self._last_check = 0.0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        # Held by the one handler thread checking for and loading a new version
+        self._reload_lock = threading.Lock()
+        self.reload()
+
+    def reload(self) -> None:
+        """Loads the dataset and rebuilds the series index."""
+        mtime = os.path.getmtime(self.data_path)
+        df = load_data(self.data_path)
+        df["value"] = pd.to_numeric(df["value"], errors="coerce")
+
+        series = {}
+        grouped = df.sort_values("date").groupby(["group", "type"])
+        for (group, category), df_series in grouped:
+            df_series = df_series.reset_index(drop=True)
+            series[(group, category)] = (
+                df_series, df_series["date"].dt.year.to_numpy())
+
+        options = get_filter_options(df)
+        with self._lock:
+            self.series = series
+            self.options = {
+                "groups": options["groups"],
+                "categories": options["categories"],
+                "date_range": [int(year)
+                               for year in options["date_range"]],
+                "series": sorted(f"{group}|{category}"
+                                 for group, category in series),
+            }
+            self._mtime = mtime
+            self.version += 1
+            self._cache.clear()
+        logger.info("Loaded %s rows in %s series from %s (version %s)",
+                    len(df), len(series), self.data_path, self.version)
+
+    def reload_if_changed(self) -> None:
+        """Reloads the dataset if its file has changed.
+
+        The file is checked at most every `check_interval` seconds, by one
+        thread at a time; the others, and every request while a reload fails,
+        keep being served the version already loaded.
+        """
+        # pylint: disable-next=consider-using-with
+        if not self._reload_lock.acquire(blocking=False):
+            return
+        try:
+            now = time.monotonic()
+            if now - self._last_check < self.check_interval:
+                return
+            self._last_check = now
+            try:
+                changed = os.path.getmtime(self.data_path) != self._mtime
+            except OSError:
+                # Keep serving the loaded data while the file is replaced
+                return
+            if changed:
+                self.reload()
+        except Exception:  # pylint: disable=broad-except
+            # Retried at the next check, as the new mtime is not recorded
+            logger.exception("Could not reload %s; serving version %s",
+                             self.data_path, self.version)
+        finally:
+            self._reload_lock.release()
+
+    def query(
+        self,
+        group: str,
+        category: str,
+        start_year: int | None = None,
+        end_year: int | None = None,
+        weeks: bool = False,
+    ) -> dict:
+        """Returns one series as columns.
+
+        Queries are validated in the same way as by `utilities.filter_data`.
+
+        Raises:
+            QueryError: If the group, category or years are invalid, or no
+                data matches.
+        """
+        if group not in self.options["groups"]:
+            raise QueryError(f"Invalid group '{group}'. "
+                             f"Valid options: {self.options['groups']}")
+        if category not in self.options["categories"]:
+            raise QueryError(f"Invalid category '{category}'. "
+                             f"Valid options: {self.options['categories']}")
+
+        min_year, max_year = self.options["date_range"]
+        start_year = min_year if start_year is None else start_year
+        end_year = max_year if end_year is None else end_year
+        if start_year < min_year or start_year > max_year:
+            raise QueryError(f"Invalid start_year '{start_year}'. Must be an "
+                             f"integer between {min_year} and {max_year}")
+        if end_year < start_year:
+            raise QueryError(f"Invalid end_year '{end_year}'. Must be an "
+                             f"integer no earlier than {start_year}")
+        if (group, category) not in self.series:
+            raise QueryError(f"No data found for group={group}, "
+                             f"category={category}, date>={start_year}")
+
+        df_series, years = self.series[(group, category)]
+        lo, hi = np.searchsorted(years, [start_year, end_year + 1])
+        df = df_series.iloc[lo:hi].copy()
+        if df.empty:
+            raise QueryError(f"No data found for group={group}, "
+                             f"category={category}, date>={start_year}")
+
+        result = {
+            "group": group,
+            "type": category,
+            "start_year": start_year,
+            "end_year": end_year,
+            "date": df["date"].dt.strftime("%Y-%m-%d").tolist(),
+            "value": [None if np.isnan(value) else value
+                      for value in df["value"].tolist()],
+        }
+        if weeks:
+            df, month_weeks, month_labels = calculate_week_and_ticks(df)
+            result.update(
+                week=df["week"].tolist(),
+                year=df["year"].tolist(),
+                month_ticks={"tickvals": month_weeks,
+                             "ticktext": month_labels},
+            )
+        return result
+
+    def cached_response(self, path: str, params: dict) -> tuple[bytes, str]:
+        """Returns the JSON body and ETag for a request, using the cache."""
+        key = (self.version, path, tuple(sorted(params.items())))
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        if path == "/series":
+            payload = self.query(
+                params.get("group", "total"),
+                params.get("type", "prison"),
+                _int_param(params, "start_year"),
+                _int_param(params, "end_year"),
+                params.get("weeks", "0").lower() in ("1", "true", "yes"),
+            )
+        elif path == "/options":
+            payload = self.options
+        else:
+            raise KeyError(path)
+
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        # The ETag depends only on the body, so it survives reloads that leave
+        # a series unchanged
+        entry = (body, f'"{hashlib.sha1(body).hexdigest()[:16]}"')
+        with self._lock:
+            self._cache[key] = entry
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return entry
+
+
+def _int_param(params: dict, name: str) -> int | None:
+    """Parses an optional integer query parameter."""
+    if name not in params:
+        return None
+    try:
+        return int(params[name])
+    except ValueError as e:
+        raise QueryError(
+            f"Invalid {name} '{params[name]}'. Must be an integer") from e
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """Serves the endpoints of the `DatasetIndex` attached to the server."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes, which stall on Nagle's algorithm
+    # and delayed ACKs over keep-alive connections unless TCP_NODELAY is set
+    disable_nagle_algorithm = True
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Handles a GET request."""
+        index = self.server.index
+        url = urlparse(self.path)
+        params = {name: values[-1]
+                  for name, values in parse_qs(url.query).items()}
+
+        if url.path == "/health":
+            self._send_json(HTTPStatus.OK,
+                            {"status": "ok", "version": index.version})
+            return
+
+        index.reload_if_changed()
+        try:
+            body, etag = index.cached_response(url.path, params)
+        except QueryError as e:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+            return
+        except KeyError:
+            self._send_json(HTTPStatus.NOT_FOUND,
+                            {"error": f"Unknown path '{url.path}'"})
+            return
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Could not answer %s", self.path)
+            self._send_json(HTTPStatus.SERVICE_UNAVAILABLE,
+                            {"error": "The dataset could not be queried"})
+            return
+
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: HTTPStatus, payload: dict) -> None:
+        """Sends an uncached JSON response."""
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """Sends access logs to the module logger at debug level."""
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def make_server(
+    data_path: str = DEFAULT_DATA_PATH,
+    host: str = SETTINGS["host"],
+    port: int = SETTINGS["port"],
+) -> ThreadingHTTPServer:
+    """Creates the server with its dataset index loaded.
+
+    Port 0 picks a free port.
+    """
+    server = ThreadingHTTPServer((host, port), QueryHandler)
+    server.daemon_threads = True
+    server.index = DatasetIndex(data_path)
+    return server
+
+
+def main(
+    data_path: str = DEFAULT_DATA_PATH,
+    host: str = SETTINGS["host"],
+    port: int = SETTINGS["port"],
+) -> None:
+    """Serves queries until interrupted."""
+    server = make_server(data_path, host, port)
+    logger.info("Serving %s on http://%s:%s", data_path,
+                *server.server_address[:2])
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Query service stopped")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    main()
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Content-addressed store for raw bulletins.
+
+Bulletins are stored once per distinct content as `blobs/<aa>/<sha256>.ods`,
+so a file re-published under another URL or year folder is stored, and parsed,
+once. `index.json` maps each source (download URL, archive member or loose
+file path) to its blob hash, year and bulletin date, and lists each blob's
+size. Discovery reads the index instead of globbing `data/raw/`.
+
+Bulletins can be added from bytes, from loose files, or straight from a zip or
+tar archive without extracting it:
+
+    python -m src ingest backfill-2019.zip data/raw/
+    python -m src build --store
+"""
+
+import fnmatch
+import hashlib
+import json
+import logging
+import os
+import re
+import tarfile
+import zipfile
+from datetime import date, datetime
+
+from src.utilities import ensure_directory, read_config
+
+config = read_config()
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_DIR = config["data"]["storePath"]
+INDEX_FILENAME = "index.json"
+
+# Dates in bulletin filenames, e.g. prison-pop-16-dec-2024.ods,
+# population_19_July_2024.ods
+FILENAME_DATE_PATTERN = re.compile(
+    r"(\d{1,2})(?:st|nd|rd|th)?[-_ ]([A-Za-z]+)[-_ ](\d{4})")
+
+
+def bulletin_date_from_name(name: str) -> date | None:
+    """Returns the bulletin date in a filename, or None if it has none."""
+    matches = FILENAME_DATE_PATTERN.findall(os.path.basename(name))
+    for day, month, year in matches:
+        # Full ("July") or abbreviated ("dec", "Sept") month names
+        for date_format, month_name in (("%d %B %Y", month),
+                                        ("%d %b %Y", month[:3])):
+            try:
+                return datetime.strptime(f"{day} {month_name} {year}",
+                                         date_format).date()
+            except ValueError:
+                continue
+    return None
+
+
+def in_window(
+    bulletin_date: date | None,
+    since: date | None = None,
+    until: date | None = None,
+    years=None,
+    year: str | int | None = None,
+) -> bool:
+    """Returns whether a bulletin falls in a date window.
+
+    Bulletins without a date in their name are matched on their year folder if
+    it is known, and are otherwise included so that they are never silently
+    skipped.
+
+    Args:
+        bulletin_date (date, optional): Bulletin date from the filename or
+            store index.
+        since (date, optional): Earliest bulletin date to include.
+        until (date, optional): Latest bulletin date to include.
+        years (optional): Bulletin years to include.
+        year (optional): Year folder the bulletin was downloaded to, if known.
+    """
+    if bulletin_date is None:
+        if year is None:
+            return True
+        year = int(year)
+        return ((not years or year in years)
+                and (since is None or year >= since.year)
+                and (until is None or year <= until.year))
+    return ((not years or bulletin_date.year in years)
+            and (since is None or bulletin_date >= since)
+            and (until is None or bulletin_date <= until))
+
+
+def read_index(store_dir: str = DEFAULT_STORE_DIR) -> dict:
+    """Reads the store index, returning an empty one if the store is new."""
+    index_path = os.path.join(store_dir, INDEX_FILENAME)
+    if not os.path.exists(index_path):
+        return {"blobs": {}, "sources": {}}
+    with open(index_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_index(index: dict, store_dir: str = DEFAULT_STORE_DIR) -> None:
+    """Writes the store index atomically."""
+    ensure_directory(store_dir)
+    index_path = os.path.join(store_dir, INDEX_FILENAME)
+    with open(f"{index_path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=1)
+    os.replace(f"{index_path}.tmp", index_path)
+
+
+def blob_path(content_hash: str, store_dir: str = DEFAULT_STORE_DIR,
+              ext: str = ".ods") -> str:
+    """Returns the path of a blob."""
+    return os.path.join(store_dir, "blobs", content_hash[:2],
+                        f"{content_hash}{ext}")
+
+
+def add_bytes(
+    index: dict,
+    content: bytes,
+    source: str,
+    year: str | None = None,
+    url: str | None = None,
+    store_dir: str = DEFAULT_STORE_DIR,
+) -> tuple[str, bool]:
+    """Adds one bulletin to the store.
+
+    Its blob is only written if the content is new.
+
+    Args:
+        index (dict): Store index from `read_index`, updated in place.
+        content (bytes): The file content.
+        source (str): Where the file came from (URL, archive member or
+            path); its basename is used for the bulletin date.
+        year (str, optional): Publication year folder, if known.
+        url (str, optional): Download URL, if known.
+        store_dir (str): Store directory.
+
+    Returns:
+        tuple: (content hash, True if a new blob was written).
+    """
+    content_hash = hashlib.sha256(content).hexdigest()
+    ext = os.path.splitext(source)[1].lower() or ".ods"
+    path = blob_path(content_hash, store_dir, ext)
+
+    is_new = content_hash not in index["blobs"]
+    if is_new:
+        ensure_directory(os.path.dirname(path))
+        with open(path, "wb") as f:
+            f.write(content)
+        index["blobs"][content_hash] = {"size": len(content), "ext": ext}
+
+    bulletin_date = bulletin_date_from_name(source)
+    index["sources"][source] = {
+        "hash": content_hash,
+        "name": os.path.basename(source),
+        "url": url,
+        "year": year or (str(bulletin_date.year) if bulletin_date else None),
+        "bulletin_date": bulletin_date.isoformat() if bulletin_date else None,
+        "added_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    return content_hash, is_new
+
+
+def year_from_path(name: str) -> str | None:
+    """Returns the year folder in an archive member or file path, if any."""
+    parent = os.path.basename(os.path.dirname(name))
+    return parent if re.fullmatch(r"(19|20)\d{2}", parent) else None
+
+
+def _archive_members(archive_path: str, file_pattern: str):
+    """Yields (member name, content) for matching files in an archive.
+
+    Zip and tar archives are supported.
+    """
+    def matches(name):
+        return fnmatch.fnmatch(os.path.basename(name), file_pattern)
+
+    if zipfile.is_zipfile(archive_path):
+        with zipfile.ZipFile(archive_path) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and matches(info.filename):
+                    yield info.filename, archive.read(info)
+    elif tarfile.is_tarfile(archive_path):
+        with tarfile.open(archive_path) as archive:
+            for member in archive:
+                if member.isfile() and matches(member.name):
+                    yield member.name, archive.extractfile(member).read()
+    else:
+        raise ValueError(f"Unsupported archive '{archive_path}'. "
+                         "Expected a zip or tar file")
+
+
+def ingest(
+    paths: list[str],
+    store_dir: str = DEFAULT_STORE_DIR,
+    file_pattern: str = "*.ods",
+    urls: dict | None = None,
+) -> dict:
+    """Adds bulletins from archives, directories or single files to the store.
+
+    Archives are read member by member in memory; nothing is extracted to disk
+    apart from the blobs of new content.
+
+    Args:
+        paths (list[str]): Zip or tar archives, directories (searched
+            recursively) or individual files.
+        store_dir (str): Store directory.
+        file_pattern (str): Glob pattern for bulletin filenames.
+        urls (dict, optional): Download URL of each file path, recorded in
+            the index.
+
+    Returns:
+        dict: Counts of files read, new blobs written and duplicates skipped.
+    """
+    index = read_index(store_dir)
+    urls = urls or {}
+    counts = {"files": 0, "new": 0, "duplicates": 0}
+
+    def add(source, content, year):
+        _, is_new = add_bytes(index, content, source, year=year,
+                              url=urls.get(source), store_dir=store_dir)
+        counts["files"] += 1
+        counts["new" if is_new else "duplicates"] += 1
+
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, filenames in os.walk(path):
+                for filename in fnmatch.filter(filenames, file_pattern):
+                    file_path = os.path.join(root, filename)
+                    with open(file_path, "rb") as f:
+                        add(file_path, f.read(), year_from_path(file_path))
+        elif fnmatch.fnmatch(os.path.basename(path), file_pattern):
+            # Checked before archives, as .ods and .xlsx files are themselves
+            # zip files
+            with open(path, "rb") as f:
+                add(path, f.read(), year_from_path(path))
+        else:
+            for name, content in _archive_members(path, file_pattern):
+                add(f"{path}!{name}", content, year_from_path(name))
+
+    write_index(index, store_dir)
+    logger.info("Ingested %s files into %s: %s new, %s duplicates",
+                counts["files"], store_dir, counts["new"],
+                counts["duplicates"])
+    return counts
+
+
+def blob_dates(store_dir: str = DEFAULT_STORE_DIR) -> dict:
+    """Returns the latest bulletin date recorded for each blob.
+
+    Dates are given as 'YYYY-MM-DD'. Blobs whose sources have no date in their
+    names are left out.
+    """
+    dates = {}
+    for entry in read_index(store_dir)["sources"].values():
+        if entry["bulletin_date"]:
+            dates[entry["hash"]] = max(dates.get(entry["hash"], ""),
+                                       entry["bulletin_date"])
+    return dates
+
+
+def blob_paths(
+    store_dir: str = DEFAULT_STORE_DIR,
+    since: date | None = None,
+    until: date | None = None,
+    years=None,
+) -> list[str]:
+    """Returns the path of each distinct bulletin in the store.
+
+    Bulletins can be selected by bulletin date with since, until and years.
+
+    See `in_window` for how bulletins without a known date are treated.
+    """
+    index = read_index(store_dir)
+    selected = set()
+    for entry in index["sources"].values():
+        bulletin_date = (entry["bulletin_date"]
+                         and date.fromisoformat(entry["bulletin_date"]))
+        if in_window(bulletin_date or None, since, until, years,
+                     entry["year"]):
+            selected.add(entry["hash"])
+    return sorted(
+        blob_path(content_hash, store_dir, index["blobs"][content_hash]["ext"])
+        for content_hash in selected)
+
+
+def main(paths: list[str], store_dir: str = DEFAULT_STORE_DIR) -> dict:
+    """Ingests the given archives, directories or files."""
+    return ingest(paths, store_dir)
+
+
+if __name__ == "__main__":
+    import sys
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    main(sys.argv[1:])
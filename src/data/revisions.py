@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Deterministic deduplication and revision tracking across dataset builds.
+
+The same bulletin can be saved under two year folders (the downloader takes
+the year from the publication title or `public_updated_at`), and MoJ sometimes
+revises figures in later publications. `deduplicate` keeps one row per (date,
+group, type) using a fixed source-priority rule, and `diff_datasets`
+hash-joins the previous and new processed datasets on that key to find values
+that were revised or removed, which `append_revision_log` records in
+`revisions.csv`.
+"""
+
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from src.data import raw_store
+from src.utilities import resolve_engine
+
+logger = logging.getLogger(__name__)
+
+KEYS = ["date", "group", "type"]
+REVISION_COLUMNS = ["detected_at", "date", "group", "type", "old_value",
+                    "new_value", "change", "source"]
+
+
+def source_dates(sources) -> dict:
+    """Returns the bulletin date each source file is named for.
+
+    Dates are given as 'YYYY-MM-DD'. Raw-store blobs are named by content hash,
+    so they take the latest bulletin date recorded for their sources in the
+    store index. Sources without a known date get an empty string, which ranks
+    below every date.
+
+    Args:
+        sources: Source file paths.
+
+    Returns:
+        dict: Bulletin date for each source.
+    """
+    store_dates, dates = {}, {}
+    for source in sources:
+        path = Path(source)
+        if path.parent.parent.name == "blobs":
+            store_dir = str(path.parents[2])
+            if store_dir not in store_dates:
+                store_dates[store_dir] = raw_store.blob_dates(store_dir)
+            dates[source] = store_dates[store_dir].get(path.stem, "")
+        else:
+            bulletin_date = raw_store.bulletin_date_from_name(source)
+            dates[source] = bulletin_date.isoformat() if bulletin_date else ""
+    return dates
+
+
+def source_priority(df: pd.DataFrame) -> pd.DataFrame:
+    """Adds the columns used to rank duplicate rows by their source file.
+
+    Rows rank higher when the file's year folder matches the bulletin year,
+    then when the file is named for a later bulletin (a later re-publication),
+    and finally by path. Only the file names and the store index are used,
+    never file timestamps, so the same files always resolve the same way after
+    a clone, copy or re-download.
+
+    Args:
+        df (pd.DataFrame): Processed rows with a `source` column holding the
+            file path.
+
+    Returns:
+        pd.DataFrame: `df` with `year_match` and `source_date` columns added.
+    """
+    sources = pd.Series(df["source"].unique())
+    folder_years = dict(zip(sources,
+                            sources.map(lambda path: Path(path).parent.name)))
+    bulletin_years = pd.to_datetime(df["date"]).dt.year.astype(str)
+
+    return df.assign(
+        year_match=df["source"].map(folder_years) == bulletin_years,
+        source_date=df["source"].map(source_dates(sources)),
+    )
+
+
+def deduplicate(df: pd.DataFrame, engine: str | None = None) -> pd.DataFrame:
+    """Keeps one row per (date, group, type), preferring the best source.
+
+    Sources are ranked as `source_priority` describes.
+
+    Args:
+        df (pd.DataFrame): Processed rows with a `source` column holding the
+            file path.
+        engine (str, optional): "pandas" or "polars"; None uses the default
+            engine.
+
+    Returns:
+        pd.DataFrame: Deduplicated rows sorted by date, group and type.
+    """
+    if resolve_engine(engine) == "polars":
+        # pylint: disable-next=import-outside-toplevel
+        from src import polars_engine
+
+        # Ranked and de-duplicated in polars; pandas only takes the rows kept
+        deduplicated = df.iloc[
+            polars_engine.deduplicate_rows(df, KEYS, source_dates)]
+    else:
+        ranked = source_priority(df).sort_values(
+            KEYS + ["year_match", "source_date", "source"],
+            ascending=[True, True, True, False, False, True],
+        )
+        deduplicated = ranked.drop_duplicates(KEYS, keep="first").drop(
+            columns=["year_match", "source_date"])
+
+    n_dropped = len(df) - len(deduplicated)
+    if n_dropped:
+        logger.info("Dropped %s duplicate rows from %s files", n_dropped,
+                    df.drop(index=deduplicated.index)["source"].nunique())
+
+    return deduplicated.reset_index(drop=True)
+
+
+def diff_datasets(previous: pd.DataFrame,
+                  current: pd.DataFrame) -> pd.DataFrame:
+    """Finds values that changed or disappeared between two builds.
+
+    Args:
+        previous (pd.DataFrame): The previously saved processed dataset.
+        current (pd.DataFrame): The newly built dataset (may include a
+            `source` column).
+
+    Returns:
+        pd.DataFrame: One row per revised or removed value, with old and new
+            values.
+    """
+    def keyed(df):
+        return df.assign(
+            date=pd.to_datetime(df["date"]),
+            value=pd.to_numeric(df["value"],
+                                errors="coerce").astype("Float64"),
+        )
+
+    merged = keyed(previous).loc[:, KEYS + ["value"]].merge(
+        keyed(current).reindex(columns=KEYS + ["value", "source"]),
+        on=KEYS,
+        how="left",
+        suffixes=("_old", "_new"),
+        indicator=True,
+    )
+
+    removed = merged["_merge"] == "left_only"
+    both_missing = merged["value_old"].isna() & merged["value_new"].isna()
+    revised = ~removed & ~both_missing & (
+        merged["value_old"].isna() | merged["value_new"].isna()
+        | (merged["value_old"] != merged["value_new"]).fillna(False)
+    )
+
+    changes = merged[removed | revised].assign(
+        change=lambda x: x["_merge"].map(
+            {"left_only": "removed", "both": "revised"}).astype(str),
+    )
+    return (
+        changes
+        .rename(columns={"value_old": "old_value", "value_new": "new_value"})
+        .assign(detected_at=datetime.now().isoformat(timespec="seconds"))
+        .reindex(columns=REVISION_COLUMNS)
+        .reset_index(drop=True)
+    )
+
+
+def append_revision_log(revisions: pd.DataFrame, log_path: str) -> None:
+    """Appends revisions to the CSV revision log.
+
+    A header is written if the log is new.
+    """
+    if revisions.empty:
+        return
+    revisions.to_csv(log_path, mode="a", header=not os.path.exists(log_path),
+                     index=False)
+    logger.info("Recorded %s revised or removed values in %s", len(revisions),
+                log_path)
+
+
+def track_revisions(current: pd.DataFrame, previous: pd.DataFrame | None,
+                    log_path: str) -> pd.DataFrame:
+    """Diffs the new build against the saved dataset and logs any revisions.
+
+    Args:
+        current (pd.DataFrame): The newly built dataset.
+        previous (pd.DataFrame, optional): The dataset as last saved by the
+            selected backend, or None on the first build.
+        log_path (str): Path of the revision log CSV.
+
+    Returns:
+        pd.DataFrame: The revisions found (empty on the first build).
+    """
+    if previous is None:
+        return pd.DataFrame(columns=REVISION_COLUMNS)
+
+    revisions = diff_datasets(previous, current)
+    append_revision_log(revisions, log_path)
+    return revisions
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Publishes the processed dataset into shared memory for worker processes.
+
+The parent process loads the dataset once and copies each column into a
+`multiprocessing.shared_memory` block: dates as int64 nanoseconds, values as
+float64 (NaN for missing) and group/type as category codes in the smallest
+integer dtype that holds them (int8 up to 127 categories). Workers
+receive a small, picklable handle and attach to the blocks without copying or
+re-parsing the CSV, so memory and start-up time stay flat as the number of
+workers grows.
+
+Usage:
+    with shared_dataset(utils.load_data(path)) as handle:
+        with ProcessPoolExecutor(initializer=init_worker,
+                                 initargs=(handle,)) as executor:
+            ...  # workers call get_dataset()
+"""
+
+import logging
+import sys
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CATEGORICAL_COLUMNS = ("group", "type")
+# Category code dtypes, smallest first; -1 marks a missing value
+CODE_DTYPES = (np.int8, np.int16, np.int32, np.int64)
+
+# Blocks attached in this process, kept alive for as long as the arrays are in
+# use
+_ATTACHED: list[shared_memory.SharedMemory] = []
+_DATASET: pd.DataFrame | None = None
+
+
+def _column_arrays(df: pd.DataFrame) -> tuple[dict, dict]:
+    """Converts the dataset columns to fixed-width arrays and categories."""
+    arrays = {
+        "date": (pd.to_datetime(df["date"])
+                 .to_numpy(dtype="datetime64[ns]").view(np.int64)),
+        "value": (pd.to_numeric(df["value"], errors="coerce")
+                  .to_numpy(dtype=np.float64, na_value=np.nan)),
+    }
+    categories = {}
+    for column in CATEGORICAL_COLUMNS:
+        codes, uniques = pd.factorize(df[column], sort=True)
+        code_dtype = next(dtype for dtype in CODE_DTYPES
+                          if len(uniques) - 1 <= np.iinfo(dtype).max)
+        arrays[column] = codes.astype(code_dtype)
+        categories[column] = uniques.tolist()
+    return arrays, categories
+
+
+def publish_dataset(
+    df: pd.DataFrame,
+) -> tuple[dict, list[shared_memory.SharedMemory]]:
+    """Copies the dataset into shared memory blocks.
+
+    Args:
+        df (pd.DataFrame): Processed data with date, group, type and value
+            columns.
+
+    Returns:
+        tuple: (handle, blocks) where handle is the picklable description
+            passed to workers and blocks must be closed and unlinked by the
+            caller (see `release_dataset`, or use `shared_dataset`).
+    """
+    arrays, categories = _column_arrays(df)
+
+    handle = {"length": len(df), "columns": {}, "categories": categories}
+    blocks = []
+    for column, array in arrays.items():
+        block = shared_memory.SharedMemory(create=True,
+                                           size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[:] = array
+        handle["columns"][column] = (block.name, array.dtype.str)
+        blocks.append(block)
+
+    logger.info("Published %s rows (%s bytes) to shared memory", len(df),
+                sum(a.nbytes for a in arrays.values()))
+    return handle, blocks
+
+
+def release_dataset(blocks: list[shared_memory.SharedMemory]) -> None:
+    """Closes and frees the blocks created by `publish_dataset`."""
+    for block in blocks:
+        block.close()
+        block.unlink()
+
+
+@contextmanager
+def shared_dataset(df: pd.DataFrame):
+    """Publishes the dataset for the duration of a `with` block.
+
+    Yields the handle to pass to `init_worker`.
+    """
+    handle, blocks = publish_dataset(df)
+    try:
+        yield handle
+    finally:
+        release_dataset(blocks)
+
+
+def _attach_block(name: str) -> shared_memory.SharedMemory:
+    """Attaches to an existing block without taking ownership of it."""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # Pool workers share the parent's resource tracker, so registering the
+    # block again here is a no-op and the publishing process still owns the
+    # unlink
+    return shared_memory.SharedMemory(name=name)
+
+
+def attach_dataset(handle: dict) -> pd.DataFrame:
+    """Builds a read-only DataFrame backed directly by shared memory.
+
+    Args:
+        handle (dict): Handle returned by `publish_dataset`.
+
+    Returns:
+        pd.DataFrame: date, group, type and value columns; group and type are
+            categoricals and value is float64 with NaN for missing values.
+    """
+    arrays = {}
+    for column, (name, dtype) in handle["columns"].items():
+        block = _attach_block(name)
+        _ATTACHED.append(block)
+        array = np.ndarray((handle["length"],), dtype=np.dtype(dtype),
+                           buffer=block.buf)
+        array.flags.writeable = False
+        arrays[column] = array
+
+    columns = {"date": pd.Series(arrays["date"].view("datetime64[ns]"),
+                                 copy=False)}
+    for column in CATEGORICAL_COLUMNS:
+        columns[column] = pd.Series(
+            pd.Categorical.from_codes(
+                arrays[column], categories=handle["categories"][column]),
+            copy=False,
+        )
+    columns["value"] = pd.Series(arrays["value"], copy=False)
+    return pd.DataFrame(columns, copy=False)
+
+
+def init_worker(handle: dict) -> None:
+    """Process pool initializer: attaches the shared dataset per worker."""
+    global _DATASET  # pylint: disable=global-statement
+    _DATASET = attach_dataset(handle)
+
+
+def get_dataset() -> pd.DataFrame:
+    """Returns the dataset attached by `init_worker`.
+
+    Raises:
+        RuntimeError: If called in a process where `init_worker` has not run.
+    """
+    if _DATASET is None:
+        raise RuntimeError("No shared dataset attached. Start workers with "
+                           "initializer=init_worker.")
+    return _DATASET
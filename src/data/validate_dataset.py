@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Data quality checks run on the processed dataset during the build.
+
+Each check is a vectorised operation over the whole frame and returns one row
+per issue found:
+
+- duplicate (date, group, type) rows
+- gaps between consecutive bulletins longer than `maxGapDays`
+- component groups (male, female, youth) not summing to the total
+- week-on-week changes larger than `maxWeeklyPctChange` percent
+
+`validate` combines them into a machine-readable JSON report, and raises
+`DataValidationError` when the number of issues exceeds `maxIssues`. In
+incremental mode only issues on new dates are reported, with earlier rows used
+as context; `make_dataset.build_dataset` uses it whenever a dataset is already
+stored, passing the dates the build added, revised or rebuilt.
+"""
+
+import json
+import logging
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from src.utilities import read_config
+
+config = read_config()
+
+logger = logging.getLogger(__name__)
+
+SETTINGS = config["validation"]
+DEFAULT_REPORT_PATH = os.path.join(config["data"]["clnFilePath"],
+                                   "validation_report.json")
+
+KEYS = ["date", "group", "type"]
+ISSUE_COLUMNS = ["check", "date", "group", "type", "value", "detail"]
+COMPONENT_GROUPS = ["male", "female", "youth"]
+
+
+class DataValidationError(ValueError):
+    """Raised when the dataset has more issues than the threshold allows."""
+
+
+def _issues(df: pd.DataFrame, check: str, detail: pd.Series) -> pd.DataFrame:
+    """Formats the rows of `df` as issues of the given check."""
+    return (
+        df.assign(check=check, detail=detail.astype(str))
+        .reindex(columns=ISSUE_COLUMNS)
+        .reset_index(drop=True)
+    )
+
+
+def check_duplicates(df: pd.DataFrame) -> pd.DataFrame:
+    """Finds rows sharing a (date, group, type) key."""
+    duplicated = df[df.duplicated(KEYS, keep=False)]
+    counts = duplicated.groupby(KEYS)["value"].transform("size")
+    return _issues(duplicated, "duplicate_key",
+                   "rows with this key: " + counts.astype(str))
+
+
+def check_missing_weeks(
+    df: pd.DataFrame,
+    max_gap_days: int = SETTINGS["maxGapDays"],
+) -> pd.DataFrame:
+    """Finds gaps between consecutive dates of a series over `max_gap_days`."""
+    ordered = df.sort_values(KEYS)
+    gap = ordered.groupby(["group", "type"])["date"].diff().dt.days
+    flagged = gap > max_gap_days
+    return _issues(
+        ordered[flagged],
+        "missing_weeks",
+        gap[flagged].astype(int).astype(str) + " days since previous date",
+    )
+
+
+def check_group_totals(
+    df: pd.DataFrame,
+    tolerance: int = SETTINGS["totalTolerance"],
+) -> pd.DataFrame:
+    """Finds dates where the component groups do not sum to the total.
+
+    Only (date, type) pairs with a total and at least two component groups are
+    checked.
+    """
+    wide = df.pivot_table(index=["date", "type"], columns="group",
+                          values="value", aggfunc="last")
+    components = wide.reindex(columns=COMPONENT_GROUPS)
+    if "total" not in wide.columns:
+        return pd.DataFrame(columns=ISSUE_COLUMNS)
+
+    checked = (components.notna().sum(axis=1) >= 2) & wide["total"].notna()
+    difference = components.sum(axis=1) - wide["total"]
+    flagged = wide.loc[checked & (difference.abs() > tolerance), ["total"]]
+
+    differences = (difference[flagged.index].astype(int).astype(str)
+                   .reset_index(drop=True))
+    return _issues(
+        flagged.reset_index().rename(columns={"total": "value"})
+        .assign(group="total"),
+        "group_total_mismatch",
+        "components differ from total by " + differences,
+    )
+
+
+def check_weekly_jumps(
+    df: pd.DataFrame,
+    max_pct_change: float = SETTINGS["maxWeeklyPctChange"],
+) -> pd.DataFrame:
+    """Finds week-on-week changes larger than `max_pct_change` percent."""
+    ordered = df.sort_values(KEYS)
+    previous = ordered.groupby(["group", "type"])["value"].shift()
+    pct_change = (ordered["value"] - previous) / previous.abs() * 100
+    flagged = pct_change.abs() > max_pct_change
+    return _issues(
+        ordered[flagged],
+        "weekly_jump",
+        pct_change[flagged].astype(float).round(1).astype(str)
+        + "% change on previous week",
+    )
+
+
+def run_checks(df: pd.DataFrame) -> pd.DataFrame:
+    """Runs every check and returns all issues found."""
+    df = df.assign(
+        date=pd.to_datetime(df["date"]),
+        value=pd.to_numeric(df["value"], errors="coerce").astype(float),
+    )
+    issues = [
+        check_duplicates(df),
+        check_missing_weeks(df),
+        check_group_totals(df),
+        check_weekly_jumps(df),
+    ]
+    found = [issue for issue in issues if not issue.empty]
+    return pd.concat(found or [pd.DataFrame(columns=ISSUE_COLUMNS)],
+                     ignore_index=True)
+
+
+def validate(
+    df: pd.DataFrame,
+    new_dates=None,
+    parse_failures: list[str] | None = None,
+    report_path: str = DEFAULT_REPORT_PATH,
+    max_issues: int = SETTINGS["maxIssues"],
+) -> dict:
+    """Checks the dataset, writes a JSON report and enforces the threshold.
+
+    Args:
+        df (pd.DataFrame): Processed data with date, group, type and value
+            columns.
+        new_dates (optional): Dates added in this build. If given, only issues
+            on these dates are reported (incremental mode).
+        parse_failures (list[str], optional): Files that could not be parsed.
+        report_path (str): Where to write the JSON report.
+        max_issues (int): Largest number of issues that still passes.
+
+    Returns:
+        dict: The validation report.
+
+    Raises:
+        DataValidationError: If the number of issues exceeds `max_issues`.
+    """
+    if new_dates is not None:
+        new_dates = pd.to_datetime(pd.Series(new_dates)).unique()
+        # Earlier rows are only needed as context for gaps and week-on-week
+        # changes: each series keeps its last date before the new rows,
+        # however long ago that was
+        dates = pd.to_datetime(df["date"])
+        earlier = dates < new_dates.min()
+        last_earlier = (dates.where(earlier)
+                        .groupby([df["group"], df["type"]]).transform("max"))
+        df = df[~earlier | (dates == last_earlier)]
+
+    issues = run_checks(df)
+    if new_dates is not None:
+        issues = issues[issues["date"].isin(new_dates)]
+
+    parse_failures = parse_failures or []
+    counts = issues["check"].value_counts().to_dict()
+    if parse_failures:
+        counts["parse_failure"] = len(parse_failures)
+    n_issues = sum(counts.values())
+
+    report = {
+        "generated_at": datetime.now().isoformat(),
+        "mode": "incremental" if new_dates is not None else "full",
+        "rows_checked": len(df),
+        "max_issues": max_issues,
+        "n_issues": n_issues,
+        "passed": n_issues <= max_issues,
+        "issue_counts": counts,
+        "issues": json.loads(issues.to_json(orient="records",
+                                            date_format="iso")),
+        "parse_failures": parse_failures,
+    }
+
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    if not report["passed"]:
+        raise DataValidationError(
+            f"{n_issues} data quality issues found (threshold {max_issues}): "
+            f"{counts}. See {report_path}"
+        )
+    if n_issues:
+        logger.warning("%s data quality issues found: %s. See %s", n_issues,
+                       counts, report_path)
+    else:
+        logger.info("Data quality checks passed")
+    return report
@@ -4,20 +4,55 @@
 """
 A script to process and filter weekly data for prison population, operational capacity,
 and HDC caseload, ready for inclusion in weekly reports.
-This script loads the data from a CSV file, filters it to include only the most recent two weeks.
+This script loads the data from a CSV file, filters it to include only the
+most recent two weeks, and summarises every type and group in a single table
+that can be exported to Markdown, HTML or XLSX.
 """
 
+import importlib.util
+import logging
+import os
+
+import numpy as np
 import pandas as pd
 
+from src.query import Query
+from src.utilities import ensure_directory, read_config
+
+config = read_config()
+
+logger = logging.getLogger(__name__)
+
+# Order in which types appear in the weekly summary
+TYPE_ORDER = ["prison", "operational_capacity", "headroom", "hdc"]
+
 
 def load_data():
     """
-    Load the dataset from a CSV file and return it as a pandas DataFrame.
+    Load the processed dataset from whichever storage holds it and return it
+    as a pandas DataFrame.
     """
-    # Load the dataset
-    df = pd.read_csv("data/processed/processed_data.csv")
+    return Query().collect()
 
-    return df
+
+def load_recent_data(n_weeks=2, processed_dir=config['data']['clnFilePath']):
+    """
+    Load only the rows for the most recent `n_weeks` dates.
+
+    The date filter is pushed down to storage: the year-partitioned dataset is
+    read newest year first, which normally means opening a single file.
+
+    :param n_weeks: Number of most recent unique weeks (dates) to load.
+    :type n_weeks: int
+
+    :param processed_dir: Directory the dataset was built into.
+    :type processed_dir: str
+
+    :return: DataFrame containing only rows from the most recent `n_weeks`
+        dates.
+    :rtype: pandas.DataFrame
+    """
+    return Query.for_dir(processed_dir).last(n_weeks).collect()
 
 
 def filter_n_weeks(df, n_weeks=2):
@@ -34,7 +69,8 @@ def filter_n_weeks(df, n_weeks=2):
     :rtype: pandas.DataFrame
     """
 
-    filt = df['date'].unique()[-n_weeks:]
+    # Sort the unique dates rather than relying on the file being in date order
+    filt = np.sort(df['date'].unique())[-n_weeks:]
     return df[df['date'].isin(filt)]
 
 
@@ -80,42 +116,194 @@ def pivot_data(df, data_type: str):
     """
     # Pivot the DataFrame
     df_query = (
-        df
-        .query(f"type == '{data_type}'")
+        df[df['type'] == data_type]
         .pivot(index=['group'], columns=['date'], values='value')
         .sort_index(ascending=False, axis=1)
         )
     return df_query.sort_values(by=df_query.columns[0], ascending=False)
 
 
-def main():
+def summarise_weeks(df):
+    """
+    Pivot every type and group in one pass and add week-on-week changes.
+
+    Dates become columns (most recent first), followed by the absolute and
+    percentage change between the two most recent weeks. Rows are indexed by
+    type and group, with groups ordered by their latest value.
+
+    :param df: Input DataFrame containing 'date', 'group', 'type' and 'value'
+        columns.
+    :type df: pandas.DataFrame
+
+    :return: Summary DataFrame indexed by type and group.
+    :rtype: pandas.DataFrame
+    """
+    summary = df.pivot_table(index=['type', 'group'], columns='date',
+                             values='value', aggfunc='last')
+    summary = summary.sort_index(axis=1)
+    summary.columns.name = None
+
+    latest = summary.iloc[:, -1]
+    if summary.shape[1] >= 2:
+        previous = summary.iloc[:, -2]
+        change = latest - previous
+        pct_change = (change / previous * 100).round(1)
+    else:
+        change = pct_change = pd.Series(np.nan, index=summary.index)
+
+    summary = summary.iloc[:, ::-1].assign(change=change,
+                                           pct_change=pct_change)
+
+    # Order types consistently, then groups by their latest value
+    type_rank = summary.index.get_level_values('type').map(
+        {data_type: i for i, data_type in enumerate(TYPE_ORDER)}
+    ).fillna(len(TYPE_ORDER))
+    order = np.lexsort((-latest.to_numpy(dtype=float), type_rank.to_numpy()))
+    return summary.iloc[order]
+
+
+def _format_summary(summary):
     """
-    Main function to load, filter, and process the data.
+    Format summary values as display strings with thousands separators.
+
+    :param summary: Summary DataFrame from `summarise_weeks`.
+    :type summary: pandas.DataFrame
+
+    :return: DataFrame of formatted strings with type and group as columns.
+    :rtype: pandas.DataFrame
+    """
+    formatted = summary.copy()
+    value_formats = {'pct_change': "{:+.1f}%", 'change': "{:+,.0f}"}
+    for column in formatted.columns:
+        value_format = value_formats.get(column, "{:,.0f}")
+        formatted[column] = formatted[column].map(
+            lambda x, fmt=value_format: "" if pd.isna(x) else fmt.format(x))
+
+    formatted.columns = [
+        column if column in ('change', 'pct_change')
+        else pd.Timestamp(column).strftime("%d %b %Y")
+        for column in formatted.columns
+    ]
+    return formatted.rename(
+        columns={'change': 'Change', 'pct_change': '% change'}).reset_index()
+
+
+def to_markdown(summary):
+    """
+    Render the summary as a Markdown table.
+
+    :param summary: Summary DataFrame from `summarise_weeks`.
+    :type summary: pandas.DataFrame
+
+    :return: Markdown table.
+    :rtype: str
+    """
+    formatted = _format_summary(summary)
+    header = "| " + " | ".join(formatted.columns) + " |"
+    divider = "|" + "|".join(
+        "---" if column in ('type', 'group') else "---:"
+        for column in formatted.columns
+    ) + "|"
+    rows = ["| " + " | ".join(row) + " |"
+            for row in formatted.astype(str).itertuples(index=False)]
+    return "\n".join([header, divider, *rows]) + "\n"
+
+
+def export_summary(summary, output_dir=config['reports']['outPath'],
+                   formats=("md", "html"), filename="weekly_summary"):
+    """
+    Export the summary for the weekly briefing.
+
+    :param summary: Summary DataFrame from `summarise_weeks`.
+    :type summary: pandas.DataFrame
+
+    :param output_dir: Directory to write the exports to.
+    :type output_dir: str
+
+    :param formats: Any of 'md', 'html' and 'xlsx'; 'xlsx' requires openpyxl.
+    :type formats: tuple
+
+    :param filename: File name, without extension, for each export.
+    :type filename: str
+
+    :return: Paths of the files written.
+    :rtype: list
+
+    :raises ImportError: If 'xlsx' is requested and openpyxl is not installed.
+    """
+    # Checked before anything is written, so a failed export writes nothing
+    if "xlsx" in formats and importlib.util.find_spec("openpyxl") is None:
+        raise ImportError(
+            "Exporting the summary as xlsx requires openpyxl. "
+            "Install it with 'pip install openpyxl' or choose other formats."
+        )
+    ensure_directory(output_dir)
+    paths = []
+
+    for fmt in formats:
+        path = os.path.join(output_dir, f"{filename}.{fmt}")
+        if fmt == "md":
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(to_markdown(summary))
+        elif fmt == "html":
+            _format_summary(summary).to_html(path, index=False, border=0,
+                                             classes="weekly-summary")
+        elif fmt == "xlsx":
+            # Values are written unformatted so they stay numeric
+            export = summary.copy()
+            export.columns = [
+                column if column in ('change', 'pct_change')
+                else pd.Timestamp(column).date()
+                for column in export.columns
+            ]
+            export.to_excel(path, sheet_name="Weekly summary")
+        else:
+            raise ValueError(f"Unsupported export format '{fmt}'. "
+                             "Valid options: md, html, xlsx")
+
+        logger.info("Weekly summary exported to %s", path)
+        paths.append(path)
+
+    return paths
+
+
+def main(n_weeks=2, export_formats=None,
+         output_dir=config['reports']['outPath'],
+         processed_dir=config['data']['clnFilePath']):
+    """
+    Main function to load, filter, and summarise the data.
+
+    :param n_weeks: Number of most recent weeks to include.
+    :type n_weeks: int
+
+    :param export_formats: Formats to export the summary to (e.g. ('md',
+        'html')). Nothing is exported if None.
+    :type export_formats: tuple
+
+    :param output_dir: Directory the exported files are written to.
+    :type output_dir: str
+
+    :param processed_dir: Directory the dataset was built into.
+    :type processed_dir: str
+
+    :return: Summary DataFrame indexed by type and group.
+    :rtype: pandas.DataFrame
     """
     # Load the data
     df = (
-        load_data()
-        .pipe(filter_n_weeks, n_weeks=2)
+        load_recent_data(n_weeks=n_weeks, processed_dir=processed_dir)
         .pipe(drop_na)
         .pipe(float_to_int)
         )
 
-    # Pivot the DataFrame for each type
-    prison_df = pivot_data(df, 'prison')
-    operational_capacity_df = pivot_data(df, 'operational_capacity')
-    hdc_df = pivot_data(df, 'hdc')
+    summary = summarise_weeks(df)
+
+    if export_formats:
+        export_summary(summary, output_dir=output_dir, formats=export_formats)
 
-    return prison_df, operational_capacity_df, hdc_df
+    return summary
 
 
 if __name__ == "__main__":
-    # Run the main function
-    prison, operational_capacity, hdc = main()
-
-    # Print the results
-    print("Prison population:")
-    print(prison)
-    print("\nOperational Capacity:")
-    print(operational_capacity)
-    print("\nHDC caseload:")
-    print(hdc)
+    # Run the main function and print the results
+    print(to_markdown(main()))
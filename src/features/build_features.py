@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Builds the derived figures quoted in briefings from the processed dataset.
+
+For every (group, type) series this adds the year-over-year change and the
+rolling 4 and 13 week averages, and derives occupancy and headroom percentage
+series for each group that has both a population and an operational capacity.
+Everything is computed in one pass over the whole dataset and saved to
+`featuresFilePath`; on later runs only new weeks, and weeks whose values a
+bulletin has revised, are recomputed along with the later weeks whose figures
+depend on them.
+"""
+
+import logging
+import os
+
+import pandas as pd
+
+from src.utilities import CONFIG, load_data
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROCESSED_PATH = os.path.join(CONFIG['data']['clnFilePath'],
+                                      'processed_data.csv')
+DEFAULT_FEATURES_PATH = CONFIG['data']['featuresFilePath']
+
+KEYS = ["group", "type"]
+COLUMNS = ["date", "group", "type", "value"]
+ROLLING_WINDOWS = (4, 13)
+
+# Matching week a year earlier: 52 weeks back, allowing for bulletins
+# published a few days apart
+YEAR_OFFSET = pd.Timedelta(weeks=52)
+YEAR_TOLERANCE = pd.Timedelta(days=3)
+
+# History needed before the first new week to compute its year-over-year
+# and rolling figures
+LOOKBACK = (YEAR_OFFSET + YEAR_TOLERANCE
+            + pd.Timedelta(weeks=max(ROLLING_WINDOWS)))
+
+
+def derive_ratio_series(df: pd.DataFrame) -> pd.DataFrame:
+    """Derives occupancy and headroom percentages for each group and date.
+
+    Parameters:
+        df (pd.DataFrame): Processed data with date, group, type and value
+            columns.
+
+    Returns:
+        pd.DataFrame: Rows of type 'occupancy' and 'headroom_pct', as
+            percentages of operational capacity.
+    """
+    wide = df.pivot_table(index=["date", "group"], columns="type",
+                          values="value", aggfunc="last")
+    if not {"prison", "operational_capacity"}.issubset(wide.columns):
+        return pd.DataFrame(columns=COLUMNS)
+
+    capacity = wide["operational_capacity"].astype(float)
+    population = wide["prison"].astype(float)
+
+    ratios = pd.DataFrame({
+        "occupancy": population / capacity * 100,
+        "headroom_pct": (capacity - population) / capacity * 100,
+    }).dropna(how="all")
+
+    return (
+        ratios
+        .rename_axis(columns="type")
+        .stack()
+        .rename("value")
+        .reset_index()
+        .loc[:, COLUMNS]
+    )
+
+
+def build_features(df: pd.DataFrame) -> pd.DataFrame:
+    """Computes derived metrics for every series in a single vectorised pass.
+
+    Parameters:
+        df (pd.DataFrame): Processed data with date, group, type and value
+            columns.
+
+    Returns:
+        pd.DataFrame: One row per date, group and type with the original value
+            plus yoy_change, yoy_pct_change and rolling_<n>wk columns.
+    """
+    base = df.loc[:, COLUMNS].assign(
+        date=lambda x: pd.to_datetime(x["date"]),
+        value=lambda x: pd.to_numeric(x["value"],
+                                      errors="coerce").astype(float),
+    )
+
+    features = (
+        pd.concat([base, derive_ratio_series(base)], ignore_index=True)
+        .dropna(subset=["value"])
+        .sort_values(KEYS + ["date"])
+        .reset_index(drop=True)
+    )
+
+    # Rolling averages per series
+    grouped = features.groupby(KEYS, sort=False)["value"]
+    for window in ROLLING_WINDOWS:
+        features[f"rolling_{window}wk"] = (
+            grouped.rolling(window, min_periods=1).mean()
+            .reset_index(level=KEYS, drop=True)
+        )
+
+    # Year-over-year change against the nearest bulletin 52 weeks earlier
+    previous_year = features.loc[:, COLUMNS].rename(
+        columns={"date": "previous_date", "value": "previous_value"}
+    ).sort_values("previous_date")
+    features = pd.merge_asof(
+        features.assign(previous_date=features["date"] - YEAR_OFFSET)
+        .sort_values("previous_date"),
+        previous_year,
+        on="previous_date",
+        by=KEYS,
+        direction="nearest",
+        tolerance=YEAR_TOLERANCE,
+    )
+    features["yoy_change"] = features["value"] - features["previous_value"]
+    features["yoy_pct_change"] = (features["yoy_change"]
+                                  / features["previous_value"] * 100)
+
+    return (
+        features
+        .drop(columns=["previous_date", "previous_value"])
+        .sort_values(["date"] + KEYS)
+        .reset_index(drop=True)
+    )
+
+
+def revised_dates(df: pd.DataFrame, existing: pd.DataFrame) -> pd.Series:
+    """Returns the materialised dates whose processed values have changed.
+
+    Parameters:
+        df (pd.DataFrame): Processed data with date, group, type and value
+            columns.
+        existing (pd.DataFrame): The materialised features.
+
+    Returns:
+        pd.Series: Dates up to the last materialised date with a revised, added
+            or removed value.
+    """
+    current = df.loc[df["date"] <= existing["date"].max(), COLUMNS].assign(
+        value=lambda x: pd.to_numeric(x["value"],
+                                      errors="coerce").astype(float)
+    ).dropna(subset=["value"])
+    # Derived series are not in the processed data, so only compare the types
+    # that are stored there
+    stored = existing.loc[existing["type"].isin(df["type"].unique()), COLUMNS]
+
+    merged = current.merge(stored, on=["date"] + KEYS, how="outer",
+                           suffixes=("", "_stored"), indicator=True)
+    changed = ((merged["_merge"] != "both")
+               | (merged["value"] != merged["value_stored"]))
+    return merged.loc[changed, "date"].drop_duplicates()
+
+
+def update_features(
+    df: pd.DataFrame,
+    features_path: str = DEFAULT_FEATURES_PATH,
+) -> pd.DataFrame:
+    """Brings the materialised features up to date with the processed data.
+
+    Features are recomputed from the earliest new or revised date onwards,
+    since the rolling and year-over-year figures of later weeks depend on it,
+    using enough earlier history for their figures. If no features file exists
+    yet, every date is computed.
+
+    Parameters:
+        df (pd.DataFrame): Processed data with date, group, type and value
+            columns.
+        features_path (str): CSV file holding the materialised features.
+
+    Returns:
+        pd.DataFrame: The full, updated set of features.
+    """
+    df = df.assign(date=pd.to_datetime(df["date"]))
+
+    if not os.path.exists(features_path):
+        features = build_features(df)
+        logger.info("Built features for %s dates", features["date"].nunique())
+    else:
+        existing = pd.read_csv(features_path, parse_dates=["date"])
+        last_date = existing["date"].max()
+        new_dates = df.loc[df["date"] > last_date, "date"]
+        revised = revised_dates(df, existing)
+
+        if new_dates.empty and revised.empty:
+            logger.info("Features are up to date (last date %s)",
+                        last_date.date())
+            return existing
+
+        start = pd.concat([new_dates, revised]).min()
+        window = df[df["date"] >= start - LOOKBACK]
+        new_features = build_features(window)
+        new_features = new_features[new_features["date"] >= start]
+        features = pd.concat([existing[existing["date"] < start],
+                              new_features], ignore_index=True)
+        logger.info("Recomputed features for %s dates (%s revised, %s new)",
+                    new_features["date"].nunique(), len(revised),
+                    new_dates.nunique())
+
+    features.to_csv(features_path, index=False)
+    logger.info("Features saved to %s", features_path)
+    return features
+
+
+def main(
+    processed_path: str = DEFAULT_PROCESSED_PATH,
+    features_path: str = DEFAULT_FEATURES_PATH,
+) -> pd.DataFrame:
+    """Loads the processed data and updates the materialised features."""
+    return update_features(load_data(processed_path), features_path)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    main()
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Aligned year x week matrices for seasonal comparisons.
+
+Every (group, type) series is stored as a row of a years x 53 weeks array,
+using the same week numbering as `utilities.calculate_week_and_ticks` (week 1
+starts on 1 January). Cells without a bulletin are NaN. The matrices for all
+series share one 3-D array saved to `seasonalFilePath` at dataset-build time.
+Each build only writes the rows whose value differs from the saved matrix, and
+leaves the file untouched when none do, so year-over-year deltas,
+same-week-last-year lookups and overlay traces are array slices rather than
+groupbys over the dataset.
+"""
+
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.utilities import CONFIG
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MATRIX_PATH = CONFIG['data']['seasonalFilePath']
+N_WEEKS = 53
+
+
+def empty_matrix() -> dict:
+    """Returns a matrix with no series or years."""
+    return {
+        "keys": np.array([], dtype=str),
+        "years": np.array([], dtype=np.int16),
+        "values": np.empty((0, 0, N_WEEKS)),
+        "days": np.empty((0, 0, N_WEEKS), dtype=np.int16),
+    }
+
+
+def series_key(group: str, category: str) -> str:
+    """Returns the key used for a series in the matrix."""
+    return f"{group}|{category}"
+
+
+def week_of_year(dates: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """Returns the year and week number relative to 1 January for each date.
+
+    Parameters:
+        dates (pd.Series): Datetime values.
+
+    Returns:
+        tuple: (years, weeks) arrays, with weeks numbered 1 to 53.
+    """
+    day_of_year = dates.dt.dayofyear.to_numpy() - 1
+    return dates.dt.year.to_numpy(), day_of_year // 7 + 1
+
+
+def update_matrix(matrix: dict, df: pd.DataFrame) -> dict:
+    """Writes rows into the matrix, growing it for new series or years.
+
+    Parameters:
+        matrix (dict): Matrix from `empty_matrix` or `load_matrix`.
+        df (pd.DataFrame): Rows with date, group, type and value columns.
+
+    Returns:
+        dict: The updated matrix.
+    """
+    df = df.dropna(subset=["value"])
+    if df.empty:
+        return matrix
+
+    dates = pd.to_datetime(df["date"])
+    years, weeks = week_of_year(dates)
+    keys = (df["group"] + "|" + df["type"]).to_numpy(dtype=str)
+
+    # Grow the key and year axes to cover the new rows
+    all_keys = np.union1d(matrix["keys"], keys).astype(str)
+    all_years = np.arange(
+        min(years.min(), matrix["years"].min(initial=years.min())),
+        max(years.max(), matrix["years"].max(initial=years.max())) + 1,
+        dtype=np.int16,
+    )
+    if (len(all_keys) != len(matrix["keys"])
+            or len(all_years) != len(matrix["years"])):
+        values = np.full((len(all_keys), len(all_years), N_WEEKS), np.nan)
+        days = np.full(values.shape, -1, dtype=np.int16)
+        if matrix["keys"].size:
+            key_idx = np.searchsorted(all_keys, matrix["keys"])
+            year_idx = np.searchsorted(all_years, matrix["years"])
+            values[np.ix_(key_idx, year_idx)] = matrix["values"]
+            days[np.ix_(key_idx, year_idx)] = matrix["days"]
+        matrix = {"keys": all_keys, "years": all_years, "values": values,
+                  "days": days}
+
+    key_idx = np.searchsorted(matrix["keys"], keys)
+    year_idx = years - matrix["years"][0]
+    cells = (key_idx, year_idx, weeks - 1)
+    matrix["values"][cells] = pd.to_numeric(df["value"]).to_numpy(dtype=float)
+    matrix["days"][cells] = dates.dt.dayofyear.to_numpy() - 1
+    return matrix
+
+
+def build_matrix(df: pd.DataFrame) -> dict:
+    """Builds the matrix for every series in the dataset."""
+    return update_matrix(empty_matrix(), df)
+
+
+def save_matrix(matrix: dict, matrix_path: str = DEFAULT_MATRIX_PATH) -> None:
+    """Saves the matrix as an uncompressed .npz file."""
+    np.savez(matrix_path, **matrix)
+
+
+def load_matrix(matrix_path: str = DEFAULT_MATRIX_PATH) -> dict:
+    """Loads the matrix, returning an empty one if none has been saved."""
+    if not os.path.exists(matrix_path):
+        return empty_matrix()
+    with np.load(matrix_path) as data:
+        return {name: data[name] for name in data.files}
+
+
+def changed_rows(matrix: dict, df: pd.DataFrame) -> pd.DataFrame:
+    """Returns the rows whose value or bulletin day differs from the matrix.
+
+    Parameters:
+        matrix (dict): Matrix from `empty_matrix` or `load_matrix`.
+        df (pd.DataFrame): Rows with date, group, type and value columns.
+
+    Returns:
+        pd.DataFrame: Rows for new series, years or weeks, and revised values.
+    """
+    df = df.dropna(subset=["value"])
+    if df.empty or not matrix["keys"].size:
+        return df
+
+    dates = pd.to_datetime(df["date"])
+    years, weeks = week_of_year(dates)
+    keys = (df["group"] + "|" + df["type"]).to_numpy(dtype=str)
+
+    # Look every row up in the matrix, clipping rows outside it to a valid cell
+    key_idx = np.searchsorted(matrix["keys"], keys).clip(
+        max=len(matrix["keys"]) - 1)
+    year_idx = (years - matrix["years"][0]).clip(0, len(matrix["years"]) - 1)
+    known = ((matrix["keys"][key_idx] == keys)
+             & (matrix["years"][year_idx] == years))
+    cells = (key_idx, year_idx, weeks - 1)
+    same = (
+        known
+        & (matrix["values"][cells]
+           == pd.to_numeric(df["value"]).to_numpy(dtype=float))
+        & (matrix["days"][cells] == dates.dt.dayofyear.to_numpy() - 1)
+    )
+    return df[~same]
+
+
+def materialise(df: pd.DataFrame,
+                matrix_path: str = DEFAULT_MATRIX_PATH) -> dict:
+    """Writes changed rows into the saved matrix, creating it if needed.
+
+    The file is not rewritten when every row already matches the saved matrix.
+    """
+    matrix = load_matrix(matrix_path)
+    changed = changed_rows(matrix, df)
+    if changed.empty and os.path.exists(matrix_path):
+        logger.info("Seasonal matrix is up to date (%s)", matrix_path)
+        return matrix
+
+    matrix = update_matrix(matrix, changed)
+    save_matrix(matrix, matrix_path)
+    logger.info("Seasonal matrix (%s series, %s years, %s cells written) "
+                "saved to %s", len(matrix["keys"]), len(matrix["years"]),
+                len(changed), matrix_path)
+    return matrix
+
+
+def series_matrix(matrix: dict, group: str, category: str) -> pd.DataFrame:
+    """Returns the years x weeks values for one series.
+
+    Raises:
+        KeyError: If the series is not in the matrix.
+    """
+    key = series_key(group, category)
+    idx = np.searchsorted(matrix["keys"], key)
+    if idx >= len(matrix["keys"]) or matrix["keys"][idx] != key:
+        raise KeyError(f"Series '{key}' not found. "
+                       f"Valid options: {matrix['keys'].tolist()}")
+    return pd.DataFrame(
+        matrix["values"][idx],
+        index=pd.Index(matrix["years"], name="year"),
+        columns=pd.RangeIndex(1, N_WEEKS + 1, name="week"),
+    )
+
+
+def yoy_delta(matrix: dict, group: str, category: str,
+              pct: bool = False) -> pd.DataFrame:
+    """Returns each week's change on the same week of the previous year.
+
+    Parameters:
+        matrix (dict): The seasonal matrix.
+        group (str): The group (e.g., 'total', 'female').
+        category (str): The category (e.g., 'prison', 'hdc').
+        pct (bool): Return percentage rather than absolute changes.
+
+    Returns:
+        pd.DataFrame: Years x weeks changes; the first year is all NaN.
+    """
+    values = series_matrix(matrix, group, category)
+    previous = values.shift(1)
+    delta = values - previous
+    return delta / previous * 100 if pct else delta
+
+
+def same_week_last_year(matrix: dict, group: str, category: str,
+                        date) -> float:
+    """Returns the value for the same week number one year before `date`.
+
+    Returns NaN if there is no value for that week.
+    """
+    date = pd.Timestamp(date)
+    week = (date.dayofyear - 1) // 7 + 1
+    values = series_matrix(matrix, group, category)
+    if date.year - 1 not in values.index:
+        return np.nan
+    return float(values.at[date.year - 1, week])
+
+
+def overlay_traces(matrix: dict, group: str, category: str,
+                   start_year: int) -> list[dict]:
+    """Builds one trace dict per year from `start_year`.
+
+    The traces match those built by `utilities.generate_trace_data`.
+
+    Parameters:
+        matrix (dict): The seasonal matrix.
+        group (str): The group (e.g., 'total', 'female').
+        category (str): The category (e.g., 'prison', 'hdc').
+        start_year (int): First year to include.
+
+    Returns:
+        list[dict]: Scatter trace dicts with week numbers as x, ready for
+            `create_chart_figure`.
+    """
+    values = series_matrix(matrix, group, category).loc[start_year:]
+    idx = np.searchsorted(matrix["keys"], series_key(group, category))
+    days = matrix["days"][idx, np.searchsorted(matrix["years"], values.index)]
+    weeks = np.arange(1, N_WEEKS + 1)
+
+    traces = []
+    for (year, row), row_days in zip(values.iterrows(), days):
+        present = ~np.isnan(row.to_numpy())
+        if not present.any():
+            continue
+        dates = (pd.Timestamp(f"{year}-01-01")
+                 + pd.to_timedelta(row_days[present], unit="D"))
+        traces.append(dict(
+            type="scatter",
+            x=weeks[present],
+            y=row.to_numpy()[present],
+            mode="lines",
+            connectgaps=True,
+            hovertext=dates.strftime("%d %b").to_numpy(),
+            hovertemplate="<b>%{hovertext}</b><br>%{y:,.0f}",
+            name=str(year),
+        ))
+    return traces
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Projects the fitted population and capacity models forward.
+
+Uses the parameters cached by `train_model` to forecast each series and to find
+the first week in which projected population reaches projected operational
+capacity.
+"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+
+from src.models import train_model
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HORIZON_WEEKS = 156
+
+
+def predict(params: dict, dates) -> np.ndarray:
+    """Evaluates a fitted model at the given dates.
+
+    Parameters:
+        params (dict): Fitted parameters for one series from
+            `train_model.fit_series`.
+        dates: Dates to evaluate the model at.
+
+    Returns:
+        np.ndarray: Predicted values.
+    """
+    X = train_model.design_matrix(train_model.to_weeks(dates),
+                                  params["n_harmonics"])
+    return X @ np.asarray(params["coefficients"])
+
+
+def forecast_series(
+    params: dict,
+    horizon_weeks: int = DEFAULT_HORIZON_WEEKS,
+) -> pd.DataFrame:
+    """Forecasts a series weekly from the week after its last observation.
+
+    Parameters:
+        params (dict): Fitted parameters for one series.
+        horizon_weeks (int): Number of weeks to forecast.
+
+    Returns:
+        pd.DataFrame: Forecast dates with value, lower and upper (approximate
+            95% band) columns.
+    """
+    dates = pd.date_range(
+        pd.Timestamp(params["last_date"]) + pd.Timedelta(weeks=1),
+        periods=horizon_weeks, freq="7D"
+    )
+    values = predict(params, dates)
+    band = 1.96 * params["residual_std"]
+    return pd.DataFrame({"date": dates, "value": values,
+                         "lower": values - band, "upper": values + band})
+
+
+def project_capacity_crossing(
+    params: dict,
+    group: str = "total",
+    horizon_weeks: int = DEFAULT_HORIZON_WEEKS,
+) -> pd.Timestamp | None:
+    """Finds the first forecast week in which population reaches capacity.
+
+    Parameters:
+        params (dict): Fitted parameters for all series, keyed by
+            `train_model.series_key`.
+        group (str): The group to project (e.g., 'total', 'male').
+        horizon_weeks (int): Number of weeks to look ahead.
+
+    Returns:
+        pd.Timestamp | None: Date of the first crossing, or None if population
+            stays below capacity over the horizon.
+
+    Raises:
+        KeyError: If either series has not been fitted for the group.
+    """
+    population = params[train_model.series_key(group, "prison")]
+    capacity = params[train_model.series_key(group, "operational_capacity")]
+
+    # Project both series over the same weeks, starting after the later last
+    # observation
+    start = max(pd.Timestamp(population["last_date"]),
+                pd.Timestamp(capacity["last_date"]))
+    dates = pd.date_range(start + pd.Timedelta(weeks=1),
+                          periods=horizon_weeks, freq="7D")
+    crossed = predict(population, dates) >= predict(capacity, dates)
+
+    if not crossed.any():
+        return None
+    return dates[np.argmax(crossed)]
+
+
+def main(horizon_weeks: int = DEFAULT_HORIZON_WEEKS) -> dict:
+    """Refits changed series and logs projected capacity crossings by group."""
+    params = train_model.main()
+
+    groups = sorted({key.split("|")[0] for key in params})
+    crossings = {}
+    for group in groups:
+        try:
+            crossings[group] = project_capacity_crossing(params, group,
+                                                         horizon_weeks)
+        except KeyError:
+            continue
+        if crossings[group] is None:
+            logger.info("%s: population stays below operational capacity "
+                        "over %s weeks", group, horizon_weeks)
+        else:
+            logger.info("%s: population projected to reach operational "
+                        "capacity w/c %s", group,
+                        crossings[group].strftime("%d %B %Y"))
+    return crossings
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    main()
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Fits trend and seasonal forecasting models to the population and capacity
+series.
+
+Each (group, type) series gets a least-squares fit of a linear trend plus
+annual Fourier terms over its recent history. Fitted parameters are cached in
+JSON keyed on a hash of the series data, so a nightly run only refits series
+whose data has changed since the last run. When fits run in worker processes,
+the series to fit are published once with `shared_dataset` and each task only
+names the rows it fits.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.data import shared_dataset
+from src.utilities import (CONFIG, ensure_directory, get_log_queue, load_data,
+                           log_context, worker_logging)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROCESSED_PATH = os.path.join(CONFIG['data']['clnFilePath'],
+                                      'processed_data.csv')
+DEFAULT_PARAMS_PATH = os.path.join(CONFIG['models']['outPath'],
+                                   'forecast_params.json')
+
+# Series to model
+MODEL_TYPES = ("prison", "operational_capacity")
+
+WEEKS_PER_YEAR = 365.25 / 7
+N_HARMONICS = 2  # Number of annual Fourier harmonics
+FIT_YEARS = 5  # Years of history used for each fit
+EPOCH = pd.Timestamp("2000-01-01")
+
+
+def series_key(group: str, category: str) -> str:
+    """Returns the cache key for a series."""
+    return f"{group}|{category}"
+
+
+def series_hash(df_series: pd.DataFrame) -> str:
+    """Hashes the dates and values of a series so changes can be detected.
+
+    Parameters:
+        df_series (pd.DataFrame): Rows for one series with date and value
+            columns.
+
+    Returns:
+        str: Hex digest of the series data.
+    """
+    dates = (pd.to_datetime(df_series["date"])
+             .to_numpy(dtype="datetime64[D]").astype(np.int64))
+    values = (pd.to_numeric(df_series["value"], errors="coerce")
+              .to_numpy(dtype=float))
+    digest = hashlib.sha256()
+    digest.update(dates.tobytes())
+    digest.update(values.tobytes())
+    return digest.hexdigest()
+
+
+def design_matrix(weeks: np.ndarray,
+                  n_harmonics: int = N_HARMONICS) -> np.ndarray:
+    """Builds the trend and seasonal regressors for the given week offsets.
+
+    Parameters:
+        weeks (np.ndarray): Weeks since `EPOCH`.
+        n_harmonics (int): Number of annual Fourier harmonics.
+
+    Returns:
+        np.ndarray: Matrix with columns
+            [1, t, sin_1, cos_1, ..., sin_k, cos_k].
+    """
+    columns = [np.ones_like(weeks), weeks]
+    for k in range(1, n_harmonics + 1):
+        angle = 2 * np.pi * k * weeks / WEEKS_PER_YEAR
+        columns.extend([np.sin(angle), np.cos(angle)])
+    return np.column_stack(columns)
+
+
+def to_weeks(dates) -> np.ndarray:
+    """Converts dates to fractional weeks since `EPOCH`."""
+    weeks = (pd.to_datetime(dates) - EPOCH) / pd.Timedelta(weeks=1)
+    return weeks.to_numpy(dtype=float)
+
+
+def fit_series(dates: np.ndarray, values: np.ndarray,
+               n_harmonics: int = N_HARMONICS) -> dict:
+    """Fits the trend and seasonal model to a single series.
+
+    Parameters:
+        dates (np.ndarray): Observation dates.
+        values (np.ndarray): Observed values.
+        n_harmonics (int): Number of annual Fourier harmonics.
+
+    Returns:
+        dict: Fitted coefficients, residual standard deviation and fit
+            metadata.
+    """
+    weeks = to_weeks(dates)
+    # Drop the seasonal terms when there is less than two years of data to
+    # fit them
+    if weeks.max() - weeks.min() < 2 * WEEKS_PER_YEAR:
+        n_harmonics = 0
+
+    X = design_matrix(weeks, n_harmonics)
+    coefficients, *_ = np.linalg.lstsq(X, values, rcond=None)
+    residuals = values - X @ coefficients
+    dof = max(len(values) - X.shape[1], 1)
+
+    return {
+        "coefficients": coefficients.tolist(),
+        "n_harmonics": n_harmonics,
+        "residual_std": float(np.sqrt(residuals @ residuals / dof)),
+        "n_obs": int(len(values)),
+        "last_date": pd.Timestamp(dates.max()).strftime("%Y-%m-%d"),
+    }
+
+
+def _fit_task(task: tuple) -> tuple:
+    """Fits one series, returned with its key."""
+    key, data_hash, dates, values = task
+    params = fit_series(dates, values)
+    params["data_hash"] = data_hash
+    return key, params
+
+
+def _init_fit_worker(log_queue, context: dict, handle: dict) -> None:
+    """Process pool initializer: sets up logging and attaches the series."""
+    worker_logging(log_queue, context)
+    shared_dataset.init_worker(handle)
+
+
+def _fit_shared_task(task: tuple) -> tuple:
+    """Process pool entry point: fits the shared rows start:stop."""
+    key, data_hash, start, stop = task
+    rows = shared_dataset.get_dataset().iloc[start:stop]
+    return _fit_task((key, data_hash, rows["date"].to_numpy(),
+                      rows["value"].to_numpy()))
+
+
+def load_params(params_path: str = DEFAULT_PARAMS_PATH) -> dict:
+    """Loads cached model parameters, returning an empty dict if none exist."""
+    if not os.path.exists(params_path):
+        return {}
+    with open(params_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_params(params: dict, params_path: str = DEFAULT_PARAMS_PATH) -> None:
+    """Saves model parameters to the JSON cache."""
+    ensure_directory(os.path.dirname(params_path))
+    with open(params_path, "w", encoding="utf-8") as f:
+        json.dump(params, f, indent=2)
+
+
+def train_models(
+    df: pd.DataFrame,
+    params_path: str = DEFAULT_PARAMS_PATH,
+    model_types: tuple = MODEL_TYPES,
+    max_workers: int | None = 1,
+) -> dict:
+    """Fits models for every series of the given types.
+
+    Only series whose data has changed since they were cached are refitted.
+
+    Parameters:
+        df (pd.DataFrame): Processed data with date, group, type and value
+            columns.
+        params_path (str): JSON cache of fitted parameters.
+        model_types (tuple): Types to model (e.g., 'prison',
+            'operational_capacity').
+        max_workers (int, optional): Worker processes used for fitting. 1 fits
+            in-process; None uses one per CPU.
+
+    Returns:
+        dict: Fitted parameters for every modelled series, keyed by
+            `series_key`.
+    """
+    cached = load_params(params_path)
+    df = df.assign(
+        date=pd.to_datetime(df["date"]),
+        value=pd.to_numeric(df["value"], errors="coerce"),
+    ).dropna(subset=["value"])
+    df = df[df["type"].isin(model_types)]
+
+    params, tasks = {}, []
+    series = df.sort_values("date").groupby(["group", "type"])
+    for (group, category), df_series in series:
+        # Restrict each fit to recent history so the trend reflects current
+        # conditions
+        cutoff = df_series["date"].max() - pd.DateOffset(years=FIT_YEARS)
+        df_series = df_series[df_series["date"] > cutoff]
+
+        key = series_key(group, category)
+        data_hash = series_hash(df_series)
+        if cached.get(key, {}).get("data_hash") == data_hash:
+            params[key] = cached[key]
+            continue
+        tasks.append((key, data_hash, df_series))
+
+    if max_workers == 1 or len(tasks) <= 1:
+        results = [
+            _fit_task((key, data_hash, df_series["date"].to_numpy(),
+                       df_series["value"].to_numpy(dtype=float)))
+            for key, data_hash, df_series in tasks
+        ]
+    else:
+        # Workers attach to one shared copy of the series, so each task only
+        # pickles the position of its rows
+        fit_data = pd.concat([df_series for *_, df_series in tasks],
+                             ignore_index=True)
+        stops = np.cumsum([len(df_series) for *_, df_series in tasks])
+        shared_tasks = [
+            (key, data_hash, stop - len(df_series), stop)
+            for (key, data_hash, df_series), stop in zip(tasks, stops)
+        ]
+        with shared_dataset.shared_dataset(fit_data) as handle:
+            with ProcessPoolExecutor(
+                max_workers=max_workers,
+                initializer=_init_fit_worker,
+                initargs=(get_log_queue(), log_context(), handle),
+            ) as executor:
+                results = list(executor.map(_fit_shared_task, shared_tasks))
+
+    params.update(results)
+    logger.info("Fitted %s series (%s unchanged)", len(tasks),
+                len(params) - len(tasks))
+
+    save_params(params, params_path)
+    return params
+
+
+def main(
+    processed_path: str = DEFAULT_PROCESSED_PATH,
+    params_path: str = DEFAULT_PARAMS_PATH,
+) -> dict:
+    """Loads the processed data and refits any series that have changed."""
+    return train_models(load_data(processed_path), params_path,
+                        max_workers=None)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Polars implementations of the dataset's hot dataframe operations.
+
+`utilities.calculate_week_and_ticks` and `revisions.deduplicate` dispatch here
+when the polars engine is selected (`engine: polars` in config.yaml,
+`--engine polars`, or `engine="polars"`). The date arithmetic, sorts and
+de-duplication run multithreaded over Arrow columns; results are returned as
+pandas objects identical to the pandas engine's, so callers do not change.
+Where a result must keep the input's index or dtypes, polars only computes
+which rows to take and pandas takes them.
+
+Filtering one series and pivoting the latest weeks stay in pandas with either
+engine: they touch few rows, so converting the frame to polars for each call
+costs more than the operation saves.
+
+polars and pyarrow are an optional extra, not part of the pinned environment:
+install them with `pip install -e ".[polars]"`. Compare both engines with
+`python -m src.data.benchmark_engines`.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import polars as pl
+
+ROW_INDEX = "_row"
+
+
+def to_polars(df: pd.DataFrame, columns: list[str]) -> pl.DataFrame:
+    """Converts the given columns to polars, adding the row positions."""
+    return pl.from_pandas(df.loc[:, columns]).with_row_index(ROW_INDEX)
+
+
+def calculate_week_and_ticks(df: pd.DataFrame) -> tuple:
+    """Adds week, month and year columns to `df`.
+
+    Returns:
+        tuple: (df, month tick positions, month tick labels).
+    """
+    df["date"] = pd.to_datetime(df["date"])
+    dates = pl.from_pandas(df["date"])
+
+    columns = pl.DataFrame({"date": dates}).select(
+        week=((pl.col("date").dt.ordinal_day() - 1) // 7 + 1).cast(pl.Int64),
+        month=pl.col("date").dt.month().cast(pl.Int32),
+        year=pl.col("date").dt.year().cast(pl.Int32),
+        label=pl.col("date").dt.strftime("%b"),
+    )
+    df["week"] = columns["week"].to_numpy()
+    df["month"] = columns["month"].to_numpy()
+    df["year"] = columns["year"].to_numpy()
+
+    # First week number for each month, and the month labels in order of
+    # appearance
+    month_weeks = (
+        columns.group_by("month", maintain_order=True)
+        .agg(pl.col("week").first())
+        .sort("month")["week"]
+        .to_list()
+    )
+    month_labels = columns["label"].unique(maintain_order=True).to_list()
+    return df, month_weeks, month_labels
+
+
+def deduplicate_rows(df: pd.DataFrame, keys: list[str],
+                     source_dates) -> np.ndarray:
+    """Returns the position of the row kept for each key.
+
+    Rows are ranked as `revisions.source_priority` ranks them: higher when the
+    source file's year folder matches the row's year, then by the bulletin date
+    the file is named for (latest first), then by path. The positions are
+    ordered by key, as `revisions.deduplicate` orders its result.
+
+    Args:
+        df (pd.DataFrame): Rows with the key columns and a `source` column.
+        keys (list[str]): Columns identifying a row (date first).
+        source_dates (callable): Returns the bulletin date of each of a list of
+            sources, as `revisions.source_dates` does.
+    """
+    if df.empty:
+        return np.array([], dtype=np.intp)
+
+    frame = to_polars(df, keys + ["source"])
+    # File names are parsed once per source, not per row
+    sources = frame.get_column("source").unique().to_list()
+    folders = {source: Path(source).parent.name for source in sources}
+    # Dates may still be ISO strings, as `revisions.source_priority` accepts
+    date = pl.col(keys[0])
+    if frame.schema[keys[0]] == pl.String:
+        date = date.str.to_date()
+
+    return (
+        frame.with_columns(
+            year_match=pl.col("source").replace_strict(
+                folders, return_dtype=pl.String)
+            == date.dt.year().cast(pl.String),
+            source_date=pl.col("source").replace_strict(
+                source_dates(sources), return_dtype=pl.String),
+        )
+        .sort(keys + ["year_match", "source_date", "source"],
+              descending=[False] * len(keys) + [True, True, False],
+              maintain_order=True)
+        .unique(subset=keys, keep="first", maintain_order=True)
+        .get_column(ROW_INDEX)
+        .to_numpy()
+    )
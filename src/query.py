@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Lazy queries over the processed dataset with predicate pushdown.
+
+Consumers otherwise read the whole processed CSV and filter it in pandas. A
+`Query` records what is wanted (series, date window, most recent dates,
+columns, aggregation, week alignment) and reads nothing until `collect`, when
+the filters are pushed down to whichever storage holds the dataset:
+
+- partitions: only the yearly files whose date range and recorded groups and
+  types can match are opened, and only the needed columns are parsed;
+- sqlite: the filters become a `WHERE` clause on the indexed `population`
+  table;
+- csv: the full CSV is streamed in chunks, keeping only matching rows and
+  columns.
+
+    from src.query import Query
+
+    df = Query().series("total", "prison").years(2021).collect()
+    df = Query().last(2).collect()
+    df = Query().series(category="hdc").aggregate("YS", "max").collect()
+    print(Query().series("female").years(2023).explain())
+"""
+
+import logging
+import os
+
+import pandas as pd
+
+from src.data import database, partitions
+from src.utilities import CONFIG, calculate_week_and_ticks
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ["date", "group", "type", "value"]
+SOURCES = ("auto", "partitions", "sqlite", "csv")
+DEFAULT_CSV_PATH = os.path.join(CONFIG['data']['clnFilePath'],
+                                "processed_data.csv")
+CSV_CHUNK_ROWS = 100_000
+
+
+def _as_list(value) -> list | None:
+    """Returns a filter value as a list (None means no filter)."""
+    if value is None:
+        return None
+    return [value] if isinstance(value, str) else list(value)
+
+
+class Query:
+    """A lazy, immutable query plan over the processed dataset.
+
+    Each builder method returns a new `Query`, so plans can be shared and
+    extended.
+
+    Parameters:
+        source (str): "partitions", "sqlite", "csv", or "auto" to use
+            whichever of them was written most recently (the partitions,
+            then the CSV, on a tie).
+        csv_path (str): Path of the processed CSV.
+        partition_dir (str): Directory of the yearly partitions.
+        db_path (str): Path of the SQLite database.
+    """
+
+    def __init__(
+        self,
+        source: str = "auto",
+        csv_path: str = DEFAULT_CSV_PATH,
+        partition_dir: str = partitions.DEFAULT_PARTITION_DIR,
+        db_path: str = database.DEFAULT_DB_PATH,
+    ):
+        if source not in SOURCES:
+            raise ValueError(f"Invalid source '{source}'. "
+                             f"Valid options: {list(SOURCES)}")
+        self.source = source
+        self.csv_path = csv_path
+        self.partition_dir = partition_dir
+        self.db_path = db_path
+        self.groups = None
+        self.types = None
+        self.start_date = None
+        self.end_date = None
+        self.n_dates = None
+        self.columns = None
+        self.aggregation = None
+        self.align_weeks = False
+
+    @classmethod
+    def for_dir(cls, processed_dir: str, source: str = "auto") -> "Query":
+        """Returns a query over the dataset built into `processed_dir`.
+
+        The partitions and database are looked up where `make_dataset` writes
+        them for that directory.
+        """
+        # Imported here so reading the dataset does not load the build modules
+        # pylint: disable-next=import-outside-toplevel
+        from src.data.make_dataset import output_path
+
+        return cls(
+            source,
+            csv_path=os.path.join(processed_dir, "processed_data.csv"),
+            partition_dir=str(output_path(
+                processed_dir, partitions.DEFAULT_PARTITION_DIR)),
+            db_path=str(output_path(processed_dir, database.DEFAULT_DB_PATH)),
+        )
+
+    def _with(self, **changes) -> "Query":
+        """Returns a copy of the plan with some steps changed."""
+        query = object.__new__(Query)
+        query.__dict__.update(self.__dict__, **changes)
+        return query
+
+    # Plan steps
+
+    def series(self, group=None, category=None) -> "Query":
+        """Keeps the given group(s) and type(s), each a string or a list."""
+        return self._with(groups=_as_list(group), types=_as_list(category))
+
+    def between(self, start_date=None, end_date=None) -> "Query":
+        """Keeps dates in an inclusive window.
+
+        The bounds are given as 'YYYY-MM-DD' strings or dates.
+        """
+        def as_string(value):
+            return (None if value is None
+                    else pd.Timestamp(value).strftime("%Y-%m-%d"))
+
+        return self._with(start_date=as_string(start_date),
+                          end_date=as_string(end_date))
+
+    def years(self, start_year: int | None = None,
+              end_year: int | None = None) -> "Query":
+        """Keeps whole years, from `start_year` to `end_year` inclusive."""
+        return self.between(
+            None if start_year is None else f"{start_year}-01-01",
+            None if end_year is None else f"{end_year}-12-31",
+        )
+
+    def last(self, n_dates: int) -> "Query":
+        """Keeps the most recent `n_dates` dates (after the other filters)."""
+        return self._with(n_dates=n_dates)
+
+    def select(self, *columns: str) -> "Query":
+        """Keeps only the given columns of the result."""
+        unknown = [column for column in columns if column not in COLUMNS]
+        if unknown:
+            raise ValueError(f"Invalid columns {unknown}. "
+                             f"Valid options: {COLUMNS}")
+        return self._with(columns=list(columns))
+
+    def aggregate(self, freq: str, how: str = "mean") -> "Query":
+        """Resamples each series to a pandas frequency, e.g. 'MS' or 'YS'.
+
+        Values in each period are combined with `how`.
+        """
+        return self._with(aggregation=(freq, how))
+
+    def weeks(self) -> "Query":
+        """Adds week, month and year columns aligned to each January 1."""
+        return self._with(align_weeks=True)
+
+    # Execution
+
+    def resolve_source(self) -> str:
+        """Returns the storage the query will read from."""
+        if self.source != "auto":
+            return self.source
+        # A build only writes the backend it was run with, so after a
+        # switch of backend the other storage holds stale data
+        stored = {
+            "partitions": os.path.join(self.partition_dir,
+                                       partitions.INDEX_FILENAME),
+            "csv": self.csv_path,
+            "sqlite": self.db_path,
+        }
+        written = {source: os.path.getmtime(path)
+                   for source, path in stored.items()
+                   if os.path.exists(path)}
+        if not written:
+            return "csv"
+        return max(written, key=written.get)
+
+    def _read_columns(self) -> list[str]:
+        """Returns the columns the reader must parse.
+
+        These are the selected columns plus those filtered on.
+        """
+        if self.columns is None or self.aggregation or self.align_weeks:
+            return COLUMNS
+        needed = set(self.columns) | {"date"}
+        if self.groups is not None:
+            needed.add("group")
+        if self.types is not None:
+            needed.add("type")
+        return [column for column in COLUMNS if column in needed]
+
+    def _mask(self, df: pd.DataFrame) -> pd.Series:
+        """Returns the rows of a chunk passing the series and date filters."""
+        mask = pd.Series(True, index=df.index)
+        if self.groups is not None:
+            mask &= df["group"].isin(self.groups)
+        if self.types is not None:
+            mask &= df["type"].isin(self.types)
+        if self.start_date is not None:
+            mask &= df["date"] >= pd.Timestamp(self.start_date)
+        if self.end_date is not None:
+            mask &= df["date"] <= pd.Timestamp(self.end_date)
+        return mask
+
+    def _partition_entries(self) -> list[dict]:
+        """Returns the partitions that can hold matching rows, newest first."""
+        entries = []
+        index = partitions.read_index(self.partition_dir)
+        for _, entry in sorted(index.items(), reverse=True):
+            if (self.start_date is not None
+                    and entry["max_date"] < self.start_date):
+                continue
+            if self.end_date is not None and entry["min_date"] > self.end_date:
+                continue
+            # Indexes written before the groups and types were recorded cannot
+            # be pruned on them
+            if (self.groups is not None and "groups" in entry
+                    and not set(self.groups) & set(entry["groups"])):
+                continue
+            if (self.types is not None and "types" in entry
+                    and not set(self.types) & set(entry["types"])):
+                continue
+            entries.append(entry)
+        return entries
+
+    def _read_partitions(self, columns: list[str]) -> pd.DataFrame:
+        """Reads matching rows from the yearly partitions."""
+        frames, dates = [], set()
+        for entry in self._partition_entries():
+            df = pd.read_csv(os.path.join(self.partition_dir, entry["file"]),
+                             usecols=columns, parse_dates=["date"])
+            df = df.loc[self._mask(df)]
+            frames.append(df)
+            dates.update(df["date"].unique())
+            # Partitions are read newest first, so older ones are only needed
+            # until enough dates are found
+            if self.n_dates is not None and len(dates) >= self.n_dates:
+                break
+        if not frames:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(frames[::-1], ignore_index=True)
+
+    def _read_csv(self, columns: list[str]) -> pd.DataFrame:
+        """Streams the processed CSV in chunks, keeping matching rows."""
+        chunks = pd.read_csv(self.csv_path, usecols=columns,
+                             parse_dates=["date"], chunksize=CSV_CHUNK_ROWS)
+        frames = [chunk.loc[self._mask(chunk)] for chunk in chunks]
+        if not frames:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(frames, ignore_index=True)
+
+    def _sql(self, columns: list[str]) -> tuple[str, list]:
+        """Builds the SQL for the query's filters."""
+        conditions, params = [], []
+        if self.groups is not None:
+            placeholders = ", ".join("?" * len(self.groups))
+            conditions.append(f'"group" IN ({placeholders})')
+            params += self.groups
+        if self.types is not None:
+            conditions.append(f'type IN ({", ".join("?" * len(self.types))})')
+            params += self.types
+        if self.start_date is not None:
+            conditions.append("date >= ?")
+            params.append(self.start_date)
+        if self.end_date is not None:
+            conditions.append("date <= ?")
+            params.append(self.end_date)
+
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        if self.n_dates is not None:
+            conditions.append(
+                f"date IN (SELECT DISTINCT date FROM population{where} "
+                "ORDER BY date DESC LIMIT ?)")
+            params = params + params + [self.n_dates]
+            where = f" WHERE {' AND '.join(conditions)}"
+
+        select = ", ".join('"group"' if column == "group" else column
+                           for column in columns)
+        return (f'SELECT {select} FROM population{where} '
+                'ORDER BY date, "group", type', params)
+
+    def _read_sqlite(self, columns: list[str]) -> pd.DataFrame:
+        """Reads matching rows from the SQLite database."""
+        sql, params = self._sql(columns)
+        conn = database.connect(self.db_path)
+        try:
+            return pd.read_sql_query(sql, conn, params=params,
+                                     parse_dates=["date"])
+        finally:
+            conn.close()
+
+    def collect(self) -> pd.DataFrame:
+        """Runs the query and returns it sorted by date, group and type."""
+        source = self.resolve_source()
+        columns = self._read_columns()
+        readers = {
+            "partitions": self._read_partitions,
+            "sqlite": self._read_sqlite,
+            "csv": self._read_csv,
+        }
+        df = readers[source](columns)
+
+        if self.n_dates is not None and source != "sqlite":
+            latest_dates = pd.Series(df["date"].unique()).nlargest(
+                self.n_dates)
+            df = df.loc[df["date"].isin(latest_dates)]
+        if "value" in df.columns:
+            df = df.assign(value=pd.to_numeric(
+                df["value"], errors="coerce").astype("Int64"))
+        df = df.sort_values([column for column in ["date", "group", "type"]
+                             if column in df.columns])
+
+        if self.aggregation is not None:
+            freq, how = self.aggregation
+            df = (
+                df.groupby(["group", "type",
+                            pd.Grouper(key="date", freq=freq)])["value"]
+                .agg(how)
+                .reset_index()
+                .loc[:, COLUMNS]
+            )
+        df = df.reset_index(drop=True)
+        if self.align_weeks:
+            df, _, _ = calculate_week_and_ticks(df)
+        if self.columns is not None:
+            week_columns = [column for column in ("week", "month", "year")
+                            if column in df.columns]
+            df = df.loc[:, self.columns + week_columns]
+
+        logger.debug("Query read %s rows from %s", len(df), source)
+        return df
+
+    def collect_with_ticks(
+        self,
+    ) -> tuple[pd.DataFrame, list[int], list[str]]:
+        """Runs the query aligned to weeks.
+
+        Returns:
+            tuple: (result, month tick positions, month tick labels).
+        """
+        return calculate_week_and_ticks(
+            self._with(align_weeks=False).collect())
+
+    def options(self) -> dict:
+        """Returns the groups, types and year range present in the storage.
+
+        They are read as cheaply as the storage allows, in the form of
+        `utilities.get_filter_options`.
+        """
+        source = self.resolve_source()
+        index = (partitions.read_index(self.partition_dir)
+                 if source == "partitions" else {})
+        if index and all("groups" in entry for entry in index.values()):
+            groups = sorted({group for entry in index.values()
+                             for group in entry["groups"]})
+            types = sorted({category for entry in index.values()
+                            for category in entry["types"]})
+            years = [int(year) for year in index]
+            return {"groups": groups, "categories": types,
+                    "date_range": (min(years), max(years))}
+
+        query = Query(source, self.csv_path, self.partition_dir, self.db_path)
+        df = query.select("group", "type", "date").collect()
+        years = df["date"].dt.year
+        return {"groups": sorted(df["group"].unique()),
+                "categories": sorted(df["type"].unique()),
+                "date_range": (years.min(), years.max())}
+
+    def explain(self) -> str:
+        """Describes how the query will be run.
+
+        This includes what is pushed down to storage.
+        """
+        source = self.resolve_source()
+        columns = self._read_columns()
+        lines = [f"source: {source}", f"read columns: {columns}"]
+        if source == "partitions":
+            files = [entry['file'] for entry in self._partition_entries()]
+            lines.append(f"read files: {files}")
+        elif source == "sqlite":
+            lines.append(f"sql: {self._sql(columns)[0]}")
+        else:
+            lines.append(f"scan: {self.csv_path} in chunks of "
+                         f"{CSV_CHUNK_ROWS} rows")
+        lines.append(f"filters: groups={self.groups}, types={self.types}, "
+                     f"dates={self.start_date}..{self.end_date}")
+        if self.n_dates is not None:
+            lines.append(f"last dates: {self.n_dates}")
+        if self.aggregation is not None:
+            lines.append(f"aggregate: {self.aggregation[1]} "
+                         f"per {self.aggregation[0]}")
+        if self.align_weeks:
+            lines.append("align: weeks")
+        if self.columns is not None:
+            lines.append(f"output columns: {self.columns}")
+        return "\n".join(lines)
@@ -3,17 +3,22 @@
 """
 This script provides useful funcs to all other scripts
 """
+import atexit
+import contextvars
+import json
 import logging
+import logging.handlers
+import multiprocessing
 import os
-import textwrap
+from contextlib import contextmanager
 
 import chart_studio.plotly as py  # Online plotting
+import numpy as np
 import pandas as pd
 import plotly.graph_objs as go  # Offline plotting
-import plotly.io as pio
 import yaml
 
-import src.visualization.prt_theme as prt_theme
+import src.visualization.figure_factory as figure_factory
 
 
 def read_config():
@@ -26,37 +31,203 @@ def read_config():
 
 CONFIG = read_config()
 
+ENGINES = ("pandas", "polars")
+# Dataframe engine used when a function is not given one explicitly
+_ENGINE = CONFIG.get("compute", {}).get("engine", "pandas")
+
+
+def set_engine(engine: str) -> None:
+    """Sets the default dataframe engine ("pandas" or "polars")."""
+    global _ENGINE  # pylint: disable=global-statement
+    _ENGINE = resolve_engine(engine)
+
+
+def resolve_engine(engine: str | None = None) -> str:
+    """Returns the engine to use.
+
+    The engine is checked to be known and, for polars, installed.
+
+    Parameters:
+        engine (str, optional): "pandas" or "polars"; None uses the default
+            engine.
+
+    Raises:
+        ValueError: If the engine is unknown.
+        ImportError: If polars is selected but polars or pyarrow is not
+            installed.
+    """
+    engine = _ENGINE if engine is None else engine
+    if engine not in ENGINES:
+        raise ValueError(f"Invalid engine '{engine}'. "
+                         f"Valid options: {list(ENGINES)}")
+    if engine == "polars":
+        try:
+            # pylint: disable-next=import-outside-toplevel,unused-import
+            import polars  # noqa: F401
+            # pylint: disable-next=import-outside-toplevel,unused-import
+            import pyarrow  # noqa: F401
+        except ImportError as e:
+            raise ImportError(
+                "The polars engine requires the optional polars extra: "
+                'pip install -e ".[polars]"') from e
+    return engine
+
 
 def ensure_directory(path: str) -> None:
     """Ensure a directory path exists."""
     os.makedirs(path, exist_ok=True)
 
 
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(stage)s - %(message)s"
+
+# Listener draining the log queue, and the context fields added to every
+# record. The context is per thread (and per asyncio task), so concurrent
+# stages keep their own.
+_LOG_LISTENER = None
+_LOG_CONTEXT = contextvars.ContextVar("log_context",
+                                      default={"stage": "main"})
+
+
+class ContextFilter(logging.Filter):
+    """Adds the current stage and other context fields to each record."""
+
+    def filter(self, record):
+        record.context = dict(_LOG_CONTEXT.get())
+        record.stage = record.context["stage"]
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line, with context fields."""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "process": record.process,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "context", {}))
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def _install_queue_handler(log_queue) -> None:
+    """Replaces the root logger's handlers with one that queues records."""
+    logger = logging.getLogger()
+    logger.setLevel(logging.INFO)
+    logger.handlers.clear()
+
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    # Context is captured in the emitting thread, before the record is queued
+    queue_handler.addFilter(ContextFilter())
+    logger.addHandler(queue_handler)
+
+
+def stop_logging() -> None:
+    """Flushes queued records and stops the `setup_logging` listener."""
+    global _LOG_LISTENER  # pylint: disable=global-statement
+    if _LOG_LISTENER is not None:
+        _LOG_LISTENER.stop()
+        _LOG_LISTENER = None
+
+
 def setup_logging(
         to_file=None,
         filename="download_log.log",
-        log_path=CONFIG['data']['logsPath']
-        ) -> None:
-    """Sets up logging configuration."""
-    log_format = "%(asctime)s - %(levelname)s - %(message)s"
-    logger = logging.getLogger()
-    logger.setLevel(logging.INFO)
+        log_path=CONFIG['data']['logsPath'],
+        json_format=False,
+        ):
+    """Sets up queue-based logging shared by threads and worker processes.
 
-    # Remove all handlers if they exist (to avoid duplicate logs)
-    if logger.hasHandlers():
-        logger.handlers.clear()
+    The root logger only puts records on a queue; a background listener writes
+    them to the console and, optionally, a file, so logging calls never block
+    on I/O.
+
+    Parameters:
+        to_file (bool): Also write logs to `log_path`/`filename`.
+        filename (str): Name of the log file.
+        log_path (str): Directory for the log file.
+        json_format (bool): Write one JSON object per record instead of plain
+            text.
+
+    Returns:
+        multiprocessing.Queue: The log queue, to pass to `worker_logging` in
+            process pools.
+    """
+    stop_logging()
+    formatter = (JsonFormatter() if json_format
+                 else logging.Formatter(LOG_FORMAT))
 
     # Always add console handler
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(logging.Formatter(log_format))
-    logger.addHandler(console_handler)
+    handlers = [logging.StreamHandler()]
 
     # Add file handler if requested
     if to_file:
         ensure_directory(log_path)
-        file_handler = logging.FileHandler(os.path.join(log_path, filename), mode="a")
-        file_handler.setFormatter(logging.Formatter(log_format))
-        logger.addHandler(file_handler)
+        handlers.append(logging.FileHandler(os.path.join(log_path, filename),
+                                            mode="a"))
+
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = multiprocessing.Queue()
+    _install_queue_handler(log_queue)
+
+    global _LOG_LISTENER  # pylint: disable=global-statement
+    _LOG_LISTENER = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True)
+    _LOG_LISTENER.start()
+
+    # Registered after the queue exists so it runs before multiprocessing
+    # closes the queue at exit
+    atexit.unregister(stop_logging)
+    atexit.register(stop_logging)
+    return log_queue
+
+
+def get_log_queue():
+    """Returns the `setup_logging` queue, or None if logging is not queued."""
+    return _LOG_LISTENER.queue if _LOG_LISTENER is not None else None
+
+
+def worker_logging(log_queue, context=None) -> None:
+    """Process pool initializer: sends the worker's logs to the parent's queue.
+
+    Parameters:
+        log_queue: Queue returned by `setup_logging` (or `get_log_queue`). If
+            None, the worker's logging is left unchanged.
+        context (dict, optional): Context fields to use in the worker, normally
+            `log_context()` from the parent at submit time.
+    """
+    if log_queue is None:
+        return
+    if context:
+        _LOG_CONTEXT.set({**_LOG_CONTEXT.get(), **context})
+    _install_queue_handler(log_queue)
+
+
+def log_context() -> dict:
+    """Returns a copy of the current context fields, for `worker_logging`."""
+    return dict(_LOG_CONTEXT.get())
+
+
+@contextmanager
+def log_stage(stage: str, **fields):
+    """Tags every record logged inside the block with the stage and fields.
+
+    Parameters:
+        stage (str): Stage name (e.g., 'download', 'build').
+        **fields: Extra context fields, included in JSON output.
+    """
+    token = _LOG_CONTEXT.set({**_LOG_CONTEXT.get(), **fields, "stage": stage})
+    try:
+        yield
+    finally:
+        _LOG_CONTEXT.reset(token)
 
 
 def load_data(filepath: str) -> pd.DataFrame:
@@ -97,13 +268,16 @@ def get_filter_options(df: pd.DataFrame) -> dict:
     }
 
 
-def filter_data(df: pd.DataFrame, group: str, category: str, date: int) -> pd.DataFrame:
+def filter_data(df: pd.DataFrame, group: str, category: str, date: int,
+                end_date: int | None = None) -> pd.DataFrame:
     """Filters dataset based on predefined conditions.
     Parameters:
         df (pd.DataFrame): The input dataframe.
         group (str): The group to filter by (e.g., 'total', 'female').
         category (str): The category to filter by (e.g., 'prison', 'hdc').
         date (int): The year threshold to filter from (e.g., 2021). Only data from this year onwards will be included.
+        end_date (int, optional): The last year to include (e.g., 2024).
+            Defaults to no upper limit.
     Returns:
         pd.DataFrame: The filtered dataframe.
     Raises:
@@ -128,12 +302,18 @@ def filter_data(df: pd.DataFrame, group: str, category: str, date: int) -> pd.Da
     min_year, max_year = options["date_range"]
     if not isinstance(date, int) or date < min_year or date > max_year:
         raise ValueError(f"Invalid date '{date}'. Must be an integer between {min_year} and {max_year}")
+    if end_date is not None and (not isinstance(end_date, int)
+                                 or end_date < date):
+        raise ValueError(f"Invalid end_date '{end_date}'. Must be an integer "
+                         f"no earlier than {date}")
 
     # Apply filters
+    end_year = end_date if end_date is not None else max_year
     df_filtered = df[
         (df["group"] == group) &
         (df["type"] == category) &
-        (df["date"].dt.year >= date)
+        (df["date"].dt.year >= date) &
+        (df["date"].dt.year <= end_year)
     ].copy()
 
     # Check if filtering resulted in empty dataframe
@@ -152,8 +332,14 @@ def filter_data(df: pd.DataFrame, group: str, category: str, date: int) -> pd.Da
     return df_filtered
 
 
-def calculate_week_and_ticks(df: pd.DataFrame) -> tuple:
+def calculate_week_and_ticks(df: pd.DataFrame,
+                             engine: str | None = None) -> tuple:
     """Calculates relative week numbers and month tick positions."""
+    if resolve_engine(engine) == "polars":
+        # pylint: disable-next=import-outside-toplevel
+        from src import polars_engine
+
+        return polars_engine.calculate_week_and_ticks(df)
 
     # Ensure we are working with datetime
     df["date"] = pd.to_datetime(df["date"])
@@ -173,23 +359,54 @@ def calculate_week_and_ticks(df: pd.DataFrame) -> tuple:
     return df, month_weeks, month_labels
 
 
-def load_and_process_data(group: str, category: str, date: int) -> tuple[pd.DataFrame, list[int], list[str]]:
+def load_and_process_data(
+        group: str,
+        category: str,
+        date: int,
+        data: pd.DataFrame | None = None,
+        ) -> tuple[pd.DataFrame, list[int], list[str]]:
     """Loads data and applies filtering and week calculations, ready for plotting.
     Parameters:
         group (str): The group to filter by (e.g., 'total', 'female').
         category (str): The category to filter by (e.g., 'prison', 'hdc').
         date (int): The year threshold to filter from (e.g., 2021). Only data from this year onwards will be included.
+        data (pd.DataFrame, optional): Dataset already held in memory; read
+            from disk if None.
     Returns:
         tuple: (df_with_weeks, month_tick_positions, month_tick_labels)
             - df_with_weeks (pd.DataFrame): Filtered dataframe with week numbers.
             - month_tick_positions (list): List of week numbers for month ticks.
             - month_tick_labels (list): List of month labels corresponding to tick positions.
     """
-    data_path = os.path.join(CONFIG['data']['clnFilePath'], 'processed_data.csv')
-    df_raw = load_data(data_path)
-
-    # Filter by group, category, and date
-    df_filtered_by_criteria = filter_data(df_raw, group, category, date)
+    if data is not None:
+        # Filter by group, category, and date
+        df_filtered_by_criteria = filter_data(data, group, category, date)
+    else:
+        # Imported here as src.query itself imports this module
+        # pylint: disable-next=import-outside-toplevel
+        from src.query import Query
+
+        # Only the series and years requested are read from storage
+        query = Query().series(group, category).years(date)
+        df_filtered_by_criteria = query.collect()
+        # The checks of filter_data, with the options only read from storage
+        # when the result does not already show the start year is in range
+        if (df_filtered_by_criteria.empty or not isinstance(date, int)
+                or df_filtered_by_criteria["date"].dt.year.min() > date):
+            options = query.options()
+            if group not in options["groups"]:
+                raise ValueError(f"Invalid group '{group}'. "
+                                 f"Valid options: {options['groups']}")
+            if category not in options["categories"]:
+                raise ValueError(f"Invalid category '{category}'. "
+                                 f"Valid options: {options['categories']}")
+            min_year, max_year = options["date_range"]
+            if not isinstance(date, int) or not min_year <= date <= max_year:
+                raise ValueError(f"Invalid date '{date}'. Must be an integer "
+                                 f"between {min_year} and {max_year}")
+        if df_filtered_by_criteria.empty:
+            raise ValueError(f"No data found for group='{group}', "
+                             f"category='{category}', date>={date}")
 
     # Calculate week numbers and tick positions
     df_with_weeks, month_tick_positions, month_tick_labels = calculate_week_and_ticks(df_filtered_by_criteria)
@@ -214,12 +431,50 @@ def generate_traces(df: pd.DataFrame) -> list:
     return traces
 
 
+def generate_trace_data(df: pd.DataFrame) -> list[dict]:
+    """Generates plain-dict traces for each year in dataset.
+
+    Equivalent to `generate_traces` but builds NumPy arrays and formats every
+    hover label in one vectorised call, leaving validation to the single
+    `go.Figure` built in `create_chart_figure`.
+
+    Parameters:
+        df (pd.DataFrame): Data with date, week and value columns.
+
+    Returns:
+        list[dict]: One scatter trace dict per year, in year order.
+    """
+    df = df.sort_values("date", kind="stable")
+    years = df["date"].dt.year.to_numpy()
+    weeks = df["week"].to_numpy()
+    values = df["value"].to_numpy(dtype=float, na_value=np.nan)
+    hover_labels = df["date"].dt.strftime("%d %b").to_numpy()
+
+    # Rows are in date order, so each year is a contiguous slice
+    unique_years, starts = np.unique(years, return_index=True)
+    ends = np.append(starts[1:], len(years))
+
+    return [
+        dict(
+            type="scatter",
+            x=weeks[start:end],
+            y=values[start:end],
+            mode="lines",
+            connectgaps=True,
+            hovertext=hover_labels[start:end],
+            hovertemplate="<b>%{hovertext}</b><br>%{y:,.0f}",
+            name=str(year),
+        )
+        for year, start, end in zip(unique_years, starts, ends)
+    ]
+
+
 def generate_annotations(traces, colorway, y_label, y_offset_dict=None):
     """
     Generates trace labels and source annotation, allowing individual y-value adjustments.
 
     Parameters:
-        traces (list): Plotly trace objects.
+        traces (list): Plotly trace objects or trace dicts.
         colorway (list): Color scheme from Plotly template.
         y_label (str): Y-axis label text.
         y_offset_dict (dict, optional): A dictionary mapping trace names (years) to y-offsets.
@@ -231,9 +486,11 @@ def generate_annotations(traces, colorway, y_label, y_offset_dict=None):
         dict(
             xref="x",
             yref="y",
-            x=53 if i < 4 else trace.x[-1],  # First 4 use fixed x, others use last x position
-            y=trace.y[-1] + y_offset_dict.get(trace.name, 0),  # Apply y-offset if available
-            text=trace.name,
+            # First 4 use fixed x, others use last x position
+            x=53 if i < 4 else trace["x"][-1],
+            # Apply y-offset if available
+            y=trace["y"][-1] + y_offset_dict.get(trace["name"], 0),
+            text=trace["name"],
             xanchor="left",
             align="left",
             showarrow=False,
@@ -243,34 +500,8 @@ def generate_annotations(traces, colorway, y_label, y_offset_dict=None):
         for i, trace in enumerate(traces)
     ]
 
-    # Add source label
-    annotations.append(
-        dict(
-            xref="paper",
-            yref="paper",
-            x=-0.08,
-            y=-0.19,
-            align="left",
-            showarrow=False,
-            text="<b>Source: Ministry of Justice Prison Population Bulletin</b>",
-            font_size=12,
-        )
-    )
-
-    # Add y-axis label
-    annotations.append(
-        dict(
-            xref="x",
-            yref="paper",
-            x=1,
-            y=1.04,
-            align="left",
-            xanchor="left",
-            showarrow=False,
-            text=y_label,
-            font_size=12,
-        )
-    )
+    # Add source and y-axis labels
+    annotations.extend(figure_factory.fixed_annotations(y_label))
 
     return annotations
 
@@ -298,7 +529,7 @@ def create_chart_figure(
     Parameters:
         xaxis_tickvals: X-axis tick positions
         xaxis_ticktext: X-axis tick labels
-        traces: Plotly trace objects
+        traces: Plotly trace objects or trace dicts (see `generate_trace_data`)
         title (str): Chart title
         y_label (str): Y-axis label
         yaxis_range (tuple): Y-axis range (min, max)
@@ -313,82 +544,67 @@ def create_chart_figure(
         go.Figure: The created Plotly figure
     """
 
-    fig = go.Figure(traces)
-
-    # Wrap title for better formatting
-    chart_title = textwrap.wrap(title, width=65)
-
-    # Get colorway from template
-    colorway = pio.templates[pio.templates.default].layout.colorway
-
     # Generate annotations with optional y_offset_dict
-    annotations = generate_annotations(traces, colorway, y_label, y_offset_dict)
-
-    fig.update_layout(
-        margin=margin if margin else dict(l=64, b=75, r=64, pad=10),
-        title="<br>".join(chart_title),
-        yaxis_dtick=yaxis_dtick if yaxis_dtick else 2000,
-        xaxis_tickvals=xaxis_tickvals,
-        xaxis_ticktext=xaxis_ticktext,
-        hovermode='x',
-        annotations=annotations,
-    )
-
-    # Apply axis settings
-    fig.update_yaxes(range=yaxis_range, nticks=yaxis_nticks)
-    fig.update_xaxes(range=xaxis_range_vals, nticks=xaxis_nticks)
-
-    return fig
+    annotations = generate_annotations(traces, figure_factory.COLORWAY,
+                                       y_label, y_offset_dict)
 
+    # Per-chart settings are merged into a copy of the prebuilt PRT base layout
+    return figure_factory.new_figure(
+        traces,
+        dict(
+            margin=margin,
+            title=figure_factory.wrap_title(title),
+            annotations=annotations,
+            xaxis=dict(
+                tickvals=xaxis_tickvals,
+                ticktext=xaxis_ticktext,
+                range=xaxis_range_vals,
+                nticks=xaxis_nticks,
+            ),
+            yaxis=dict(
+                dtick=yaxis_dtick,
+                range=yaxis_range,
+                nticks=yaxis_nticks,
+            ),
+        ),
+    )
 
-def save_chart(fig, filename):
-    """Saves the chart as an image and uploads it online."""
-
-    fig.write_image(os.path.join(CONFIG['viz']['outPath'], f'{filename}.svg'))
 
-    fig.layout.images = [
-        dict(
-            source="https://i.ibb.co/jhfYbyc/PRTlogo-RGB.png",
-            xref="paper",
-            yref="paper",
-            x=-0.08,
-            y=1.25,
-            sizex=0.15,
-            sizey=0.15,
-            xanchor="left",
-            yanchor="top",
-        )
-    ]
+def save_chart(fig, filename, out_dir=CONFIG['viz']['outPath']):
+    """Saves the chart as minified SVG artifacts and uploads it online."""
+    # Imported here as src.visualization.svg_artifacts itself imports this
+    # module
+    # pylint: disable-next=import-outside-toplevel
+    from src.visualization import svg_artifacts
 
-    layout_atr = prt_theme.pio.templates["prt_template"].layout
-    fig.update_layout(
-        width=layout_atr.width,
-        height=layout_atr.height,
-    )
+    svg_artifacts.write_artifacts(
+        fig.to_image(format="svg"), filename, out_dir)
 
-    py.plot(fig, filename=filename)
+    # Upload a copy with the logo and fixed size, leaving the offline figure
+    # untouched
+    py.plot(figure_factory.to_online(fig), filename=filename)
 
 
-def generate_and_save_chart(
+def build_chart_figure(
     group: str,
-    category: str, 
+    category: str,
     start_year: int,
     chart_title: str,
     y_label: str,
-    filename: str,
     yaxis_range: tuple | None = None,
     margin: dict | None = None,
     yaxis_dtick: int | None = None,
     xaxis_range_vals: tuple = (1, 53),
     xaxis_nticks: int | None = None,
     yaxis_nticks: int = 6,
-    y_offset_dict: dict | None = None
-) -> None:
+    y_offset_dict: dict | None = None,
+    data: pd.DataFrame | None = None,
+) -> go.Figure:
     """
-    Complete workflow: loads data, processes it, creates chart, and saves it.
+    Loads data, processes it and creates the chart figure without saving it.
 
-    This function handles the entire pipeline from raw data parameters
-    to saved chart file.
+    Takes a chart spec from `chart_specs` through `chart_specs.figure_kwargs`,
+    so a misspelt key raises a TypeError rather than being ignored.
 
     Parameters:
         group (str): Data group to filter by (e.g., 'total', 'female')
@@ -396,7 +612,6 @@ def generate_and_save_chart(
         start_year (int): Starting year for data filtering
         chart_title (str): Title for the chart
         y_label (str): Y-axis label
-        filename (str): Output filename for the chart
         yaxis_range (tuple, optional): Y-axis range (min, max)
         margin (dict, optional): Chart margins
         yaxis_dtick (int, optional): Y-axis tick interval
@@ -404,15 +619,21 @@ def generate_and_save_chart(
         xaxis_nticks (int, optional): Number of x-axis ticks
         yaxis_nticks (int, optional): Number of y-axis ticks, defaults to 6
         y_offset_dict (dict, optional): Year-specific y-offset adjustments for labels
+        data (pd.DataFrame, optional): Dataset already held in memory; read
+            from disk if None
+
+    Returns:
+        go.Figure: The created Plotly figure
     """
     # Load and process data
-    df_with_weeks, month_tick_positions, month_tick_labels = load_and_process_data(group, category, start_year)
+    df_with_weeks, month_tick_positions, month_tick_labels = (
+        load_and_process_data(group, category, start_year, data))
 
     # Generate plotting traces
-    plot_traces = generate_traces(df_with_weeks)
+    plot_traces = generate_trace_data(df_with_weeks)
 
     # Create chart using the renamed function
-    fig = create_chart_figure(
+    return create_chart_figure(
         xaxis_tickvals=month_tick_positions,
         xaxis_ticktext=month_tick_labels,
         traces=plot_traces,
@@ -427,5 +648,65 @@ def generate_and_save_chart(
         y_offset_dict=y_offset_dict
     )
 
-    save_chart(fig, filename)
+
+def generate_and_save_chart(
+    group: str,
+    category: str,
+    start_year: int,
+    chart_title: str,
+    y_label: str,
+    filename: str,
+    yaxis_range: tuple | None = None,
+    margin: dict | None = None,
+    yaxis_dtick: int | None = None,
+    xaxis_range_vals: tuple = (1, 53),
+    xaxis_nticks: int | None = None,
+    yaxis_nticks: int = 6,
+    y_offset_dict: dict | None = None,
+    data: pd.DataFrame | None = None,
+    out_dir: str = CONFIG['viz']['outPath'],
+) -> None:
+    """
+    Complete workflow: loads data, processes it, creates chart, and saves it.
+
+    This function handles the entire pipeline from raw data parameters
+    to saved chart file.
+
+    Parameters:
+        group (str): Data group to filter by (e.g., 'total', 'female')
+        category (str): Data category to filter by (e.g., 'prison', 'hdc',
+            'operational_capacity')
+        start_year (int): Starting year for data filtering
+        chart_title (str): Title for the chart
+        y_label (str): Y-axis label
+        filename (str): Output filename for the chart
+        yaxis_range (tuple, optional): Y-axis range (min, max)
+        margin (dict, optional): Chart margins
+        yaxis_dtick (int, optional): Y-axis tick interval
+        xaxis_range_vals (tuple, optional): X-axis range, defaults to (1, 53)
+        xaxis_nticks (int, optional): Number of x-axis ticks
+        yaxis_nticks (int, optional): Number of y-axis ticks, defaults to 6
+        y_offset_dict (dict, optional): Year-specific y-offset adjustments
+            for labels
+        data (pd.DataFrame, optional): Dataset already held in memory;
+            read from disk if None
+        out_dir (str, optional): Directory the chart files are written to
+    """
+    fig = build_chart_figure(
+        group=group,
+        category=category,
+        start_year=start_year,
+        chart_title=chart_title,
+        y_label=y_label,
+        yaxis_range=yaxis_range,
+        margin=margin,
+        yaxis_dtick=yaxis_dtick,
+        xaxis_range_vals=xaxis_range_vals,
+        xaxis_nticks=xaxis_nticks,
+        yaxis_nticks=yaxis_nticks,
+        y_offset_dict=y_offset_dict,
+        data=data,
+    )
+
+    save_chart(fig, filename, out_dir)
     return None
@@ -9,29 +9,16 @@ This script generates a chart visualizing the Home Detention Curfew (HDC) popula
 import plotly.io as pio
 
 import src.utilities as utils
+from src.visualization import chart_specs
 
 # Set template
 pio.templates.default = "prt_template"
 
 
-def main():
+def main(data=None, out_dir=utils.CONFIG['viz']['outPath']):
     """Creates chart showing the HDC population in England and Wales."""
-
-    y_offset_dict = {
-        "2021": 200,
-    }
-
     utils.generate_and_save_chart(
-        group="total",
-        category="hdc",
-        start_year=2021,
-        chart_title="<b>HDC population in England and Wales</b>",
-        y_label="People on Home Detention Curfew",
-        filename="HDC_population",
-        yaxis_range=(1490, 4510),
-        yaxis_dtick=500,
-        y_offset_dict=y_offset_dict
-    )
+        **chart_specs.HDC_CASELOAD, data=data, out_dir=out_dir)
     return None
 
 
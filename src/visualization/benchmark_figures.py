@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Benchmarks chart figure construction.
+
+Compares the original path (one validated go.Scatter per year, then go.Figure
+plus separate update_layout/update_xaxes/update_yaxes calls) with the
+dict-based path used by `generate_and_save_chart`. That both produce the same
+figure is checked by tests/test_figures.py.
+
+Usage: python -m src.visualization.benchmark_figures [n_years]
+(n_years can be at most 5, the number of colours in the PRT template colorway)
+'''
+
+# Imports
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objs as go
+import plotly.io as pio
+
+import src.utilities as utils
+
+# Set template
+pio.templates.default = "prt_template"
+
+CHART_ARGS = dict(title="<b>Prison population in England and Wales</b>",
+                  y_label="People in prison", yaxis_range=(75900, 90100))
+
+
+def synthetic_data(n_years: int) -> pd.DataFrame:
+    """Builds weekly data for `n_years` years ending in 2025."""
+    dates = pd.date_range(f"{2026 - n_years}-01-03", "2025-12-26",
+                          freq="W-FRI")
+    steps = np.random.default_rng(0).normal(5, 50, len(dates))
+    values = 80000 + np.cumsum(steps).round()
+    df = pd.DataFrame({"date": dates,
+                       "value": pd.array(values.astype(int), dtype="Int64")})
+    df, _, _ = utils.calculate_week_and_ticks(df)
+    return df
+
+
+def original_path(df, month_weeks, month_labels) -> go.Figure:
+    """Figure construction as originally implemented, kept for comparison."""
+    traces = utils.generate_traces(df)
+    fig = go.Figure(traces)
+    colorway = pio.templates[pio.templates.default].layout.colorway
+    fig.update_layout(
+        margin=dict(l=64, b=75, r=64, pad=10),
+        title="<br>".join([CHART_ARGS["title"]]),
+        yaxis_dtick=2000,
+        xaxis_tickvals=month_weeks,
+        xaxis_ticktext=month_labels,
+        hovermode='x',
+        annotations=utils.generate_annotations(traces, colorway,
+                                               CHART_ARGS["y_label"]),
+    )
+    fig.update_yaxes(range=CHART_ARGS["yaxis_range"], nticks=6)
+    fig.update_xaxes(range=(1, 53), nticks=None)
+    return fig
+
+
+def fast_path(df, month_weeks, month_labels) -> go.Figure:
+    """Figure construction via plain trace dicts and one validated figure."""
+    return utils.create_chart_figure(
+        xaxis_tickvals=month_weeks,
+        xaxis_ticktext=month_labels,
+        traces=utils.generate_trace_data(df),
+        **CHART_ARGS,
+    )
+
+
+def figure_args(n_years: int) -> tuple:
+    """Returns the data and month ticks both paths are given."""
+    df = synthetic_data(n_years)
+    month_weeks = df.groupby("month")["week"].first().tolist()
+    month_labels = df["date"].dt.strftime("%b").unique().tolist()
+    return df, month_weeks, month_labels
+
+
+def main(n_years: int = 5, repeats: int = 20) -> dict:
+    """Times both paths."""
+    args = figure_args(n_years)
+
+    timings = {}
+    for name, func in [("original", original_path), ("fast", fast_path)]:
+        timings[name] = min(timeit.repeat(lambda: func(*args), number=1,
+                                          repeat=repeats))
+        print(f"{name:>8}: {timings[name] * 1000:8.2f} ms per figure "
+              f"({n_years} years)")
+    print(f" speedup: {timings['original'] / timings['fast']:.1f}x")
+    return timings
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
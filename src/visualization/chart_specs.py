@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Chart specifications shared by the chart scripts and the HTML report.
+
+Each spec holds the keyword arguments for `utilities.build_chart_figure`, plus
+the output filename used by `utilities.generate_and_save_chart`.
+'''
+
+
+def figure_kwargs(spec: dict) -> dict:
+    """Returns a spec's figure settings, without the output filename."""
+    return {key: value for key, value in spec.items() if key != "filename"}
+
+
+PRISON_POPULATION = dict(
+    group="total",
+    category="prison",
+    start_year=2021,
+    chart_title="<b>Prison population in England and Wales</b>",
+    y_label="People in prison",
+    filename="prison_population",
+    yaxis_range=(75900, 90100),
+)
+
+FEMALE_POPULATION = dict(
+    group="female",
+    category="prison",
+    start_year=2021,
+    chart_title="<b>Female prison population in England and Wales</b>",
+    y_label="Women in prison",
+    filename="female_prison_population",
+    yaxis_range=(2795, 4010),
+    yaxis_dtick=200,
+)
+
+HDC_CASELOAD = dict(
+    group="total",
+    category="hdc",
+    start_year=2021,
+    chart_title="<b>HDC population in England and Wales</b>",
+    y_label="People on Home Detention Curfew",
+    filename="HDC_population",
+    yaxis_range=(1490, 4510),
+    yaxis_dtick=500,
+    y_offset_dict={
+        "2021": 200,
+    },
+)
+
+OPERATIONAL_CAPACITY = dict(
+    group="total",
+    category="operational_capacity",
+    start_year=2021,
+    chart_title="<b>Operational capacity in England and Wales</b>",
+    y_label="Prison places",
+    filename="operational_capacity",
+    yaxis_range=(75900, 90100),
+    y_offset_dict={
+        "2023": 400,
+    },
+)
+
+# All charts, in the order they are produced
+CHART_SPECS = [
+    PRISON_POPULATION,
+    FEMALE_POPULATION,
+    HDC_CASELOAD,
+    OPERATIONAL_CAPACITY,
+]
+
+# Long-view charts covering the full history, built by long_view
+PRISON_POPULATION_LONG_VIEW = dict(
+    group="total",
+    category="prison",
+    chart_title="<b>Prison population in England and Wales</b>",
+    y_label="People in prison",
+    filename="prison_population_long_view",
+    aggregation="month",
+)
+
+LONG_VIEW_SPECS = [
+    PRISON_POPULATION_LONG_VIEW,
+]
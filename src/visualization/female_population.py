@@ -5,23 +5,16 @@
 import plotly.io as pio
 
 import src.utilities as utils
+from src.visualization import chart_specs
 
 # Set template
 pio.templates.default = "prt_template"
 
 
-def main():
+def main(data=None, out_dir=utils.CONFIG['viz']['outPath']):
     """Creates chart showing the female prison population in England and Wales."""
     utils.generate_and_save_chart(
-        group="female",
-        category="prison",
-        start_year=2021,
-        chart_title="<b>Female prison population in England and Wales</b>",
-        y_label="Women in prison",
-        filename="female_prison_population",
-        yaxis_range=(2795, 4010),
-        yaxis_dtick=200
-    )
+        **chart_specs.FEMALE_POPULATION, data=data, out_dir=out_dir)
     return None
 
 
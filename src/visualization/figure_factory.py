@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Figure factory for charts using the PRT template.
+
+The base layout (template, margins, axes and the fixed source annotation) is
+built once at import time from prt_theme, in an offline variant for SVG export
+and an online variant with the PRT logo for chart-studio. Each chart gets a
+cheap deep copy of a plain dict, so building figures never reads or mutates
+shared plotly state and is safe from concurrent workers.
+'''
+
+# Imports
+import copy
+import textwrap
+from functools import lru_cache
+
+import plotly.graph_objs as go
+
+import src.visualization.prt_theme as prt_theme
+
+TEMPLATE_NAME = "prt_template"
+
+# Plain-dict copy of the template, converted once
+TEMPLATE = prt_theme.pio.templates[TEMPLATE_NAME].to_plotly_json()
+COLORWAY = tuple(TEMPLATE["layout"]["colorway"])
+
+SOURCE_ANNOTATION = dict(
+    xref="paper",
+    yref="paper",
+    x=-0.08,
+    y=-0.19,
+    align="left",
+    showarrow=False,
+    text="<b>Source: Ministry of Justice Prison Population Bulletin</b>",
+    font_size=12,
+)
+
+Y_LABEL_ANNOTATION = dict(
+    xref="x",
+    yref="paper",
+    x=1,
+    y=1.04,
+    align="left",
+    xanchor="left",
+    showarrow=False,
+    font_size=12,
+)
+
+LOGO_IMAGE = dict(
+    source="https://i.ibb.co/jhfYbyc/PRTlogo-RGB.png",
+    xref="paper",
+    yref="paper",
+    x=-0.08,
+    y=1.25,
+    sizex=0.15,
+    sizey=0.15,
+    xanchor="left",
+    yanchor="top",
+)
+
+DEFAULT_MARGIN = dict(l=64, b=75, r=64, pad=10)
+
+
+def _build_base_layout(online: bool) -> dict:
+    """Builds the layout shared by every chart."""
+    layout = dict(
+        template=TEMPLATE,
+        margin=DEFAULT_MARGIN,
+        hovermode="x",
+        xaxis=dict(range=(1, 53)),
+        yaxis=dict(dtick=2000, nticks=6),
+    )
+    if online:
+        # Chart-studio does not apply the template size, so set it explicitly
+        layout.update(
+            images=[LOGO_IMAGE],
+            width=TEMPLATE["layout"]["width"],
+            height=TEMPLATE["layout"]["height"],
+        )
+    return layout
+
+
+BASE_LAYOUTS = {
+    False: _build_base_layout(online=False),
+    True: _build_base_layout(online=True),
+}
+
+
+def base_layout(online: bool = False) -> dict:
+    """Returns a fresh copy of the precomputed base layout.
+
+    Parameters:
+        online (bool): Whether to return the chart-studio variant with the PRT
+            logo.
+
+    Returns:
+        dict: Layout dict that can be modified freely.
+    """
+    return copy.deepcopy(BASE_LAYOUTS[online])
+
+
+@lru_cache(maxsize=None)
+def wrap_title(title: str, width: int = 65) -> str:
+    """Wraps a chart title onto multiple lines."""
+    return "<br>".join(textwrap.wrap(title, width=width))
+
+
+def fixed_annotations(y_label: str) -> list[dict]:
+    """Returns the source and y-axis label annotations added to every chart."""
+    return [dict(SOURCE_ANNOTATION), dict(Y_LABEL_ANNOTATION, text=y_label)]
+
+
+def new_figure(traces, layout_overrides: dict,
+               online: bool = False) -> go.Figure:
+    """Builds a validated figure from traces and per-chart layout settings.
+
+    Axis settings in `layout_overrides` are merged into the base axes rather
+    than replacing them.
+
+    Parameters:
+        traces (list): Plotly trace objects or trace dicts.
+        layout_overrides (dict): Per-chart layout settings (title, annotations,
+            axes, ...).
+        online (bool): Whether to use the chart-studio variant of the base
+            layout.
+
+    Returns:
+        go.Figure: The created figure.
+    """
+    layout = base_layout(online)
+    for key, value in layout_overrides.items():
+        if key in ("xaxis", "yaxis"):
+            layout[key].update(
+                {k: v for k, v in value.items() if v is not None})
+        elif value is not None:
+            layout[key] = value
+    return go.Figure(data=traces, layout=layout)
+
+
+def to_online(fig: go.Figure) -> go.Figure:
+    """Returns a copy of an offline figure with the chart-studio additions.
+
+    The original figure is left unchanged.
+    """
+    fig_dict = fig.to_dict()
+    online_extras = {k: v for k, v in BASE_LAYOUTS[True].items()
+                     if k not in BASE_LAYOUTS[False]}
+    fig_dict["layout"].update(copy.deepcopy(online_extras))
+    return go.Figure(fig_dict)
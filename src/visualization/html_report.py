@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+This script builds a self-contained, offline HTML report of every chart in
+chart_specs.
+
+plotly.js and the PRT template are included once for the whole page rather
+than per chart, and numeric series are embedded as base64 typed arrays
+({dtype, bdata}, read natively by plotly.js 2.28+) instead of JSON number
+lists. With an older bundled plotly.js the series are written as plain lists.
+The report can be shared as a single file without chart-studio.
+'''
+
+# Imports
+import base64
+import html
+import json
+import logging
+import os
+
+import numpy as np
+import plotly.io as pio
+import plotly.offline
+from plotly.utils import PlotlyJSONEncoder
+
+import src.utilities as utils
+from src.visualization import chart_specs, figure_factory
+
+# Set template
+pio.templates.default = "prt_template"
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REPORT_PATH = os.path.join(utils.CONFIG['reports']['outPath'],
+                                   'prison_population_report.html')
+
+# Smallest dtype first; integer series use the first that holds every value
+INTEGER_DTYPES = [("i1", np.int8), ("i2", np.int16), ("i4", np.int32)]
+
+# First plotly.js release that reads {dtype, bdata} typed arrays
+TYPED_ARRAY_PLOTLYJS = (2, 28)
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>body{{background:#F7F2F2;\
+font-family:"Helvetica Neue",Arial,sans-serif;color:#54565B}}\
+.chart{{width:655px;height:500px;margin:0 auto 2em}}</style>
+{plotlyjs}
+</head>
+<body>
+{divs}
+<script>
+const TEMPLATE = {template};
+const CONFIG = {config};
+const FIGURES = {figures};
+for (const [id, fig] of Object.entries(FIGURES)) {{
+    fig.layout.template = TEMPLATE;
+    Plotly.newPlot(id, fig.data, fig.layout, CONFIG);
+}}
+</script>
+</body>
+</html>
+"""
+
+
+def supports_typed_arrays(version: str | None = None) -> bool:
+    """Checks whether a plotly.js version reads typed arrays.
+
+    Parameters:
+        version (str, optional): plotly.js version, defaults to the one
+            bundled with the installed plotly.
+
+    Returns:
+        bool: True if the version is `TYPED_ARRAY_PLOTLYJS` or later.
+    """
+    version = version or plotly.offline.get_plotlyjs_version()
+    major, minor = (int(part) for part in version.split(".")[:2])
+    return (major, minor) >= TYPED_ARRAY_PLOTLYJS
+
+
+def encode_array(values, typed: bool = True) -> dict | list:
+    """Encodes a numeric array as a plotly.js typed array.
+
+    Integer-valued series use the smallest integer dtype that fits, anything
+    else (including series with gaps) is stored as float64. Non-numeric arrays
+    are returned unchanged as lists.
+
+    Parameters:
+        values: Array-like of values.
+        typed (bool): Whether plotly.js reads typed arrays; if False numeric
+            arrays are returned as lists too.
+
+    Returns:
+        dict | list: {"dtype": ..., "bdata": ...} for numeric input, otherwise
+            a list.
+    """
+    array = np.asarray(values)
+    if array.dtype.kind not in "iuf" or not typed:
+        return array.tolist()
+
+    if np.isfinite(array).all() and np.array_equal(array, np.round(array)):
+        for dtype, np_dtype in INTEGER_DTYPES:
+            info = np.iinfo(np_dtype)
+            if array.size == 0 or (array.min() >= info.min
+                                   and array.max() <= info.max):
+                array = array.astype(np_dtype)
+                break
+        else:
+            dtype, array = "f8", array.astype(np.float64)
+    else:
+        dtype, array = "f8", array.astype(np.float64)
+
+    # plotly.js reads typed arrays in little-endian order
+    array = array.astype(array.dtype.newbyteorder("<"))
+    bdata = base64.b64encode(array.tobytes()).decode("ascii")
+    return {"dtype": dtype, "bdata": bdata}
+
+
+def compact_figure(fig) -> dict:
+    """Converts a figure to a compact, JSON-ready dict.
+
+    Numeric data is encoded as typed arrays if the bundled plotly.js reads
+    them, and the template is dropped, as the page includes it once for every
+    chart.
+    """
+    fig_dict = fig.to_plotly_json()
+    fig_dict["layout"].pop("template", None)
+
+    typed = supports_typed_arrays()
+    for trace in fig_dict["data"]:
+        for key in ("x", "y"):
+            if key in trace:
+                trace[key] = encode_array(trace[key], typed)
+    return {"data": fig_dict["data"], "layout": fig_dict["layout"]}
+
+
+def build_report(
+    specs=None,
+    include_plotlyjs: str = "inline",
+    title: str = "Prison population charts",
+    data=None,
+) -> str:
+    """Builds the HTML report for the given chart specs.
+
+    Parameters:
+        specs (list, optional): Chart specs to include, defaults to
+            `chart_specs.CHART_SPECS`.
+        include_plotlyjs (str): 'inline' embeds plotly.js so the file works
+            offline, 'cdn' loads it from the plotly CDN instead.
+        title (str): Page title.
+        data (pd.DataFrame, optional): Dataset already held in memory; read
+            from disk if None.
+
+    Returns:
+        str: The report HTML.
+    """
+    specs = chart_specs.CHART_SPECS if specs is None else specs
+
+    figures = {}
+    for spec in specs:
+        figures[spec["filename"]] = compact_figure(
+            utils.build_chart_figure(**chart_specs.figure_kwargs(spec),
+                                     data=data)
+        )
+
+    if include_plotlyjs == "inline":
+        plotlyjs = ('<script type="text/javascript">'
+                    f'{plotly.offline.get_plotlyjs()}</script>')
+    elif include_plotlyjs == "cdn":
+        version = plotly.offline.get_plotlyjs_version()
+        plotlyjs = ('<script src="https://cdn.plot.ly/'
+                    f'plotly-{version}.min.js" charset="utf-8"></script>')
+    else:
+        raise ValueError(f"Invalid include_plotlyjs '{include_plotlyjs}'. "
+                         "Valid options: 'inline', 'cdn'")
+
+    def to_json(obj):
+        return json.dumps(obj, cls=PlotlyJSONEncoder, separators=(",", ":"))
+
+    return PAGE_TEMPLATE.format(
+        title=html.escape(title),
+        plotlyjs=plotlyjs,
+        divs="\n".join(f'<div id="{chart_id}" class="chart"></div>'
+                       for chart_id in figures),
+        template=to_json(figure_factory.TEMPLATE),
+        config=to_json(utils.CONFIG['plotly']['config']),
+        figures=to_json(figures),
+    )
+
+
+def main(report_path: str = DEFAULT_REPORT_PATH,
+         include_plotlyjs: str = "inline", data=None) -> str:
+    """Writes the HTML report of all charts and returns its path."""
+    utils.ensure_directory(os.path.dirname(report_path))
+    with open(report_path, "w", encoding="utf-8") as f:
+        f.write(build_report(include_plotlyjs=include_plotlyjs, data=data))
+
+    logger.info("HTML report (%s KB) saved to %s",
+                os.path.getsize(report_path) // 1024, report_path)
+    return report_path
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+This script generates long-view charts covering the full history of a series.
+
+Unlike the year-overlay charts, the long view plots one continuous line
+against date. The series can be aggregated to monthly or annual means and is
+then decimated to at most `max_points` points (LTTB or min/max per bucket), so
+SVG size and render time stay bounded however many years the chart spans.
+'''
+
+# Imports
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+
+import src.utilities as utils
+from src.visualization import chart_specs, figure_factory
+
+# Set template
+pio.templates.default = "prt_template"
+
+DEFAULT_MAX_POINTS = 400
+
+# Period codes for aggregation and the hover label format for each
+AGGREGATIONS = {
+    None: "%d %b %Y",
+    "month": "%b %Y",
+    "year": "%Y",
+}
+_PERIOD_CODES = {"month": "M", "year": "Y"}
+
+
+def downsample_lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Selects points with the Largest-Triangle-Three-Buckets algorithm.
+
+    Keeps the first and last points and, from each of `n_out - 2` equal
+    buckets in between, the point forming the largest triangle with the
+    previously selected point and the mean of the next bucket. This preserves
+    the visual shape of the line.
+
+    Parameters:
+        x (np.ndarray): Numeric, increasing x values.
+        y (np.ndarray): Y values (no NaNs).
+        n_out (int): Number of points to keep.
+
+    Returns:
+        np.ndarray: Indices of the selected points, in order.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = x.astype(float)
+    y = y.astype(float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+
+    selected = np.empty(n_out, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_bucket = slice(end, edges[i + 2])
+            next_x, next_y = x[next_bucket].mean(), y[next_bucket].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+
+        area = np.abs(
+            (x[a] - next_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (next_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def downsample_minmax(y: np.ndarray, n_buckets: int) -> np.ndarray:
+    """Selects the minimum and maximum point in each of `n_buckets` buckets.
+
+    Keeps every peak and trough, returning at most `2 * n_buckets` points.
+
+    Parameters:
+        y (np.ndarray): Y values (no NaNs).
+        n_buckets (int): Number of buckets.
+
+    Returns:
+        np.ndarray: Indices of the selected points, in order.
+    """
+    n = len(y)
+    if 2 * n_buckets >= n:
+        return np.arange(n)
+
+    starts = np.linspace(0, n, n_buckets + 1).astype(int)[:-1]
+    mins = np.minimum.reduceat(y, starts)
+    maxs = np.maximum.reduceat(y, starts)
+
+    # Map each bucket's extreme values back to the first index where they occur
+    bucket = np.repeat(np.arange(n_buckets), np.diff(np.append(starts, n)))
+    selected = []
+    for extremes in (mins, maxs):
+        idx = np.flatnonzero(y == extremes[bucket])
+        _, first = np.unique(bucket[idx], return_index=True)
+        selected.append(idx[first])
+    return np.unique(np.concatenate(selected))
+
+
+def aggregate_series(df: pd.DataFrame,
+                     aggregation: str | None) -> pd.DataFrame:
+    """Aggregates a single series to monthly or annual means.
+
+    Parameters:
+        df (pd.DataFrame): Rows for one series with date and value columns.
+        aggregation (str, optional): 'month', 'year', or None to keep weekly
+            values.
+
+    Returns:
+        pd.DataFrame: Date and value columns, dated at the start of each
+            period.
+
+    Raises:
+        ValueError: If the aggregation is not recognised.
+    """
+    if aggregation not in AGGREGATIONS:
+        raise ValueError(f"Invalid aggregation '{aggregation}'. "
+                         f"Valid options: {list(AGGREGATIONS)}")
+
+    df = df.loc[:, ["date", "value"]].assign(
+        value=lambda x: x["value"].astype(float)).dropna()
+    if aggregation is None:
+        return df.sort_values("date").reset_index(drop=True)
+
+    periods = df["date"].dt.to_period(_PERIOD_CODES[aggregation])
+    return (
+        df.groupby(periods)["value"].mean()
+        .rename_axis("date")
+        .reset_index()
+        .assign(date=lambda x: x["date"].dt.to_timestamp())
+    )
+
+
+def decimate(
+    df: pd.DataFrame,
+    max_points: int = DEFAULT_MAX_POINTS,
+    method: str = "lttb",
+) -> pd.DataFrame:
+    """Reduces a series to at most `max_points` points.
+
+    Parameters:
+        df (pd.DataFrame): Date-sorted series with date and value columns.
+        max_points (int): Maximum number of points to keep.
+        method (str): 'lttb' or 'minmax'.
+
+    Returns:
+        pd.DataFrame: The selected rows.
+
+    Raises:
+        ValueError: If the method is not recognised.
+    """
+    y = df["value"].to_numpy(dtype=float)
+    if method == "lttb":
+        x = df["date"].to_numpy(dtype="datetime64[ns]").astype(np.int64)
+        indices = downsample_lttb(x, y, max_points)
+    elif method == "minmax":
+        indices = downsample_minmax(y, max_points // 2)
+    else:
+        raise ValueError(f"Invalid method '{method}'. "
+                         "Valid options: 'lttb', 'minmax'")
+    return df.iloc[indices].reset_index(drop=True)
+
+
+def build_long_view_figure(
+    group: str,
+    category: str,
+    chart_title: str,
+    y_label: str,
+    start_year: int | None = None,
+    end_year: int | None = None,
+    aggregation: str | None = None,
+    max_points: int = DEFAULT_MAX_POINTS,
+    method: str = "lttb",
+    yaxis_range: tuple | None = None,
+    yaxis_dtick: int | None = None,
+    data: pd.DataFrame | None = None,
+):
+    """
+    Creates a long-view chart of one series over its full history.
+
+    Parameters:
+        group (str): Data group to filter by (e.g., 'total', 'female')
+        category (str): Data category to filter by (e.g., 'prison', 'hdc',
+            'operational_capacity')
+        chart_title (str): Title for the chart
+        y_label (str): Y-axis label
+        start_year (int, optional): First year to include, defaults to the
+            earliest year available
+        end_year (int, optional): Last year to include, defaults to the latest
+            year available
+        aggregation (str, optional): 'month' or 'year' to plot period means
+            instead of weekly values
+        max_points (int, optional): Maximum number of points plotted
+        method (str, optional): Decimation method, 'lttb' or 'minmax'
+        yaxis_range (tuple, optional): Y-axis range (min, max), defaults to
+            autorange
+        yaxis_dtick (int, optional): Y-axis tick interval
+        data (pd.DataFrame, optional): Dataset already held in memory; read
+            from disk if None
+
+    Returns:
+        go.Figure: The created Plotly figure
+    """
+    if data is None:
+        df_raw = utils.load_data(os.path.join(
+            utils.CONFIG['data']['clnFilePath'], 'processed_data.csv'))
+    else:
+        df_raw = data
+    if start_year is None:
+        start_year = int(df_raw["date"].dt.year.min())
+
+    df_series = utils.filter_data(df_raw, group, category, start_year,
+                                  end_year)
+    df = decimate(aggregate_series(df_series, aggregation), max_points, method)
+
+    trace = dict(
+        type="scatter",
+        x=df["date"].to_numpy(),
+        y=df["value"].to_numpy(),
+        mode="lines",
+        hovertext=df["date"].dt.strftime(AGGREGATIONS[aggregation]).to_numpy(),
+        hovertemplate="<b>%{hovertext}</b><br>%{y:,.0f}",
+        name=y_label,
+    )
+
+    fig = figure_factory.new_figure(
+        [trace],
+        dict(
+            title=figure_factory.wrap_title(chart_title),
+            annotations=figure_factory.fixed_annotations(y_label),
+            xaxis=dict(type="date", range=(df["date"].min(),
+                                           df["date"].max()),
+                       tickformat="%Y"),
+            yaxis=dict(range=yaxis_range, autorange=yaxis_range is None),
+        ),
+    )
+    # The base layout's tick interval suits the weekly charts' narrow ranges;
+    # long views use automatic ticks unless one is given
+    fig.layout.yaxis.dtick = yaxis_dtick
+    return fig
+
+
+def generate_and_save_long_view_chart(
+    filename: str, out_dir: str = utils.CONFIG['viz']['outPath'], **spec
+) -> None:
+    """Builds a long-view chart from a spec and saves it like other charts."""
+    utils.save_chart(build_long_view_figure(**spec), filename, out_dir)
+    return None
+
+
+def main(data=None, out_dir=utils.CONFIG['viz']['outPath']):
+    """Creates the long-view charts defined in chart_specs."""
+    for spec in chart_specs.LONG_VIEW_SPECS:
+        generate_and_save_long_view_chart(**spec, data=data, out_dir=out_dir)
+    return None
+
+
+if __name__ == "__main__":
+    main()
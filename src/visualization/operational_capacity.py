@@ -8,28 +8,16 @@ This script generates a chart visualizing the operational capacity of prisons in
 import plotly.io as pio
 
 import src.utilities as utils
+from src.visualization import chart_specs
 
 # Set template
 pio.templates.default = "prt_template"
 
 
-def main():
+def main(data=None, out_dir=utils.CONFIG['viz']['outPath']):
     """Creates chart showing the operational capacity of prisons in England and Wales."""
-
-    y_offset_dict = {
-        "2023": 400,
-    }
-
     utils.generate_and_save_chart(
-        group="total",
-        category="operational_capacity",
-        start_year=2021,
-        chart_title="<b>Operational capacity in England and Wales</b>",
-        y_label="Prison places",
-        filename="operational_capacity",
-        yaxis_range=(75900, 90100),
-        y_offset_dict=y_offset_dict
-    )
+        **chart_specs.OPERATIONAL_CAPACITY, data=data, out_dir=out_dir)
     return None
 
 
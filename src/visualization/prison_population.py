@@ -5,22 +5,16 @@
 import plotly.io as pio
 
 import src.utilities as utils
+from src.visualization import chart_specs
 
 # Set template
 pio.templates.default = "prt_template"
 
 
-def main():
+def main(data=None, out_dir=utils.CONFIG['viz']['outPath']):
     """Creates chart showing the prison population in England and Wales."""
     utils.generate_and_save_chart(
-        group="total",
-        category="prison",
-        start_year=2021,
-        chart_title="<b>Prison population in England and Wales</b>",
-        y_label="People in prison",
-        filename="prison_population",
-        yaxis_range=(75900, 90100)
-    )
+        **chart_specs.PRISON_POPULATION, data=data, out_dir=out_dir)
     return None
 
 
@@ -9,24 +9,39 @@ Highest prison population 88,521 6 September 2024
 '''
 
 from src import utilities as utils
-from src.data import download_data, make_dataset, weekly_data_summary
-from src.visualization import (HDC_caseload, female_population,
-                               operational_capacity, prison_population)
+from src.data import pipeline, weekly_data_summary
+from src.features import build_features
+from src.visualization import (HDC_caseload, female_population, html_report,
+                               long_view, operational_capacity,
+                               prison_population)
 
 
 def download_data_and_make_dataset():
-    """Download data and create dataset. By default, downloads data for the current year."""
-    download_data.download_prison_population_data(years=2025)
-    make_dataset.main()
-    weekly_data_summary.main()
-
-
-def make_charts():
-    """Generate and save charts using the processed dataset."""
-    prison_population.main()
-    female_population.main()
-    HDC_caseload.main()
-    operational_capacity.main()
+    """Download data and create dataset.
+
+    By default, downloads data for the current year. Each file is parsed as
+    soon as it is downloaded (see `pipeline.run_pipeline`).
+    """
+    with utils.log_stage("fetch"):
+        pipeline.run_pipeline(years=2025)
+        build_features.main()
+    with utils.log_stage("summary"):
+        weekly_data_summary.main()
+
+
+def make_charts(data=None, out_dir=utils.CONFIG['viz']['outPath'],
+                report_path=html_report.DEFAULT_REPORT_PATH):
+    """Generate and save charts using the processed dataset.
+
+    The dataset is read from the configured processed directory unless
+    `data` is given.
+    """
+    with utils.log_stage("charts"):
+        for chart in (prison_population, female_population, HDC_caseload,
+                      operational_capacity, long_view):
+            chart.main(data=data, out_dir=out_dir)
+    with utils.log_stage("report"):
+        html_report.main(report_path, data=data)
 
 
 def main():
@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Minified, precompressed SVG chart artifacts for the website.
+
+Kaleido's SVGs carry a lot the browser never uses: plotly class names and
+`data-*` attributes, empty layer groups, ids nothing references, coordinates to
+many decimal places, `rgb(r, g, b)` colours and the same font stack repeated on
+every text element. `minify_svg` removes those, rounds coordinates, lengths and
+translate offsets (never scales, rotations or matrices) to `svgPrecision`
+decimals, writes colours as hex and hoists the most common font stack into one
+CSS rule (optionally cut down to the families in `svgFontFamilies`, the fonts
+the website actually loads).
+
+`write_artifacts` saves the minified `.svg` with `.svg.gz` and, if the `brotli`
+package is installed, `.svg.br` variants, and records each file's size and
+hash in `manifest.json`. Files whose content has not changed are not
+rewritten. `utilities.save_chart` calls it for every chart;
+`python -m src artifacts` re-runs it over the SVGs already in the figures
+directory.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import xml.etree.ElementTree as ET
+from collections import Counter
+from datetime import datetime
+
+from src.utilities import ensure_directory, read_config
+
+config = read_config()
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUT_DIR = config["viz"]["outPath"]
+PRECISION = config["viz"].get("svgPrecision", 1)
+FONT_FAMILIES = config["viz"].get("svgFontFamilies") or None
+MANIFEST_FILENAME = "manifest.json"
+
+SVG_NS = "http://www.w3.org/2000/svg"
+XLINK_NS = "http://www.w3.org/1999/xlink"
+ET.register_namespace("", SVG_NS)
+ET.register_namespace("xlink", XLINK_NS)
+
+# Attributes holding coordinates or lengths, whose numbers are rounded.
+# Transforms are handled apart, as only their translate offsets are lengths.
+GEOMETRY_ATTRIBUTES = {"d", "x", "y", "x1", "x2", "y1", "y2", "dx", "dy",
+                       "width", "height", "cx", "cy", "r", "rx", "ry",
+                       "points", "viewBox"}
+GENERIC_FAMILIES = {"serif", "sans-serif", "monospace", "cursive", "fantasy",
+                    "system-ui"}
+FONT_CLASS = "f"
+
+NUMBER_PATTERN = re.compile(r"-?(?:\d+\.\d*|\.\d+|\d+)(?:[eE][-+]?\d+)?")
+RGB_PATTERN = re.compile(
+    r"rgba?\((\d+),\s*(\d+),\s*(\d+)(?:,\s*1(?:\.0*)?)?\)")
+REFERENCE_PATTERN = re.compile(r"url\(['\"]?#([^)'\"]+)['\"]?\)")
+TRANSFORM_PATTERN = re.compile(r"([a-zA-Z]+)\s*\(([^)]*)\)")
+
+
+def _round_number(match: re.Match, precision: int) -> str:
+    """Rounds one number, dropping trailing zeros and any leading zero."""
+    text = match.group(0)
+    if "." not in text and "e" not in text.lower():
+        return text
+    rounded = f"{round(float(text), precision):.{precision}f}"
+    if "." in rounded:
+        rounded = rounded.rstrip("0").rstrip(".")
+    if rounded in ("-0", ""):
+        return "0"
+    if rounded.startswith(("0.", "-0.")):
+        return rounded.replace("0.", ".", 1)
+    return rounded
+
+
+def _round_numbers(value: str, precision: int) -> str:
+    """Rounds every number in an attribute value."""
+    return NUMBER_PATTERN.sub(lambda m: _round_number(m, precision), value)
+
+
+def _round_transform(transform: str, precision: int) -> str:
+    """Rounds the offsets of translate(), leaving other transforms as they are.
+
+    Scale factors, angles and matrices multiply every coordinate they apply to,
+    so rounding them (e.g. scale(0.04) to scale(0)) would move or hide content.
+    """
+    def round_function(match: re.Match) -> str:
+        name, args = match.groups()
+        if name == "translate":
+            args = _round_numbers(args, precision)
+        return f"{name}({args})"
+
+    return TRANSFORM_PATTERN.sub(round_function, transform)
+
+
+def _hex_colour(match: re.Match) -> str:
+    """Writes an opaque rgb()/rgba() colour as #rrggbb, or #rgb if possible."""
+    colour = "".join(f"{int(channel):02x}" for channel in match.groups())
+    if all(colour[i] == colour[i + 1] for i in (0, 2, 4)):
+        colour = colour[::2]
+    return f"#{colour}"
+
+
+def _subset_font_stack(stack: str, font_families: list[str] | None) -> str:
+    """Keeps the families the website loads in a font-family stack.
+
+    Generic fallbacks such as sans-serif are kept as well.
+    """
+    families = [family.strip() for family in stack.split(",")]
+    if font_families:
+        allowed = {family.lower() for family in font_families}
+        families = [family for family in families
+                    if family.strip("'\"").lower() in allowed
+                    or family.lower() in GENERIC_FAMILIES] or families
+    return ",".join(families)
+
+
+def _minify_style(style: str, font_families: list[str] | None) -> dict:
+    """Parses an inline style into compact declarations.
+
+    Declarations that have no effect are dropped.
+    """
+    declarations = {}
+    for declaration in style.split(";"):
+        if ":" not in declaration:
+            continue
+        name, value = (part.strip() for part in declaration.split(":", 1))
+        value = RGB_PATTERN.sub(_hex_colour, value)
+        if name == "font-family":
+            value = _subset_font_stack(value, font_families)
+        # Opacity is not inherited and defaults to 1
+        if name == "opacity" and value in ("1", "1.0"):
+            continue
+        declarations[name] = value
+    return declarations
+
+
+def _clean_attributes(
+    element: ET.Element,
+    referenced: set,
+    keep_classes: bool,
+    precision: int,
+    font_families: list[str] | None,
+) -> dict | None:
+    """Drops unused attributes and rounds or shortens the rest in place.
+
+    Returns:
+        dict | None: The element's parsed inline style, or None if it has
+            none. The style attribute itself is left for
+            `_serialise_styles` to rewrite.
+    """
+    style = None
+    for name in list(element.attrib):
+        value = element.attrib[name]
+        if (name.startswith("data-")
+                or (name == "class" and not keep_classes)
+                or (name == "id" and value not in referenced)):
+            del element.attrib[name]
+        elif name in GEOMETRY_ATTRIBUTES:
+            element.attrib[name] = _round_numbers(value, precision)
+        elif name == "transform":
+            element.attrib[name] = _round_transform(value, precision)
+        elif name == "style":
+            style = _minify_style(value, font_families)
+        elif name in ("fill", "stroke"):
+            element.attrib[name] = RGB_PATTERN.sub(_hex_colour, value)
+    return style
+
+
+def _strip_whitespace(element: ET.Element) -> None:
+    """Drops whitespace-only text and tails around an element.
+
+    Only called for elements outside text, where such whitespace is
+    insignificant.
+    """
+    if element.tail is not None and not element.tail.strip():
+        element.tail = None
+    if (element.tag != f"{{{SVG_NS}}}text"
+            and element.text is not None
+            and not element.text.strip()):
+        element.text = None
+
+
+def _hoist_font_stack(root: ET.Element, styles: dict) -> None:
+    """Declares the most common font stack once in a <style> element.
+
+    Elements using it get the `FONT_CLASS` class in place of their own
+    font-family declaration. Nothing changes unless the stack is used more
+    than once.
+    """
+    stacks = Counter(declarations["font-family"]
+                     for declarations in styles.values()
+                     if "font-family" in declarations)
+    if not stacks or stacks.most_common(1)[0][1] < 2:
+        return
+    stack = stacks.most_common(1)[0][0]
+    for element, declarations in styles.items():
+        if declarations.get("font-family") == stack:
+            del declarations["font-family"]
+            classes = element.get("class")
+            element.set("class", f"{classes} {FONT_CLASS}"
+                        if classes else FONT_CLASS)
+    style_element = ET.Element(f"{{{SVG_NS}}}style")
+    style_element.text = f".{FONT_CLASS}{{font-family:{stack}}}"
+    root.insert(0, style_element)
+
+
+def _serialise_styles(styles: dict) -> None:
+    """Writes the compacted inline styles back, dropping empty ones."""
+    for element, declarations in styles.items():
+        if declarations:
+            element.set("style", ";".join(
+                f"{name}:{value}" for name, value in declarations.items()))
+        else:
+            del element.attrib["style"]
+
+
+def minify_svg(
+    svg: bytes | str,
+    precision: int = PRECISION,
+    font_families: list[str] | None = FONT_FAMILIES,
+) -> bytes:
+    """Returns a smaller SVG that renders the same.
+
+    Args:
+        svg (bytes | str): SVG document, as written by kaleido.
+        precision (int): Decimal places kept in coordinates and lengths.
+        font_families (list[str], optional): Font families the page loads;
+            other named families are dropped from font stacks.
+
+    Returns:
+        bytes: The minified SVG, UTF-8 encoded.
+    """
+    root = ET.fromstring(svg)
+    elements = list(root.iter())
+    text = ET.tostring(root, encoding="unicode")
+    referenced = (set(REFERENCE_PATTERN.findall(text))
+                  | set(re.findall(r'href="#([^"]+)"', text)))
+    # Classes only matter to a stylesheet; plotly's exports inline every style
+    keep_classes = any(element.tag == f"{{{SVG_NS}}}style"
+                       for element in elements)
+    # Whitespace between elements is insignificant outside text
+    in_text = {node for element in root.iter(f"{{{SVG_NS}}}text")
+               for node in element.iter() if node is not element}
+
+    styles = {}
+    for element in elements:
+        style = _clean_attributes(element, referenced, keep_classes,
+                                  precision, font_families)
+        if style is not None:
+            styles[element] = style
+        if element not in in_text:
+            _strip_whitespace(element)
+
+    # Declare the most common font stack once instead of on every text element
+    _hoist_font_stack(root, styles)
+    _serialise_styles(styles)
+    _prune(root)
+    # ">" is escaped in attribute values and text, so " />" only ends empty
+    # elements
+    return ET.tostring(root, encoding="utf-8",
+                       xml_declaration=False).replace(b" />", b"/>")
+
+
+def _prune(element: ET.Element) -> None:
+    """Removes elements that draw nothing and unwraps attribute-less groups.
+
+    Descendants are pruned first, innermost first.
+    """
+    position = 0
+    for child in list(element):
+        _prune(child)
+        tag = child.tag.rsplit("}", 1)[-1]
+        if ((tag in ("g", "defs") and len(child) == 0)
+                or (tag == "clipPath" and "id" not in child.attrib)
+                or (tag == "path" and not child.get("d"))):
+            element.remove(child)
+        elif tag == "g" and not child.attrib:
+            # A group with no attributes has no effect on its children
+            element.remove(child)
+            for grandchild in reversed(list(child)):
+                element.insert(position, grandchild)
+            position += len(child)
+        else:
+            position += 1
+
+
+def compress(body: bytes) -> dict:
+    """Returns the precompressed variants of a file, keyed by suffix."""
+    # mtime=0 keeps the compressed bytes identical for identical content
+    variants = {".gz": gzip.compress(body, compresslevel=9, mtime=0)}
+    try:
+        import brotli  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        logger.debug("brotli is not installed; skipping .br variants")
+    else:
+        variants[".br"] = brotli.compress(body, quality=11,
+                                          mode=brotli.MODE_TEXT)
+    return variants
+
+
+def read_manifest(out_dir: str = DEFAULT_OUT_DIR) -> dict:
+    """Reads the artifact manifest, returning an empty one if none exists."""
+    manifest_path = os.path.join(out_dir, MANIFEST_FILENAME)
+    if not os.path.exists(manifest_path):
+        return {"charts": {}}
+    with open(manifest_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_artifacts(
+    svg: bytes | str,
+    filename: str,
+    out_dir: str = DEFAULT_OUT_DIR,
+    manifest: dict | None = None,
+) -> dict:
+    """Writes the minified SVG and its compressed variants.
+
+    The files are recorded in the manifest.
+
+    Args:
+        svg (bytes | str): The SVG as rendered.
+        filename (str): Chart filename without extension.
+        out_dir (str): Figures directory.
+        manifest (dict, optional): Manifest to update and leave for the
+            caller to write; if None the manifest file is read and written
+            here.
+
+    Returns:
+        dict: The chart's manifest entry.
+    """
+    ensure_directory(out_dir)
+    source = svg.encode("utf-8") if isinstance(svg, str) else svg
+    body = minify_svg(source)
+    content_hash = hashlib.sha256(body).hexdigest()
+
+    own_manifest = manifest is None
+    manifest = read_manifest(out_dir) if own_manifest else manifest
+    previous = manifest["charts"].get(filename, {})
+
+    files = {"": body, **compress(body)}
+    # Re-running over an already minified SVG keeps the size it was rendered at
+    source_bytes = len(source)
+    if hashlib.sha256(source).hexdigest() == previous.get("sha256"):
+        source_bytes = previous.get("source_bytes", source_bytes)
+    entry = {"source_bytes": source_bytes, "sha256": content_hash,
+             "files": {}}
+    written = 0
+    for suffix, data in files.items():
+        name = f"{filename}.svg{suffix}"
+        path = os.path.join(out_dir, name)
+        # Unchanged files keep their modification time, so deploys only
+        # upload what changed
+        unchanged = (previous.get("sha256") == content_hash
+                     and os.path.exists(path))
+        if not unchanged:
+            with open(path, "wb") as f:
+                f.write(data)
+            written += 1
+        entry["files"][name] = {"bytes": len(data),
+                                "sha256": hashlib.sha256(data).hexdigest()}
+
+    # Variants no longer produced (e.g. brotli was uninstalled) would
+    # otherwise be served stale
+    for name in set(previous.get("files", {})) - set(entry["files"]):
+        if os.path.exists(os.path.join(out_dir, name)):
+            os.remove(os.path.join(out_dir, name))
+
+    entry["updated_at"] = (
+        datetime.now().isoformat(timespec="seconds") if written
+        else previous.get("updated_at"))
+    manifest["charts"][filename] = entry
+    if own_manifest:
+        write_manifest(manifest, out_dir)
+
+    logger.info("Wrote %s artifacts for %s: %s bytes rendered, %s", written,
+                filename, source_bytes,
+                ", ".join(f"{name} {meta['bytes']}"
+                          for name, meta in entry["files"].items()))
+    return entry
+
+
+def write_manifest(manifest: dict, out_dir: str = DEFAULT_OUT_DIR) -> None:
+    """Writes the artifact manifest atomically."""
+    manifest_path = os.path.join(out_dir, MANIFEST_FILENAME)
+    with open(f"{manifest_path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(f"{manifest_path}.tmp", manifest_path)
+
+
+def main(out_dir: str = DEFAULT_OUT_DIR) -> dict:
+    """Re-minifies and compresses every SVG in the figures directory."""
+    manifest = read_manifest(out_dir)
+    for name in sorted(os.listdir(out_dir)):
+        if name.endswith(".svg"):
+            with open(os.path.join(out_dir, name), "rb") as f:
+                write_artifacts(f.read(), name[:-len(".svg")], out_dir,
+                                manifest)
+    write_manifest(manifest, out_dir)
+    return manifest
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    main()
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Long-running watch mode that republishes charts as soon as a bulletin lands.
+
+A scheduled run of `run_prison_population.main` pays interpreter start-up,
+plotly and kaleido imports, a full CSV parse and a renderer launch every time.
+`watch` pays them once: it keeps the processed dataset in memory and the
+kaleido renderer running, polls the content API (and `data/raw/` for files
+added by other means), and when raw files appear or change it parses only
+those files, merges them into the in-memory dataset, saves the outputs and
+re-renders only the charts whose series changed.
+
+    python -m src watch --interval 60 --api-interval 900
+"""
+
+import fnmatch
+import logging
+import os
+import time
+from pathlib import Path
+
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from src import utilities as utils
+from src.data import download_data, make_dataset, revisions, validate_dataset
+from src.features import build_features
+from src.visualization import chart_specs, html_report, long_view
+
+logger = logging.getLogger(__name__)
+
+CONFIG = utils.CONFIG
+KEYS = ["date", "group", "type"]
+# Source of rows loaded from the processed dataset, whose raw file is not
+# known. It sorts after every file path, so a raw file with the same rank wins
+STORED_SOURCE = "~stored"
+
+
+def warm_renderer() -> None:
+    """Starts the kaleido renderer so the first export skips its start-up."""
+    try:
+        pio.to_image(go.Figure(), format="svg")
+        logger.info("Image renderer started")
+    except (ValueError, RuntimeError) as e:
+        logger.warning("Could not start the image renderer: %s", e)
+
+
+def scan_raw_files(raw_dir: str, file_pattern: str = "*.ods") -> dict:
+    """Returns the (mtime, size) of every matching raw file, keyed by path."""
+    files = {}
+    for root, _, filenames in os.walk(raw_dir):
+        for filename in fnmatch.filter(filenames, file_pattern):
+            path = os.path.join(root, filename)
+            stat = os.stat(path)
+            files[path] = (stat.st_mtime, stat.st_size)
+    return files
+
+
+def changed_files(previous: dict, current: dict) -> list[str]:
+    """Returns the files that are new or have changed since the last scan."""
+    return sorted(path for path, signature in current.items()
+                  if previous.get(path) != signature)
+
+
+def normalise(df: pd.DataFrame) -> pd.DataFrame:
+    """Gives parsed or loaded rows the dtypes used by the in-memory dataset."""
+    return df.assign(
+        date=pd.to_datetime(df["date"]),
+        value=pd.to_numeric(df["value"], errors="coerce").astype("Int64"),
+    )
+
+
+def merge_rows(
+    data: pd.DataFrame,
+    new_rows: pd.DataFrame,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Merges new rows into the dataset.
+
+    Rows for the same date, group and type are resolved by
+    `revisions.deduplicate`, as in a full build. Rows without a `source`
+    column are taken to be loaded from the processed dataset and get
+    `STORED_SOURCE`.
+
+    Returns:
+        tuple: (merged dataset with sources, rows that were added or whose
+            value changed).
+    """
+    if "source" not in data.columns:
+        data = data.assign(source=STORED_SOURCE)
+    merged = normalise(revisions.deduplicate(
+        pd.concat([data, new_rows], ignore_index=True)))
+
+    existing = data.loc[:, KEYS + ["value"]].merge(
+        merged.loc[:, KEYS + ["value"]], on=KEYS, how="right",
+        suffixes=("_old", ""), indicator=True)
+    differs = (existing["value_old"] != existing["value"]).fillna(True) & ~(
+        existing["value_old"].isna() & existing["value"].isna()
+    )
+    changed = existing.loc[(existing["_merge"] == "right_only") | differs,
+                           KEYS + ["value"]]
+    return merged, changed.reset_index(drop=True)
+
+
+def affected_specs(changed: pd.DataFrame, specs: list[dict]) -> list[dict]:
+    """Returns the specs whose series and time window include a changed row."""
+    affected = []
+    for spec in specs:
+        mask = ((changed["group"] == spec["group"])
+                & (changed["type"] == spec["category"]))
+        if spec.get("start_year") is not None:
+            mask &= changed["date"].dt.year >= spec["start_year"]
+        if mask.any():
+            affected.append(spec)
+    return affected
+
+
+def load_state(raw_dir: str, processed_dir: str,
+               file_pattern: str = "*.ods") -> dict:
+    """Loads the processed dataset and records the raw files it was built from.
+
+    If no processed dataset exists yet, a full build is run first.
+    """
+    data_path = os.path.join(processed_dir, "processed_data.csv")
+    if not os.path.exists(data_path):
+        make_dataset.main(raw_dir, processed_dir, file_pattern=file_pattern)
+
+    data = normalise(utils.load_data(data_path))
+    logger.info("Loaded %s rows up to %s", len(data),
+                data["date"].max().date())
+    return {"data": data, "files": scan_raw_files(raw_dir, file_pattern)}
+
+
+def apply_changes(state: dict, files: list[str],
+                  processed_dir: str) -> pd.DataFrame:
+    """Parses changed raw files, merges them into the dataset and saves it.
+
+    Returns:
+        pd.DataFrame: Rows added or revised by the files (empty if nothing
+            changed).
+    """
+    frames = {file: make_dataset.process_file(file) for file in files}
+    parse_failures = [file for file, frame in frames.items() if frame.empty]
+    parsed = [frame.assign(source=file) for file, frame in frames.items()
+              if not frame.empty]
+    if not parsed:
+        logger.warning("No rows parsed from %s changed files", len(files))
+        return pd.DataFrame(columns=KEYS + ["value"])
+
+    new_rows = normalise(
+        revisions.deduplicate(pd.concat(parsed, ignore_index=True)))
+    merged, changed = merge_rows(state["data"], new_rows)
+    if changed.empty:
+        logger.info("Changed files contain no new or revised values")
+        return changed
+
+    validate_dataset.validate(
+        merged,
+        new_dates=changed["date"],
+        parse_failures=parse_failures,
+        report_path=Path(processed_dir) / "validation_report.json",
+    )
+    # Only values the new files overlap can have been revised
+    previous = state["data"].merge(new_rows.loc[:, KEYS], on=KEYS)
+    revisions.append_revision_log(revisions.diff_datasets(previous, merged),
+                                  Path(processed_dir) / "revisions.csv")
+    published = merged.drop(columns="source")
+    make_dataset.save_outputs(published, processed_dir, changed_rows=changed)
+    build_features.update_features(
+        published, make_dataset.output_path(
+            processed_dir, build_features.DEFAULT_FEATURES_PATH))
+
+    state["data"] = merged
+    logger.info("Merged %s new or revised values from %s files",
+                len(changed), len(files))
+    return changed
+
+
+def render_affected(changed: pd.DataFrame, data: pd.DataFrame,
+                    processed_dir: str) -> list[str]:
+    """Re-renders the charts affected by the changed rows.
+
+    The HTML report is rebuilt if any chart was. Both are written where the
+    build of `processed_dir` puts them.
+
+    Returns:
+        list[str]: Filenames of the charts rendered.
+    """
+    out_dir = make_dataset.output_path(processed_dir, CONFIG['viz']['outPath'])
+    rendered = []
+    for spec in affected_specs(changed, chart_specs.CHART_SPECS):
+        fig = utils.build_chart_figure(**chart_specs.figure_kwargs(spec),
+                                       data=data)
+        utils.save_chart(fig, spec["filename"], out_dir)
+        rendered.append(spec["filename"])
+
+    for spec in affected_specs(changed, chart_specs.LONG_VIEW_SPECS):
+        fig = long_view.build_long_view_figure(
+            **chart_specs.figure_kwargs(spec), data=data)
+        utils.save_chart(fig, spec["filename"], out_dir)
+        rendered.append(spec["filename"])
+
+    if rendered:
+        html_report.main(make_dataset.output_path(
+            processed_dir, html_report.DEFAULT_REPORT_PATH), data=data)
+    return rendered
+
+
+def poll_api(raw_dir: str) -> None:
+    """Downloads any new bulletins for this year from the content API."""
+    try:
+        download_data.download_prison_population_data(
+            years=time.localtime().tm_year, path=raw_dir)
+    except (OSError, ValueError, KeyError) as e:
+        # Network errors and unexpected API responses are retried on the next
+        # poll
+        logger.warning("Content API poll failed: %s", e)
+
+
+def update(state: dict, raw_dir: str, processed_dir: str,
+           file_pattern: str = "*.ods") -> list[str]:
+    """Scans for new or changed raw files once and publishes what they change.
+
+    Errors are logged rather than raised so the watch keeps running. The scan
+    is only recorded in `state` once the files have been merged, so files
+    whose update failed are picked up again by the next scan.
+
+    Returns:
+        list[str]: Filenames of the charts rendered.
+    """
+    try:
+        files = scan_raw_files(raw_dir, file_pattern)
+    except OSError:
+        logger.exception("Could not scan %s", raw_dir)
+        return []
+
+    changed = changed_files(state["files"], files)
+    if not changed:
+        state["files"] = files
+        return []
+
+    started = time.perf_counter()
+    logger.info("Detected %s new or changed raw files", len(changed))
+    with utils.log_stage("update"):
+        try:
+            changed_rows = apply_changes(state, changed, processed_dir)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Could not apply %s changed files; retrying on "
+                             "the next scan", len(changed))
+            return []
+        state["files"] = files
+
+        try:
+            rendered = ([] if changed_rows.empty
+                        else render_affected(changed_rows, state["data"],
+                                             processed_dir))
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Could not render the charts affected by %s "
+                             "changed values", len(changed_rows))
+            return []
+    logger.info("Published %s charts %.1fs after detecting the change: %s",
+                len(rendered), time.perf_counter() - started, rendered)
+    return rendered
+
+
+def watch(
+    raw_dir: str = CONFIG['data']['rawFilePath'],
+    processed_dir: str = CONFIG['data']['clnFilePath'],
+    interval: float = 60,
+    api_interval: float | None = 900,
+    file_pattern: str = "*.ods",
+    max_polls: int | None = None,
+) -> None:
+    """Polls for new bulletins and republishes affected charts.
+
+    Runs until interrupted, or for `max_polls` scans.
+
+    Parameters:
+        raw_dir (str): Directory holding the raw bulletins.
+        processed_dir (str): Directory holding the processed dataset.
+        interval (float): Seconds between scans of `raw_dir`.
+        api_interval (float, optional): Seconds between content API polls;
+            None only watches `raw_dir`.
+        file_pattern (str): Glob pattern for raw files.
+        max_polls (int, optional): Stop after this many scans (runs forever if
+            None).
+    """
+    warm_renderer()
+    state = load_state(raw_dir, processed_dir, file_pattern)
+    last_api_poll = None
+    polls = 0
+
+    logger.info("Watching %s every %ss", raw_dir, interval)
+    try:
+        while max_polls is None or polls < max_polls:
+            if api_interval is not None and (
+                    last_api_poll is None
+                    or time.monotonic() - last_api_poll >= api_interval):
+                poll_api(raw_dir)
+                last_api_poll = time.monotonic()
+
+            update(state, raw_dir, processed_dir, file_pattern)
+
+            polls += 1
+            if max_polls is None or polls < max_polls:
+                time.sleep(interval)
+    except KeyboardInterrupt:
+        logger.info("Watch mode stopped")
@@ -0,0 +1,38 @@
+"""Shared fixtures for the test suite."""
+
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Modules read config.yaml from the working directory when imported
+os.chdir(ROOT)
+sys.path.insert(0, str(ROOT))
+
+
+def make_rows(dates, groups=("total", "male", "female"), category="prison",
+              base=1000) -> pd.DataFrame:
+    """Builds processed rows with a steady value per group.
+
+    The total equals the sum of the other groups, so the rows pass the
+    data quality checks.
+    """
+    components = [group for group in groups if group != "total"]
+    rows = []
+    for i, date in enumerate(pd.to_datetime(list(dates))):
+        values = {group: base * (n + 1) + i
+                  for n, group in enumerate(components)}
+        values["total"] = sum(values.values())
+        rows += [(date, group, category, values[group]) for group in groups]
+    df = pd.DataFrame(rows, columns=["date", "group", "type", "value"])
+    return df.assign(value=df["value"].astype("Int64"))
+
+
+@pytest.fixture
+def weekly_rows() -> pd.DataFrame:
+    """Eight weeks of processed rows for one type."""
+    return make_rows(pd.date_range("2024-01-05", periods=8, freq="7D"))
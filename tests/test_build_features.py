@@ -0,0 +1,59 @@
+"""Tests for the derived-metrics layer."""
+
+import pandas as pd
+
+from conftest import make_rows
+from src.features import build_features
+
+
+def history(weeks: int = 70) -> pd.DataFrame:
+    dates = pd.date_range("2023-01-06", periods=weeks, freq="7D")
+    return pd.concat([
+        make_rows(dates, category="prison"),
+        make_rows(dates, category="operational_capacity", base=1100),
+    ], ignore_index=True)
+
+
+def assert_same_features(actual, expected):
+    pd.testing.assert_frame_equal(
+        actual.sort_values(["date", "group", "type"]).reset_index(drop=True),
+        expected.sort_values(["date", "group", "type"]).reset_index(drop=True),
+        check_dtype=False,
+    )
+
+
+def test_features_add_rolling_yoy_and_ratios():
+    features = build_features.build_features(history())
+    total = features[(features["group"] == "total")
+                     & (features["type"] == "prison")].set_index("date")
+
+    # Values rise by 2 a week, so the year-on-year change is 104
+    assert total["yoy_change"].dropna().eq(104).all()
+    assert total["rolling_4wk"].iloc[-1] == total["value"].iloc[-4:].mean()
+    assert {"occupancy", "headroom_pct"} <= set(features["type"])
+
+
+def test_update_adds_new_weeks(tmp_path):
+    path = tmp_path / "features.csv"
+    df = history()
+    build_features.update_features(
+        df[df["date"] < df["date"].unique()[-6]], path)
+    updated = build_features.update_features(df, path)
+    assert_same_features(updated, build_features.build_features(df))
+
+
+def test_update_recomputes_after_revised_week(tmp_path):
+    path = tmp_path / "features.csv"
+    df = history()
+    build_features.update_features(df, path)
+
+    # A later bulletin revises a week in the middle of the history
+    revised = df.copy()
+    week = revised["date"] == revised["date"].unique()[10]
+    revised.loc[week, "value"] += 50
+
+    updated = build_features.update_features(revised, path)
+    assert_same_features(updated, build_features.build_features(revised))
+    assert build_features.revised_dates(
+        revised.assign(date=pd.to_datetime(revised["date"])),
+        pd.read_csv(path, parse_dates=["date"])).empty
@@ -0,0 +1,87 @@
+"""Tests for chart figures built from chart specs."""
+
+import pandas as pd
+import pytest
+
+from conftest import make_rows
+from src import utilities as utils
+from src.visualization import chart_specs, html_report, long_view
+
+
+@pytest.fixture
+def chart_data() -> pd.DataFrame:
+    dates = pd.date_range("2021-01-01", "2024-12-27", freq="7D")
+    return pd.concat([
+        make_rows(dates, groups=("total", "male", "female"),
+                  category=category, base=base)
+        for category, base in [("prison", 40000), ("hdc", 1500),
+                               ("operational_capacity", 41000)]
+    ], ignore_index=True)
+
+
+def test_spec_builds_one_trace_per_year(chart_data):
+    spec = chart_specs.figure_kwargs(chart_specs.PRISON_POPULATION)
+    fig = utils.build_chart_figure(**spec, data=chart_data)
+
+    assert "filename" not in spec
+    assert len(fig.data) == 4
+    assert fig.layout.yaxis.range == chart_specs.PRISON_POPULATION[
+        "yaxis_range"]
+
+
+def test_misspelt_spec_key_raises(chart_data):
+    spec = dict(chart_specs.figure_kwargs(chart_specs.PRISON_POPULATION),
+                yaxis_rnage=(0, 1))
+    with pytest.raises(TypeError):
+        utils.build_chart_figure(**spec, data=chart_data)
+
+
+def test_report_embeds_every_chart(chart_data):
+    page = html_report.build_report(include_plotlyjs="cdn", data=chart_data)
+
+    for spec in chart_specs.CHART_SPECS:
+        assert f'<div id="{spec["filename"]}"' in page
+    assert page.count("cdn.plot.ly") == 1
+    assert '"bdata"' in page
+
+
+def test_report_falls_back_to_lists_for_old_plotlyjs(chart_data,
+                                                     monkeypatch):
+    assert html_report.supports_typed_arrays("2.28.0")
+    assert not html_report.supports_typed_arrays("2.27.1")
+
+    monkeypatch.setattr(html_report.plotly.offline, "get_plotlyjs_version",
+                        lambda: "2.24.1")
+    page = html_report.build_report(include_plotlyjs="cdn", data=chart_data)
+    assert '"bdata"' not in page
+    assert "plotly-2.24.1.min.js" in page
+
+
+def test_long_view_uses_automatic_ticks(chart_data):
+    spec = chart_specs.figure_kwargs(chart_specs.PRISON_POPULATION_LONG_VIEW)
+    fig = long_view.build_long_view_figure(**spec, data=chart_data)
+
+    assert fig.layout.yaxis.dtick is None
+    assert fig.layout.yaxis.autorange
+    # Monthly means over four years
+    assert len(fig.data[0].x) == 48
+
+    fig = long_view.build_long_view_figure(**spec, data=chart_data,
+                                           yaxis_dtick=5000)
+    assert fig.layout.yaxis.dtick == 5000
+
+
+def test_long_view_rejects_unknown_keys(chart_data):
+    with pytest.raises(TypeError):
+        long_view.build_long_view_figure(
+            **chart_specs.PRISON_POPULATION_LONG_VIEW, data=chart_data)
+
+
+def test_decimation_keeps_end_points():
+    dates = pd.date_range("2000-01-07", periods=1000, freq="7D")
+    df = pd.DataFrame({"date": dates, "value": range(1000)})
+    for method in ("lttb", "minmax"):
+        decimated = long_view.decimate(df, 100, method)
+        assert len(decimated) <= 100
+        ends = decimated["date"].iloc[[0, -1]].tolist()
+        assert ends == [dates[0], dates[-1]]
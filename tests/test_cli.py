@@ -0,0 +1,80 @@
+"""Tests for the python -m src command line."""
+
+from pathlib import Path
+
+import pandas as pd
+
+from conftest import make_rows
+from src import __main__ as cli
+from src import utilities as utils
+from src.data import database, make_dataset
+from src.features import build_features
+
+
+def write_dataset(processed_dir):
+    dates = pd.date_range("2016-01-01", "2024-12-27", freq="7D")
+    pd.concat([
+        make_rows(dates, category=category, base=base)
+        for category, base in [("prison", 40000), ("hdc", 1500),
+                               ("operational_capacity", 41000)]
+    ], ignore_index=True).to_csv(processed_dir / "processed_data.csv",
+                                 index=False)
+
+
+def test_build_updates_features_from_the_selected_backend(tmp_path,
+                                                          monkeypatch,
+                                                          weekly_rows):
+    def build(_raw_dir, processed_dir, **_kwargs):
+        database.save_dataset(weekly_rows, str(make_dataset.output_path(
+            processed_dir, database.DEFAULT_DB_PATH)))
+
+    monkeypatch.setattr(make_dataset, "main", build)
+    args = cli.build_parser().parse_args([
+        "--processed-dir", str(tmp_path), "build", "--backend", "sqlite"])
+    cli.run_build(args)
+
+    features = pd.read_csv(
+        tmp_path / Path(build_features.DEFAULT_FEATURES_PATH).name,
+        parse_dates=["date"])
+    assert features["date"].max() == weekly_rows["date"].max()
+
+
+def test_summary_defaults_to_formats_without_extra_dependencies():
+    args = cli.build_parser().parse_args(["summary"])
+    assert args.formats == ["md", "html"]
+
+
+def test_summary_uses_the_given_directories(tmp_path, capsys):
+    processed_dir, reports_dir = tmp_path / "processed", tmp_path / "reports"
+    processed_dir.mkdir()
+    write_dataset(processed_dir)
+
+    args = cli.build_parser().parse_args([
+        "--processed-dir", str(processed_dir),
+        "--reports-dir", str(reports_dir), "summary"])
+    cli.run_summary(args)
+
+    assert sorted(path.name for path in reports_dir.iterdir()) == [
+        "weekly_summary.html", "weekly_summary.md"]
+    assert "27 Dec 2024" in capsys.readouterr().out
+
+
+def test_charts_use_the_given_directories(tmp_path, monkeypatch):
+    processed_dir, reports_dir = tmp_path / "processed", tmp_path / "reports"
+    processed_dir.mkdir()
+    write_dataset(processed_dir)
+    saved = []
+
+    def save_chart(fig, filename, out_dir):  # pylint: disable=unused-argument
+        saved.append((filename, out_dir))
+
+    monkeypatch.setattr(utils, "save_chart", save_chart)
+    args = cli.build_parser().parse_args([
+        "--processed-dir", str(processed_dir),
+        "--reports-dir", str(reports_dir), "charts"])
+    cli.run_charts(args)
+
+    assert saved
+    assert {out_dir for _, out_dir in saved} == {
+        str(reports_dir / "figures")}
+    assert (reports_dir / "prison_population_report.html").exists()
@@ -0,0 +1,40 @@
+"""Tests for the SQLite backend."""
+
+import pandas as pd
+
+from src.data import database, make_dataset
+
+
+def test_upsert_only_writes_new_or_changed_rows(tmp_path, weekly_rows):
+    db_path = str(tmp_path / "data.sqlite")
+    assert database.save_dataset(weekly_rows, db_path) == len(weekly_rows)
+    assert database.save_dataset(weekly_rows, db_path) == 0
+
+    revised = weekly_rows.copy()
+    revised.loc[0, "value"] += 1
+    assert database.save_dataset(revised, db_path) == 1
+
+    stored = database.query_series(db_path, group=revised.loc[0, "group"],
+                                   category="prison")
+    assert stored.loc[0, "value"] == revised.loc[0, "value"]
+    assert database.load_runs(db_path)["rows_upserted"].tolist() == [
+        len(weekly_rows), 0, 1]
+
+
+def test_query_series_filters_dates(tmp_path, weekly_rows):
+    db_path = str(tmp_path / "data.sqlite")
+    database.save_dataset(weekly_rows, db_path)
+    df = database.query_series(db_path, group="total",
+                               start_date="2024-01-12",
+                               end_date="2024-01-19")
+    assert df["date"].tolist() == list(
+        pd.to_datetime(["2024-01-12", "2024-01-19"]))
+
+
+def test_sqlite_build_writes_to_output_dir(tmp_path, weekly_rows):
+    frames = {"data/raw/2024/bulletin.ods": weekly_rows}
+    make_dataset.build_dataset(frames, tmp_path, backend="sqlite")
+
+    db_path = tmp_path / "processed_data.sqlite"
+    assert db_path.exists()
+    assert len(database.query_series(str(db_path))) == len(weekly_rows)
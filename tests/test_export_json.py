@@ -0,0 +1,38 @@
+"""Tests for the static per-series JSON export."""
+
+import gzip
+import json
+
+from src.data import export_json, make_dataset
+
+
+def test_only_changed_series_are_rewritten(tmp_path, weekly_rows):
+    export_json.export_series(weekly_rows, tmp_path)
+    mtimes = {path.name: path.stat().st_mtime_ns
+              for path in tmp_path.glob("*.json.gz")}
+    assert sorted(mtimes) == [
+        "female_prison.json.gz", "female_prison_2024.json.gz",
+        "male_prison.json.gz", "male_prison_2024.json.gz",
+        "total_prison.json.gz", "total_prison_2024.json.gz"]
+
+    revised = weekly_rows.copy()
+    revised.loc[revised["group"] == "male", "value"] += 1
+    index = export_json.export_series(revised, tmp_path)
+
+    rewritten = {path.name for path in tmp_path.glob("*.json.gz")
+                 if path.stat().st_mtime_ns != mtimes[path.name]}
+    assert rewritten == {"male_prison.json.gz", "male_prison_2024.json.gz"}
+    assert index["files"]["male_prison.json.gz"]["rows"] == 8
+
+    payload = json.loads(gzip.decompress(
+        (tmp_path / "male_prison.json.gz").read_bytes()))
+    assert payload["value"][0] == 1001
+    assert payload["week"][:2] == [1, 2]
+
+
+def test_build_exports_into_its_output_dir(tmp_path, weekly_rows):
+    make_dataset.build_dataset({"data/raw/2024/bulletin.ods": weekly_rows},
+                               tmp_path)
+
+    index = export_json.read_index(tmp_path / "json")
+    assert "total_prison.json.gz" in index["files"]
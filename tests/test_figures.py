@@ -0,0 +1,46 @@
+"""Tests for the dict-based chart figure path and the figure factory."""
+
+import json
+
+import pytest
+
+from src.visualization import benchmark_figures, figure_factory
+
+
+@pytest.mark.parametrize("n_years", [1, 5])
+def test_dict_path_builds_the_original_figure(n_years):
+    args = benchmark_figures.figure_args(n_years)
+    # Values compare equal in JSON whether written as int or float
+    original, fast = (json.loads(path(*args).to_json()) for path in (
+        benchmark_figures.original_path, benchmark_figures.fast_path))
+
+    assert len(fast["data"]) == n_years
+    assert fast == original
+
+
+def test_base_layout_copies_are_independent():
+    layout = figure_factory.base_layout()
+    layout["yaxis"]["dtick"] = 1
+
+    assert figure_factory.base_layout()["yaxis"]["dtick"] == 2000
+    assert "images" not in layout
+    assert figure_factory.base_layout(online=True)["images"]
+
+
+def test_new_figure_merges_axis_overrides():
+    fig = figure_factory.new_figure(
+        [dict(type="scatter", x=[1, 2], y=[3, 4])],
+        dict(title="Title", yaxis=dict(range=(0, 10), dtick=None)))
+
+    assert fig.layout.yaxis.range == (0, 10)
+    # Unset overrides keep the base axis settings
+    assert fig.layout.yaxis.dtick == 2000
+    assert fig.layout.xaxis.range == (1, 53)
+
+
+def test_online_copy_leaves_the_figure_unchanged():
+    fig = figure_factory.new_figure([], dict(title="Title"))
+    online = figure_factory.to_online(fig)
+
+    assert online.layout.images
+    assert not fig.layout.images
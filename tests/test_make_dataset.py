@@ -0,0 +1,55 @@
+"""Tests for merging a selective rebuild into the processed dataset."""
+
+import pandas as pd
+
+from conftest import make_rows
+from src.data import make_dataset
+
+
+def saved_dataset(tmp_path) -> pd.DataFrame:
+    dates = pd.date_range("2024-01-05", periods=8, freq="7D")
+    existing = make_rows(dates)
+    # A gap makes the saved CSV load with float values
+    existing.loc[existing.index[-1], "value"] = pd.NA
+    existing.to_csv(tmp_path / "processed_data.csv", index=False)
+    return existing
+
+
+def test_rebuild_replaces_only_rebuilt_dates(tmp_path):
+    existing = saved_dataset(tmp_path)
+    stale_dates = pd.to_datetime(["2024-01-26", "2024-02-02"])
+    stale = existing[existing["date"].isin(stale_dates)
+                     & (existing["group"] == "total")].assign(group="old")
+    existing = pd.concat([existing, stale], ignore_index=True).assign(
+        date=lambda x: pd.to_datetime(x["date"]))
+
+    # Only the 26 January bulletin was re-parsed, and now reports 1 more
+    rebuilt = make_rows(["2024-01-26", "2024-02-02"], base=1000)
+    rebuilt["value"] += 1
+    rebuilt = rebuilt[rebuilt["date"] == "2024-01-26"]
+
+    merged = make_dataset.merge_window(existing, rebuilt,
+                                       since=pd.Timestamp("2024-01-20"),
+                                       until=pd.Timestamp("2024-02-05"))
+
+    # The rebuilt bulletin no longer has the stale row, so it is dropped
+    week = merged[merged["date"] == "2024-01-26"].sort_values("group")
+    assert week["value"].tolist() == rebuilt.sort_values("group")[
+        "value"].tolist()
+    # 2 February was in the window but not rebuilt, so it is kept as it was
+    assert (merged["date"] == "2024-02-02").sum() == 4
+    assert len(merged) == len(existing) - 1
+    assert merged["value"].dtype == "Int64"
+
+
+def test_windowed_build_keeps_integer_values(tmp_path):
+    saved_dataset(tmp_path)
+    rebuilt = make_rows(["2024-01-26"], base=1001)
+
+    make_dataset.build_dataset({"data/raw/2024/pop-26-jan-2024.ods": rebuilt},
+                               tmp_path, since=pd.Timestamp("2024-01-26"),
+                               until=pd.Timestamp("2024-01-26"))
+
+    lines = (tmp_path / "processed_data.csv").read_text().splitlines()
+    assert "2024-01-26,male,prison,1001" in lines
+    assert not any(line.endswith(".0") for line in lines)
@@ -0,0 +1,75 @@
+"""Tests for the batch forecasting models."""
+
+import numpy as np
+import pandas as pd
+
+from conftest import make_rows
+from src.models import predict_model, train_model
+
+
+def history() -> pd.DataFrame:
+    dates = pd.date_range("2022-01-07", periods=156, freq="7D")
+    return pd.concat([
+        make_rows(dates, category="prison"),
+        make_rows(dates, category="operational_capacity", base=1050),
+    ], ignore_index=True)
+
+
+def test_fit_recovers_linear_trend():
+    dates = pd.date_range("2020-01-03", periods=60, freq="7D").to_numpy()
+    values = 100 + 3 * np.arange(60, dtype=float)
+    params = train_model.fit_series(dates, values)
+
+    assert params["n_harmonics"] == 0
+    assert params["residual_std"] < 1e-6
+    forecast = predict_model.forecast_series(params, horizon_weeks=2)
+    np.testing.assert_allclose(forecast["value"], [280, 283])
+
+
+def test_unchanged_series_are_not_refitted(tmp_path, monkeypatch):
+    path = str(tmp_path / "params.json")
+    df = history()
+    first = train_model.train_models(df, path)
+
+    fitted = []
+    fit_task = train_model._fit_task  # pylint: disable=protected-access
+
+    def record_fit(task):
+        fitted.append(task[0])
+        return fit_task(task)
+
+    monkeypatch.setattr(train_model, "_fit_task", record_fit)
+    revised = df.copy()
+    revised.loc[revised["group"] == "male", "value"] += 1
+    second = train_model.train_models(revised, path)
+
+    assert sorted(fitted) == ["male|operational_capacity", "male|prison"]
+    assert second["total|prison"] == first["total|prison"]
+
+
+def test_worker_fits_match_in_process_fits(tmp_path):
+    in_process = train_model.train_models(history(), str(tmp_path / "a.json"))
+    workers = train_model.train_models(history(), str(tmp_path / "b.json"),
+                                       max_workers=2)
+    assert workers == in_process
+
+
+def test_capacity_crossing(tmp_path):
+    params = train_model.train_models(history(), str(tmp_path / "p.json"))
+    # Capacity grows as fast as population but starts 50 higher per group
+    assert predict_model.project_capacity_crossing(params, "male") is None
+
+
+def test_capacity_crossing_week(tmp_path):
+    dates = pd.date_range("2022-01-07", periods=156, freq="7D")
+    population = make_rows(dates, groups=("male",))
+    # Population grows by one a week while capacity falls by one from 1401
+    capacity = population.assign(type="operational_capacity",
+                                 value=1401 - (population["value"] - 1000))
+    params = train_model.train_models(pd.concat([population, capacity]),
+                                      str(tmp_path / "p.json"))
+
+    # 1000 + week first exceeds 1401 - week in week 201, 46 weeks after the
+    # last observation in week 155
+    crossing = predict_model.project_capacity_crossing(params, "male")
+    assert crossing == dates[-1] + pd.Timedelta(weeks=46)
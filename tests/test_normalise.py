@@ -0,0 +1,74 @@
+"""Tests for the label normaliser shared by the bulletin formats."""
+
+import logging
+
+import numpy as np
+import pandas as pd
+
+from src.data import make_dataset
+
+
+def sheet(n_rows: int, n_cols: int, cells: dict) -> pd.DataFrame:
+    """Builds a raw sheet with the given (row, column) cells filled in."""
+    df = pd.DataFrame(np.full((n_rows, n_cols), None, dtype=object))
+    for (row, col), value in cells.items():
+        df.iat[row, col] = value
+    # As process_file reads sheets, without their blank rows
+    return df.dropna(how="all")
+
+
+def historic_sheet(labels) -> pd.DataFrame:
+    cells = {(0, 2): "Population on 5th January 2024", (1, 2): "Source",
+             (2, 2): "Notes", (3, 2): "Figures"}
+    for row, (label, value) in enumerate(labels, start=4):
+        cells[(row, 2)], cells[(row, 5)] = label, value
+    return sheet(17, 8, cells)
+
+
+def test_historic_labels_map_to_groups_and_types():
+    df = make_dataset.process_historic_file(historic_sheet([
+        ("Population", 87000),
+        ("population  in MALE estate", 83000),
+        ("Female population", 4000),
+    ]), "historic.ods")
+
+    assert df.to_dict("records") == [
+        {"date": pd.Timestamp("2024-01-05").date(), "group": group,
+         "type": "prison", "value": value}
+        for group, value in [("total", 87000), ("male", 83000),
+                             ("female", 4000)]]
+    assert df["value"].dtype == "Int64"
+
+
+def test_new_format_has_one_row_per_group():
+    cells = {(0, 2): "Population bulletin: 12 January 2024",
+             (2, 2): "Prison population", (12, 2): "Notes"}
+    figures = {4: "Population", 5: "Useable Operational Capacity",
+               6: "Headroom", 8: "Home Detention Curfew caseload"}
+    for row, label in figures.items():
+        cells[(row, 2)] = label
+        for col, value in zip((4, 6, 7, 8), (row * 1000, row * 900,
+                                             row * 100, row)):
+            cells[(row, col)] = value
+
+    df = make_dataset.process_new_file(sheet(25, 9, cells), "new.ods")
+
+    assert len(df) == 16
+    assert set(df["group"]) == {"total", "male", "female", "youth"}
+    assert set(df["type"]) == {"prison", "operational_capacity", "headroom",
+                               "hdc"}
+    capacity = df[df["type"] == "operational_capacity"].set_index("group")
+    assert capacity.loc["male", "value"] == 4500
+
+
+def test_unmapped_labels_are_reported_and_dropped(caplog):
+    with caplog.at_level(logging.WARNING):
+        df = make_dataset.process_historic_file(historic_sheet([
+            ("Population", 87000),
+            ("Population in the new estate", 5),
+            ("Headroom", 1500),
+        ]), "historic.ods")
+
+    assert df["type"].tolist() == ["prison", "headroom"]
+    assert "Unmapped labels in historic.ods" in caplog.text
+    assert "Population in the new estate" in caplog.text
@@ -0,0 +1,51 @@
+"""Tests for the year-partitioned dataset."""
+
+from pathlib import Path
+
+import pandas as pd
+
+from conftest import make_rows
+from src.data import make_dataset, partitions
+
+
+def two_years() -> pd.DataFrame:
+    return make_rows(pd.date_range("2023-11-03", periods=12, freq="7D"))
+
+
+def test_partitions_split_by_year(tmp_path):
+    df = two_years()
+    index = partitions.write_partitions(df, tmp_path)
+
+    assert sorted(index) == ["2023", "2024"]
+    assert sum(entry["rows"] for entry in index.values()) == len(df)
+    assert index["2024"]["min_date"] == "2024-01-05"
+    assert index["2023"]["groups"] == ["female", "male", "total"]
+
+
+def test_window_reads_only_overlapping_rows(tmp_path):
+    df = two_years()
+    partitions.write_partitions(df, tmp_path)
+
+    window = partitions.read_partitions(tmp_path, "2023-12-20", "2024-01-10")
+    assert sorted(window["date"].unique()) == list(
+        pd.to_datetime(["2023-12-22", "2023-12-29", "2024-01-05"]))
+
+    latest = partitions.read_last_n_dates(2, tmp_path)
+    assert latest["date"].nunique() == 2
+    assert latest["date"].max() == df["date"].max()
+
+
+def test_stale_years_are_removed(tmp_path):
+    partitions.write_partitions(two_years(), tmp_path)
+    partitions.write_partitions(
+        make_rows(pd.date_range("2024-01-05", periods=2, freq="7D")),
+        tmp_path)
+    assert not (tmp_path / "2023.csv").exists()
+
+
+def test_partition_dir_follows_config(tmp_path):
+    configured = make_dataset.output_path(
+        make_dataset.DEFAULT_OUTPUT_DIR, partitions.DEFAULT_PARTITION_DIR)
+    assert configured == Path(partitions.DEFAULT_PARTITION_DIR)
+    assert make_dataset.output_path(
+        tmp_path, partitions.DEFAULT_PARTITION_DIR) == tmp_path / "by_year"
@@ -0,0 +1,60 @@
+"""Tests for the streaming download and parse pipeline."""
+
+import os
+
+import pandas as pd
+
+from src.data import download_data, make_dataset, pipeline
+
+
+def parse(path) -> pd.DataFrame:
+    """Stands in for the ODS parser, one row per file."""
+    return pd.DataFrame({"date": [pd.Timestamp("2024-01-05")],
+                         "group": [os.path.basename(path)],
+                         "type": ["prison"], "value": [1]})
+
+
+def test_failed_year_is_logged_and_others_finish(monkeypatch, caplog):
+    monkeypatch.setattr(download_data, "get_api_urls", lambda years: [
+        ("https://example.org/2023", "2023"),
+        ("https://example.org/2024", "2024")])
+    finished = []
+
+    def download_files(api_url, year, path, on_file):
+        if year == "2023":
+            raise ConnectionError(api_url)
+        finished.append(year)
+
+    monkeypatch.setattr(download_data, "download_files", download_files)
+
+    assert download_data.download_prison_population_data(
+        path="unused") == ["2023"]
+    assert finished == ["2024"]
+    assert "Download failed for 2023" in caplog.text
+
+
+def test_pipeline_parses_files_on_disk_and_downloaded(tmp_path, monkeypatch,
+                                                      caplog):
+    for name in ("a.ods", "b.ods", "c.ods"):
+        (tmp_path / name).write_bytes(b"")
+    built = {}
+
+    def download(years, path, max_workers, on_file):
+        (tmp_path / "d.ods").write_bytes(b"")
+        on_file(str(tmp_path / "d.ods"))
+        on_file(str(tmp_path / "a.ods"))
+        raise ConnectionError("content API unavailable")
+
+    monkeypatch.setattr(download_data, "download_prison_population_data",
+                        download)
+    monkeypatch.setattr(make_dataset, "process_file", parse)
+    monkeypatch.setattr(make_dataset, "build_dataset",
+                        lambda frames, *args: built.update(frames))
+
+    frames = pipeline.run_pipeline(raw_dir=str(tmp_path), parse_workers=1,
+                                   queue_size=1)
+
+    assert sorted(os.path.basename(path) for path in frames) == [
+        "a.ods", "b.ods", "c.ods", "d.ods"]
+    assert built.keys() == frames.keys()
+    assert "Download failed" in caplog.text
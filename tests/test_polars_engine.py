@@ -0,0 +1,55 @@
+"""Tests that the polars engine returns what the pandas engine does."""
+
+import pandas as pd
+import pytest
+
+from src.data import benchmark_engines, revisions
+
+pytest.importorskip("polars")
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture(scope="module")
+def engine_cases() -> dict:
+    return benchmark_engines.cases(benchmark_engines.synthetic_data(4, 3))
+
+
+@pytest.mark.parametrize("name", ["calculate_week_and_ticks", "deduplicate"])
+def test_engines_agree(engine_cases, name):
+    expected = engine_cases[name]("pandas")
+    actual = engine_cases[name]("polars")
+
+    if isinstance(expected, tuple):
+        pd.testing.assert_frame_equal(expected[0], actual[0])
+        assert expected[1:] == actual[1:]
+    else:
+        pd.testing.assert_frame_equal(expected, actual)
+
+
+def duplicated_rows() -> pd.DataFrame:
+    return pd.DataFrame({
+        "date": ["2024-01-05", "2024-01-05", "2024-01-12"],
+        "group": "total",
+        "type": "prison",
+        "value": [1, 2, 3],
+        "source": ["data/raw/2024/pop-5-jan-2024.ods",
+                   "data/raw/2024/pop-12-jan-2024.ods",
+                   "data/raw/2024/pop-12-jan-2024.ods"],
+    })
+
+
+def test_deduplicate_accepts_string_dates():
+    df = duplicated_rows()
+
+    expected = revisions.deduplicate(df, engine="pandas")
+    pd.testing.assert_frame_equal(
+        revisions.deduplicate(df, engine="polars"), expected)
+    assert expected["value"].tolist() == [2, 3]
+
+
+def test_deduplicate_empty_frame():
+    df = duplicated_rows().iloc[:0]
+
+    pd.testing.assert_frame_equal(
+        revisions.deduplicate(df, engine="polars"),
+        revisions.deduplicate(df, engine="pandas"))
@@ -0,0 +1,110 @@
+"""Tests for the lazy query API and its predicate pushdown."""
+
+import pandas as pd
+import pytest
+
+from conftest import make_rows
+from src import utilities
+from src.data import database, make_dataset, partitions
+from src.query import Query
+
+
+@pytest.fixture
+def dataset() -> pd.DataFrame:
+    dates = pd.date_range("2022-01-07", "2024-12-27", freq="7D")
+    return pd.concat([make_rows(dates),
+                      make_rows(dates, category="hdc", base=10)],
+                     ignore_index=True)
+
+
+@pytest.fixture
+def queries(tmp_path, dataset) -> dict:
+    """The same dataset stored as CSV, year partitions and SQLite."""
+    csv_path = tmp_path / "processed_data.csv"
+    dataset.to_csv(csv_path, index=False)
+    partitions.write_partitions(dataset, tmp_path / "by_year")
+    database.save_dataset(dataset, str(tmp_path / "data.sqlite"))
+    paths = dict(csv_path=str(csv_path),
+                 partition_dir=str(tmp_path / "by_year"),
+                 db_path=str(tmp_path / "data.sqlite"))
+    return {source: Query(source, **paths)
+            for source in ("csv", "partitions", "sqlite")}
+
+
+PLANS = {
+    "series": lambda q: q.series("male", "prison"),
+    "window": lambda q: q.series(["total", "female"]).between(
+        "2023-03-01", "2023-06-30"),
+    "last": lambda q: q.series(category="hdc").last(3),
+    "select": lambda q: q.series("male", "hdc").years(2024).select(
+        "date", "value"),
+    "month": lambda q: q.series("total", "prison").years(2023, 2023)
+    .aggregate("MS"),
+}
+
+
+@pytest.mark.parametrize("plan", PLANS)
+def test_storages_give_the_same_result(queries, dataset, plan):
+    results = {source: PLANS[plan](query).collect()
+               for source, query in queries.items()}
+
+    assert not results["csv"].empty
+    pd.testing.assert_frame_equal(results["partitions"], results["csv"])
+    pd.testing.assert_frame_equal(results["sqlite"], results["csv"])
+
+
+def test_query_matches_filtering_in_pandas(queries, dataset):
+    result = PLANS["window"](queries["csv"]).collect()
+    expected = dataset[dataset["group"].isin(["total", "female"])
+                       & dataset["date"].between("2023-03-01", "2023-06-30")]
+
+    assert len(result) == len(expected)
+    assert result["value"].sum() == expected["value"].sum()
+
+
+def test_predicates_are_pushed_down(queries):
+    window = queries["partitions"].between("2024-02-01", "2024-03-01")
+    assert "read files: ['2024.csv']" in window.explain()
+
+    sql = queries["sqlite"].series("male").select("date", "value").explain()
+    assert "read columns: ['date', 'group', 'value']" in sql
+    assert "\"group\" IN (?)" in sql
+
+    hdc = queries["partitions"].series(category="hdc").between("2023-06-01")
+    assert "read files: ['2024.csv', '2023.csv']" in hdc.explain()
+
+
+def test_plans_are_immutable(queries):
+    base = queries["csv"].series("male")
+    narrowed = base.years(2024)
+
+    assert base.start_date is None
+    assert narrowed.start_date == "2024-01-01"
+
+
+def test_auto_reads_the_backend_built_last(tmp_path, weekly_rows):
+    early = weekly_rows["date"] < "2024-02-16"
+    make_dataset.build_dataset(
+        {"data/raw/2024/early.ods": weekly_rows[early]}, tmp_path)
+    make_dataset.build_dataset(
+        {"data/raw/2024/early.ods": weekly_rows[early],
+         "data/raw/2024/late.ods": weekly_rows[~early]},
+        tmp_path, backend="sqlite")
+
+    query = Query.for_dir(str(tmp_path))
+    assert query.resolve_source() == "sqlite"
+    result = query.collect()
+    assert len(result) == len(weekly_rows)
+    assert result["date"].max() == weekly_rows["date"].max()
+
+
+def test_chart_loading_checks_the_start_year(queries, monkeypatch):
+    query = queries["csv"]
+    monkeypatch.setattr(Query.__init__, "__defaults__",
+                        ("auto", query.csv_path, query.partition_dir,
+                         query.db_path))
+
+    df, _, _ = utilities.load_and_process_data("total", "prison", 2023)
+    assert df["date"].dt.year.min() == 2023
+    with pytest.raises(ValueError, match="Invalid date '2019'"):
+        utilities.load_and_process_data("total", "prison", 2019)
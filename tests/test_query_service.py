@@ -0,0 +1,101 @@
+"""Tests for the local JSON query service."""
+
+import http.client
+import json
+import os
+import threading
+
+import pandas as pd
+import pytest
+
+from conftest import make_rows
+from src.data import query_service
+
+
+@pytest.fixture
+def data_path(tmp_path):
+    path = tmp_path / "processed_data.csv"
+    make_rows(pd.date_range("2023-01-06", periods=60, freq="7D")).to_csv(
+        path, index=False)
+    return path
+
+
+@pytest.fixture
+def server(data_path):
+    server = query_service.make_server(str(data_path), host="127.0.0.1",
+                                       port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def get(server, path, headers=None):
+    connection = http.client.HTTPConnection(*server.server_address)
+    connection.request("GET", path, headers=headers or {})
+    response = connection.getresponse()
+    body = response.read()
+    connection.close()
+    return response, body
+
+
+def touch(path, df):
+    """Rewrites the file with a newer mtime than the loaded version."""
+    mtime = os.path.getmtime(path)
+    df.to_csv(path, index=False)
+    os.utime(path, (mtime + 10, mtime + 10))
+
+
+def test_series_query_and_revalidation(server):
+    response, body = get(server, "/series?group=male&start_year=2024")
+    payload = json.loads(body)
+
+    assert response.status == 200
+    assert payload["date"][0] == "2024-01-05"
+    assert payload["value"][0] == 1000 + 52
+
+    response, body = get(server, "/series?group=male&start_year=2024",
+                         {"If-None-Match": response.getheader("ETag")})
+    assert response.status == 304
+    assert body == b""
+
+    response, body = get(server, "/series?group=nobody")
+    assert response.status == 400
+    assert "Invalid group" in json.loads(body)["error"]
+
+
+def test_concurrent_checks_reload_once(data_path):
+    index = query_service.DatasetIndex(str(data_path), check_interval=0)
+    touch(data_path, make_rows(pd.date_range("2023-01-06", periods=61,
+                                             freq="7D")))
+
+    threads = [threading.Thread(target=index.reload_if_changed)
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert index.version == 2
+    assert index.query("total", "prison")["date"][-1] == "2024-03-01"
+
+
+def test_failed_reload_keeps_serving_previous_version(data_path):
+    index = query_service.DatasetIndex(str(data_path), check_interval=0)
+    touch(data_path, pd.DataFrame({"unexpected": [1]}))
+
+    index.reload_if_changed()
+
+    assert index.version == 1
+    assert index.query("total", "prison")["date"][-1] == "2024-02-23"
+
+
+def test_unexpected_error_returns_json_503(server, monkeypatch):
+    def cached_response(path, params):
+        raise RuntimeError("index unavailable")
+
+    monkeypatch.setattr(server.index, "cached_response", cached_response)
+    response, body = get(server, "/series?group=male")
+
+    assert response.status == 503
+    assert json.loads(body) == {"error": "The dataset could not be queried"}
@@ -0,0 +1,52 @@
+"""Tests for the content-addressed raw bulletin store."""
+
+import zipfile
+from datetime import date
+
+from src.data import raw_store
+
+
+def test_identical_bulletins_are_stored_once(tmp_path):
+    raw_dir, store_dir = tmp_path / "raw", tmp_path / "store"
+    (raw_dir / "2024").mkdir(parents=True)
+    (raw_dir / "2024" / "pop-5-jan-2024.ods").write_bytes(b"january")
+    (raw_dir / "2024" / "pop-12-jan-2024.ods").write_bytes(b"week two")
+    with zipfile.ZipFile(tmp_path / "backfill.zip", "w") as archive:
+        archive.writestr("2024/prison-pop-5-jan-2024.ods", b"january")
+        archive.writestr("2023/pop-29-dec-2023.ods", b"december")
+        archive.writestr("2023/readme.txt", b"not a bulletin")
+
+    counts = raw_store.ingest([str(raw_dir), str(tmp_path / "backfill.zip")],
+                              str(store_dir))
+
+    assert counts == {"files": 4, "new": 3, "duplicates": 1}
+    assert len(raw_store.blob_paths(str(store_dir))) == 3
+    index = raw_store.read_index(str(store_dir))
+    member = index["sources"][f"{tmp_path / 'backfill.zip'}!2023/"
+                              "pop-29-dec-2023.ods"]
+    assert (member["year"], member["bulletin_date"]) == ("2023",
+                                                         "2023-12-29")
+
+
+def test_blobs_are_selected_by_bulletin_date(tmp_path):
+    index = {"blobs": {}, "sources": {}}
+    for name, content in [("pop-29-dec-2023.ods", b"a"),
+                          ("pop-5-jan-2024.ods", b"b"),
+                          ("undated.ods", b"c")]:
+        raw_store.add_bytes(index, content, name, store_dir=str(tmp_path))
+    raw_store.write_index(index, str(tmp_path))
+
+    selected = raw_store.blob_paths(str(tmp_path), since=date(2024, 1, 1))
+    dates = raw_store.blob_dates(str(tmp_path))
+
+    # Bulletins without a date are never silently skipped
+    assert len(selected) == 2
+    assert sorted(dates.values()) == ["2023-12-29", "2024-01-05"]
+
+
+def test_bulletin_dates_from_names():
+    assert raw_store.bulletin_date_from_name(
+        "data/raw/2024/prison-pop-16-dec-2024.ods") == date(2024, 12, 16)
+    assert raw_store.bulletin_date_from_name(
+        "population_19_July_2024.ods") == date(2024, 7, 19)
+    assert raw_store.bulletin_date_from_name("bulletin.ods") is None
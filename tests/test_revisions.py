@@ -0,0 +1,94 @@
+"""Tests for deduplication and revision tracking."""
+
+import os
+
+import pandas as pd
+
+from src.data import make_dataset, raw_store, revisions
+
+
+def tagged(df: pd.DataFrame, source: str, offset: int = 0) -> pd.DataFrame:
+    return df.assign(source=source, value=df["value"] + offset)
+
+
+def test_later_bulletin_wins_regardless_of_mtime(tmp_path, weekly_rows):
+    week = weekly_rows[weekly_rows["date"] == "2024-01-05"]
+    # The later bulletin sorts last by path and has the older mtime
+    first = tmp_path / "2024" / "a-pop-5-jan-2024.ods"
+    reissue = tmp_path / "2024" / "b-pop-12-jan-2024.ods"
+    for path, mtime in [(first, 2_000_000_000), (reissue, 1_000_000_000)]:
+        path.parent.mkdir(exist_ok=True)
+        path.touch()
+        os.utime(path, (mtime, mtime))
+
+    df = pd.concat([tagged(week, str(first)), tagged(week, str(reissue), 5)])
+    kept = revisions.deduplicate(df)
+    assert kept["source"].unique().tolist() == [str(reissue)]
+    assert sorted(kept["value"]) == sorted(week["value"] + 5)
+
+
+def test_matching_year_folder_then_path(weekly_rows):
+    week = weekly_rows[weekly_rows["date"] == "2024-01-05"]
+    df = pd.concat([
+        tagged(week, "data/raw/2023/b.ods", 1),
+        tagged(week, "data/raw/2024/b.ods", 2),
+        tagged(week, "data/raw/2024/a.ods", 3),
+    ])
+    kept = revisions.deduplicate(df)
+    assert kept["source"].unique().tolist() == ["data/raw/2024/a.ods"]
+
+
+def test_store_blobs_rank_by_indexed_bulletin_date(tmp_path, weekly_rows):
+    index = raw_store.read_index(tmp_path)
+    early, _ = raw_store.add_bytes(index, b"a", "pop-5-jan-2024.ods",
+                                   store_dir=tmp_path)
+    late, _ = raw_store.add_bytes(index, b"b", "pop-12-jan-2024.ods",
+                                  store_dir=tmp_path)
+    raw_store.write_index(index, tmp_path)
+    paths = [raw_store.blob_path(h, tmp_path) for h in (early, late)]
+
+    assert revisions.source_dates(paths) == {
+        paths[0]: "2024-01-05", paths[1]: "2024-01-12"}
+
+    week = weekly_rows[weekly_rows["date"] == "2024-01-05"]
+    df = pd.concat([tagged(week, paths[0]), tagged(week, paths[1], 1)])
+    assert revisions.deduplicate(df)["source"].unique().tolist() == [
+        paths[1]]
+
+
+def test_diff_finds_revised_and_removed_values(weekly_rows):
+    current = weekly_rows.copy()
+    current.loc[0, "value"] += 10
+    current = current.drop(index=1)
+
+    changes = revisions.diff_datasets(weekly_rows, current)
+    assert sorted(changes["change"]) == ["removed", "revised"]
+    revised = changes[changes["change"] == "revised"].iloc[0]
+    assert revised["new_value"] - revised["old_value"] == 10
+
+
+def test_revision_log_appends(tmp_path, weekly_rows):
+    log = tmp_path / "revisions.csv"
+
+    current = weekly_rows.assign(value=weekly_rows["value"] + 1)
+    revisions.track_revisions(current.iloc[:3], weekly_rows, log)
+    revisions.track_revisions(current.iloc[:3], weekly_rows, log)
+    assert len(pd.read_csv(log)) == 2 * len(weekly_rows)
+    assert revisions.track_revisions(current, None, log).empty
+
+
+def test_sqlite_build_diffs_against_the_database(tmp_path, weekly_rows):
+    # A stale CSV from an earlier csv build must not be diffed against
+    weekly_rows.assign(value=weekly_rows["value"] + 100).to_csv(
+        tmp_path / "processed_data.csv", index=False)
+    frames = {"data/raw/2024/bulletin.ods": weekly_rows}
+    make_dataset.build_dataset(frames, tmp_path, backend="sqlite")
+    assert not (tmp_path / "revisions.csv").exists()
+
+    revised = weekly_rows.copy()
+    revised.loc[0, "value"] += 1
+    make_dataset.build_dataset({"data/raw/2024/bulletin.ods": revised},
+                               tmp_path, backend="sqlite")
+    log = pd.read_csv(tmp_path / "revisions.csv")
+    assert log["change"].tolist() == ["revised"]
+    assert log.loc[0, "new_value"] - log.loc[0, "old_value"] == 1
@@ -0,0 +1,52 @@
+"""Tests for the year x week seasonal matrix."""
+
+import numpy as np
+import pandas as pd
+
+from conftest import make_rows
+from src.features import seasonal_matrix
+
+
+def history() -> pd.DataFrame:
+    return make_rows(pd.date_range("2022-01-07", periods=110, freq="7D"))
+
+
+def test_matrix_aligns_weeks_and_years():
+    matrix = seasonal_matrix.build_matrix(history())
+    values = seasonal_matrix.series_matrix(matrix, "male", "prison")
+
+    assert values.index.tolist() == [2022, 2023, 2024]
+    assert values.at[2022, 1] == 1000
+    # 2022-01-07 and 2023-01-06 are both in week 1, 52 bulletins apart
+    delta = seasonal_matrix.yoy_delta(matrix, "male", "prison")
+    assert delta.at[2023, 1] == 52
+    assert seasonal_matrix.same_week_last_year(
+        matrix, "male", "prison", "2023-01-06") == 1000
+
+
+def test_materialise_only_writes_changes(tmp_path):
+    path = tmp_path / "matrix.npz"
+    df = history()
+    seasonal_matrix.materialise(df, path)
+    saved_at = path.stat().st_mtime_ns
+
+    assert seasonal_matrix.changed_rows(
+        seasonal_matrix.load_matrix(path), df).empty
+    seasonal_matrix.materialise(df, path)
+    assert path.stat().st_mtime_ns == saved_at
+
+    revised = df.copy()
+    revised.loc[3, "value"] += 7
+    matrix = seasonal_matrix.load_matrix(path)
+    assert seasonal_matrix.changed_rows(matrix, revised).index.tolist() == [3]
+
+    matrix = seasonal_matrix.materialise(revised, path)
+    np.testing.assert_array_equal(
+        matrix["values"], seasonal_matrix.build_matrix(revised)["values"])
+
+
+def test_overlay_traces_match_years():
+    matrix = seasonal_matrix.build_matrix(history())
+    traces = seasonal_matrix.overlay_traces(matrix, "total", "prison", 2023)
+    assert [trace["name"] for trace in traces] == ["2023", "2024"]
+    assert traces[0]["x"][0] == 1
@@ -0,0 +1,52 @@
+"""Tests for the shared-memory dataset."""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import make_rows
+from src.data import shared_dataset
+
+
+def worker_total() -> float:
+    return float(shared_dataset.get_dataset()["value"].sum())
+
+
+def test_attached_dataset_matches_source(weekly_rows):
+    df = weekly_rows.copy()
+    df.loc[2, "value"] = pd.NA
+    handle, blocks = shared_dataset.publish_dataset(df)
+    try:
+        attached = shared_dataset.attach_dataset(handle)
+        pd.testing.assert_series_equal(attached["date"], df["date"],
+                                       check_dtype=False)
+        assert attached["group"].astype(str).tolist() == df["group"].tolist()
+        assert np.isnan(attached["value"][2])
+        with pytest.raises(ValueError):
+            attached["value"].to_numpy()[0] = 0
+    finally:
+        shared_dataset.release_dataset(blocks)
+
+
+def test_codes_widen_for_many_categories():
+    groups = [f"group_{i:03}" for i in range(300)]
+    df = make_rows(["2024-01-05"], groups=groups)
+    handle, blocks = shared_dataset.publish_dataset(df)
+    try:
+        assert handle["columns"]["group"][1] == np.dtype(np.int16).str
+        attached = shared_dataset.attach_dataset(handle)
+        assert attached["group"].astype(str).tolist() == groups
+    finally:
+        shared_dataset.release_dataset(blocks)
+
+
+def test_workers_read_the_published_dataset(weekly_rows):
+    with shared_dataset.shared_dataset(weekly_rows) as handle:
+        with ProcessPoolExecutor(max_workers=2,
+                                 initializer=shared_dataset.init_worker,
+                                 initargs=(handle,)) as executor:
+            totals = [executor.submit(worker_total).result()
+                      for _ in range(2)]
+    assert totals == [float(weekly_rows["value"].sum())] * 2
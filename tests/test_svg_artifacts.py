@@ -0,0 +1,109 @@
+"""Tests for the minified SVG chart artifacts."""
+
+import re
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from src.visualization import svg_artifacts
+
+SVG = b"""<svg xmlns="http://www.w3.org/2000/svg" class="main-svg"
+  width="700" height="500.00001" viewBox="0 0 700 500.00001">
+  <defs id="defs-1"><clipPath id="clip1"><rect x="0" y="0" width="600.4"
+    height="400.6"/></clipPath></defs>
+  <g class="layer-above"></g>
+  <g class="cartesianlayer" data-index="0">
+    <g transform="translate(80.04,100.06)" clip-path="url('#clip1')">
+      <path class="js-line" d="M0.123,399.987L10.25,380.04L20.5,350"
+        style="fill: none; stroke: rgb(0, 98, 155); opacity: 1;"/>
+      <g transform="translate(10.001,20.004) scale(0.04)">
+        <path d="M0,0L250.5,250.5" style="stroke: rgb(255, 255, 255);"/>
+      </g>
+      <g transform="rotate(-0.04) scale(0.75)">
+        <path d="M1.04,2.06L3.5,4.5" style="stroke: rgb(17, 17, 17);"/>
+      </g>
+      <g transform="matrix(0.75,0.0,0.0,0.75,10.55,3.333)">
+        <text x="5.55" y="6.06" style="font-family: 'Open Sans', Arial,
+          sans-serif;">Prisoners</text>
+      </g>
+    </g>
+  </g>
+</svg>"""
+
+SHAPES = ("path", "text", "rect", "line", "circle")
+
+
+def numbers(value: str) -> list[float]:
+    return [float(number)
+            for number in svg_artifacts.NUMBER_PATTERN.findall(value)]
+
+
+def drawn(svg: bytes) -> list[tuple]:
+    """Lists each shape with the transforms and clip paths applied to it."""
+    shapes = []
+
+    def walk(element, transforms, clips):
+        tag = element.tag.rsplit("}", 1)[-1]
+        if tag == "defs":
+            return
+        transforms = transforms + [element.get("transform", "")]
+        clips = clips + [element.get("clip-path", "")]
+        if tag in SHAPES:
+            shapes.append((tag, " ".join(filter(None, transforms)),
+                           "".join(clips), element))
+        for child in element:
+            walk(child, transforms, clips)
+
+    walk(ET.fromstring(svg), [], [])
+    return shapes
+
+
+def transform_parts(transform: str) -> list[tuple[str, list[float]]]:
+    return [(name, numbers(args)) for name, args in
+            svg_artifacts.TRANSFORM_PATTERN.findall(transform)]
+
+
+def test_minified_svg_renders_the_same():
+    minified = svg_artifacts.minify_svg(SVG, precision=1)
+    original, result = drawn(SVG), drawn(minified)
+    tolerance = 0.05 + 1e-9
+
+    assert [shape[0] for shape in result] == [shape[0] for shape in original]
+    for (_, transform, clip, element), (_, new_transform, new_clip,
+                                        new_element) in zip(original, result):
+        assert new_clip == clip
+        parts, new_parts = (transform_parts(transform),
+                            transform_parts(new_transform))
+        assert [name for name, _ in new_parts] == [name for name, _ in parts]
+        for (name, args), (_, new_args) in zip(parts, new_parts):
+            if name == "translate":
+                assert new_args == pytest.approx(args, abs=tolerance)
+            else:
+                # Scales, angles and matrices are kept exactly
+                assert new_args == args
+        for name in ("d", "x", "y", "width", "height"):
+            if name in element.attrib:
+                assert numbers(new_element.get(name)) == pytest.approx(
+                    numbers(element.get(name)), abs=tolerance)
+        assert "".join(new_element.itertext()) == "".join(element.itertext())
+
+
+def test_minified_svg_is_smaller_and_stable():
+    minified = svg_artifacts.minify_svg(SVG, precision=1)
+
+    assert len(minified) < len(SVG)
+    assert b"scale(0.04)" in minified and b"rotate(-0.04)" in minified
+    assert b"translate(80,100.1)" in minified
+    assert b"#00629b" in minified
+    assert not re.search(rb'class="(main-svg|js-line)"|data-index', minified)
+    assert svg_artifacts.minify_svg(minified, precision=1) == minified
+
+
+def test_artifacts_are_written_once(tmp_path):
+    entry = svg_artifacts.write_artifacts(SVG, "chart", tmp_path)
+    svg_path = tmp_path / "chart.svg"
+    mtime = svg_path.stat().st_mtime_ns
+
+    assert (tmp_path / "chart.svg.gz").exists()
+    assert svg_artifacts.write_artifacts(SVG, "chart", tmp_path) == entry
+    assert svg_path.stat().st_mtime_ns == mtime
@@ -0,0 +1,39 @@
+"""Tests for the logging context helpers in src.utilities."""
+
+import logging
+import threading
+
+from src import utilities
+
+
+def test_log_stage_is_reset_after_block():
+    with utilities.log_stage("build", year=2024):
+        assert utilities.log_context() == {"stage": "build", "year": 2024}
+        with utilities.log_stage("validate"):
+            assert utilities.log_context()["stage"] == "validate"
+        assert utilities.log_context()["stage"] == "build"
+    assert utilities.log_context() == {"stage": "main"}
+
+
+def test_threads_keep_their_own_stage():
+    both_entered = threading.Barrier(2)
+    stages = {}
+
+    def run(stage):
+        with utilities.log_stage(stage):
+            # Both threads are inside their blocks before either logs
+            both_entered.wait()
+            record = logging.makeLogRecord({"msg": "x"})
+            utilities.ContextFilter().filter(record)
+            stages[stage] = record.stage
+            both_entered.wait()
+
+    threads = [threading.Thread(target=run, args=(stage,))
+               for stage in ("download", "serve")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert stages == {"download": "download", "serve": "serve"}
+    assert utilities.log_context()["stage"] == "main"
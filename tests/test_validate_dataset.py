@@ -0,0 +1,72 @@
+"""Tests for the data quality checks."""
+
+import json
+
+import pandas as pd
+import pytest
+
+from conftest import make_rows
+from src.data import make_dataset, validate_dataset
+
+
+def test_clean_data_passes(tmp_path, weekly_rows):
+    report = validate_dataset.validate(
+        weekly_rows, report_path=tmp_path / "report.json")
+    assert report["passed"] and report["n_issues"] == 0
+
+
+def test_checks_find_each_issue(weekly_rows):
+    df = pd.concat([weekly_rows, weekly_rows.iloc[[0]]], ignore_index=True)
+    df = df[~df["date"].isin(df["date"].unique()[3:5])]
+    df.loc[df.index[-1], "value"] += 5000
+
+    counts = validate_dataset.run_checks(df)["check"].value_counts()
+    assert counts["duplicate_key"] == 2
+    assert counts["missing_weeks"] == 3
+    assert counts["group_total_mismatch"] == 1
+    assert counts["weekly_jump"] >= 1
+
+
+def test_threshold_raises(tmp_path, weekly_rows):
+    dates = weekly_rows["date"]
+    df = weekly_rows[~dates.isin(dates.unique()[3:5])]
+    with pytest.raises(validate_dataset.DataValidationError):
+        validate_dataset.validate(df, report_path=tmp_path / "report.json",
+                                  max_issues=2)
+    report = json.loads((tmp_path / "report.json").read_text())
+    assert not report["passed"]
+
+
+def test_incremental_gap_after_long_break(tmp_path, weekly_rows):
+    # The new week arrives ten weeks after the last stored one
+    new_week = make_rows(["2024-05-03"])
+    df = pd.concat([weekly_rows, new_week], ignore_index=True)
+
+    report = validate_dataset.validate(
+        df, new_dates=new_week["date"],
+        report_path=tmp_path / "report.json")
+    assert report["mode"] == "incremental"
+    assert report["issue_counts"] == {"missing_weeks": 3}
+    # Only the last stored week of each series is read as context
+    assert report["rows_checked"] == 2 * len(new_week)
+
+
+def test_old_issues_do_not_block_a_new_week(tmp_path):
+    df = make_rows(pd.date_range("2023-01-06", periods=61, freq="7D"))
+    # Every stored week has a total that is one off the sum of the groups,
+    # more issues than the threshold allows
+    old = df["date"] < df["date"].max()
+    df.loc[old & (df["group"] == "total"), "value"] += 1
+    df[old].to_csv(tmp_path / "processed_data.csv", index=False)
+    frames = {"data/raw/2023/old.ods": df[old],
+              "data/raw/2024/new.ods": df[~old]}
+
+    make_dataset.build_dataset(frames, tmp_path)
+    report = json.loads((tmp_path / "validation_report.json").read_text())
+    assert report["mode"] == "incremental"
+    assert report["n_issues"] == 0
+
+    # A first build checks the full history
+    (tmp_path / "fresh").mkdir()
+    with pytest.raises(validate_dataset.DataValidationError):
+        make_dataset.build_dataset(frames, tmp_path / "fresh")
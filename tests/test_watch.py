@@ -0,0 +1,76 @@
+"""Tests for watch mode."""
+
+from pathlib import Path
+
+import pandas as pd
+
+from conftest import make_rows
+from src import watch
+from src.features import build_features
+
+
+def test_failed_update_is_retried_on_the_next_scan(tmp_path, monkeypatch):
+    raw_dir = tmp_path / "raw"
+    raw_dir.mkdir()
+    state = {"data": make_rows(["2024-01-05"]), "files": {}}
+    (raw_dir / "pop-12-jan-2024.ods").write_bytes(b"bulletin")
+    attempts = []
+
+    def apply_changes(state, files, processed_dir):
+        attempts.append(files)
+        if len(attempts) == 1:
+            raise ValueError("unreadable bulletin")
+        return pd.DataFrame(columns=watch.KEYS + ["value"])
+
+    monkeypatch.setattr(watch, "apply_changes", apply_changes)
+
+    assert watch.update(state, str(raw_dir), str(tmp_path)) == []
+    assert state["files"] == {}
+
+    watch.update(state, str(raw_dir), str(tmp_path))
+    assert attempts[0] == attempts[1] == [str(raw_dir / "pop-12-jan-2024.ods")]
+    assert list(state["files"]) == attempts[1]
+
+    # Recorded once applied, so an unchanged file is not parsed again
+    watch.update(state, str(raw_dir), str(tmp_path))
+    assert len(attempts) == 2
+
+
+def test_failed_scan_is_logged(tmp_path, monkeypatch, caplog):
+    def scan_raw_files(raw_dir, file_pattern):
+        raise PermissionError(raw_dir)
+
+    monkeypatch.setattr(watch, "scan_raw_files", scan_raw_files)
+    state = {"data": make_rows(["2024-01-05"]), "files": {}}
+
+    assert watch.update(state, str(tmp_path), str(tmp_path)) == []
+    assert "Could not scan" in caplog.text
+
+
+def test_changes_are_saved_into_the_watched_dir(tmp_path, monkeypatch,
+                                                weekly_rows):
+    new_week = make_rows(["2024-03-01"])
+    monkeypatch.setattr(watch.make_dataset, "process_file",
+                        lambda file: new_week)
+    state = {"data": watch.normalise(weekly_rows), "files": {}}
+
+    changed = watch.apply_changes(
+        state, ["data/raw/2024/pop-1-mar-2024.ods"], str(tmp_path))
+    assert changed["date"].unique().tolist() == [pd.Timestamp("2024-03-01")]
+    assert len(state["data"]) == len(weekly_rows) + len(new_week)
+    features_name = Path(build_features.DEFAULT_FEATURES_PATH).name
+    assert (tmp_path / features_name).exists()
+
+
+def test_stored_rows_keep_their_place_against_older_bulletins(weekly_rows):
+    week = weekly_rows[weekly_rows["date"] == "2024-01-05"]
+    data = watch.normalise(weekly_rows).assign(
+        source="data/raw/2024/pop-12-jan-2024.ods")
+    # A re-scanned older bulletin does not replace a later re-publication
+    older = watch.normalise(week).assign(
+        value=week["value"] - 1, source="data/raw/2024/pop-5-jan-2024.ods")
+
+    merged, changed = watch.merge_rows(data, older)
+    assert changed.empty
+    pd.testing.assert_frame_equal(
+        merged, data.sort_values(watch.KEYS).reset_index(drop=True))
@@ -0,0 +1,60 @@
+"""Tests for the weekly summary."""
+
+import importlib.util
+
+import pandas as pd
+import pytest
+
+from conftest import make_rows
+from src.data import weekly_data_summary
+
+
+def two_types() -> pd.DataFrame:
+    dates = pd.date_range("2024-01-05", periods=3, freq="7D")
+    return pd.concat([
+        make_rows(dates, category="hdc", base=10),
+        make_rows(dates, category="prison"),
+    ], ignore_index=True)
+
+
+def test_summary_orders_types_and_groups():
+    summary = weekly_data_summary.summarise_weeks(two_types())
+
+    assert summary.index.get_level_values("type").unique().tolist() == [
+        "prison", "hdc"]
+    assert summary.loc["prison"].index.tolist() == [
+        "total", "female", "male"]
+    # Most recent date first, then the week-on-week changes
+    assert summary.columns[0] == pd.Timestamp("2024-01-19")
+    assert summary.columns[-2:].tolist() == ["change", "pct_change"]
+    assert summary.loc[("prison", "male"), "change"] == 1
+
+
+def test_summary_exports(tmp_path):
+    summary = weekly_data_summary.summarise_weeks(two_types())
+    paths = weekly_data_summary.export_summary(
+        summary, output_dir=tmp_path, formats=("md", "html"))
+
+    assert [path.rsplit(".", 1)[1] for path in paths] == ["md", "html"]
+    markdown = (tmp_path / "weekly_summary.md").read_text(encoding="utf-8")
+    assert ("| prison | total | 3,004 | 3,002 | 3,000 | +2 | +0.1% |"
+            in markdown)
+
+
+def test_summary_reads_the_given_processed_dir(tmp_path):
+    two_types().to_csv(tmp_path / "processed_data.csv", index=False)
+    summary = weekly_data_summary.main(n_weeks=2, processed_dir=tmp_path)
+
+    assert summary.columns[:2].tolist() == [
+        pd.Timestamp("2024-01-19"), pd.Timestamp("2024-01-12")]
+
+
+def test_xlsx_export_without_openpyxl_is_rejected(tmp_path):
+    if importlib.util.find_spec("openpyxl") is not None:
+        pytest.skip("openpyxl is installed")
+    summary = weekly_data_summary.summarise_weeks(two_types())
+
+    with pytest.raises(ImportError, match="openpyxl"):
+        weekly_data_summary.export_summary(
+            summary, output_dir=tmp_path, formats=("md", "xlsx"))
+    assert not list(tmp_path.iterdir())